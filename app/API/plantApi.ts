@@ -40,9 +40,34 @@ export const getPlantCareTypes = async () => {
     return apiFetch('/plant-care/', { method: 'GET' }); // List with name and scientific_name
 };
 
+// A new species is generated in the background: the server answers 202 with a job to poll
 export const createPlantCareType = async (plantCare: Partial<PlantCare>) => {
-    return apiFetch('/plant-care/', {
+    const created = await apiFetch('/plant-care/', {
         method: 'POST',
         body: JSON.stringify(plantCare),
     });
+    // Known species come back directly
+    if (!created?.job_id) return created;
+    return waitForCareJob(created.job_id);
+};
+
+// CARE JOBS
+
+const CARE_JOB_POLL_MS = 1000;
+const CARE_JOB_TIMEOUT_MS = 60000;
+
+export const getCareJob = async (jobId: string) => {
+    return apiFetch(`/care-jobs/${jobId}/`, { method: 'GET' });
+};
+
+// Resolves with the job's result once it succeeds
+export const waitForCareJob = async (jobId: string) => {
+    const deadline = Date.now() + CARE_JOB_TIMEOUT_MS;
+    while (Date.now() < deadline) {
+        const job = await getCareJob(jobId);
+        if (job.status === 'succeeded') return job.result;
+        if (job.status === 'failed') throw new Error(job.error || 'Care generation failed');
+        await new Promise(resolve => setTimeout(resolve, CARE_JOB_POLL_MS));
+    }
+    throw new Error('Care generation is taking too long, try again later');
 };
@@ -64,20 +64,27 @@ export default function AddPlantForm(): JSX.Element {
             return;
         }
         setLoading(true);
-        const created = await createPlantCareType({
-            name: newTypeName.trim(),
-            scientific_name: newTypeScientificName.trim(),
-        });
-        setLoading(false);
+        try {
+            // Waits for the species to be generated if it's new
+            const created = await createPlantCareType({
+                name: newTypeName.trim(),
+                scientific_name: newTypeScientificName.trim(),
+            });
 
-        if (created?.id) {
-            setPlantCareOptions(prev => [...prev, created]);
-            setPlantCareId(created.id);
-            setModalVisible(false);
-            setAddingNewType(false);
-            setNewTypeName('');
-            setNewTypeScientificName('');
-            setAttemptedCreate(false);
+            if (created?.id) {
+                // An existing species may already be listed
+                setPlantCareOptions(prev => [...prev.filter(option => option.id !== created.id), created]);
+                setPlantCareId(created.id);
+                setModalVisible(false);
+                setAddingNewType(false);
+                setNewTypeName('');
+                setNewTypeScientificName('');
+                setAttemptedCreate(false);
+            }
+        } catch (error) {
+            console.error('Failed to create plant care type:', error);
+        } finally {
+            setLoading(false);
         }
     };
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Requests/sec through the full Django middleware stack under WSGI and ASGI.
+
+Both handlers are driven in-process with the same concurrency (8, matching the
+gunicorn thread count) against an authenticated endpoint that does not touch
+the database, so the numbers reflect middleware and handler overhead. Run from
+the backend directory:
+
+    python benchmarks/bench_asgi.py [requests] [concurrency]
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from plant_api.middleware import firebase_auth
+from plant_api.middleware.token_verifier import HttpCertSource, LocalTokenVerifier
+from plant_api.testing import PROJECT_ID, LocalKeyServer
+
+# Authenticated, no database access: answers 400 for a missing plant_name
+PATH = '/api/care-summary/'
+
+
+def wsgi_environ(token):
+    return {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': PATH,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8000',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': f'Bearer {token}',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(b''),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def bench_wsgi(requests_count, concurrency, token):
+    application = get_wsgi_application()
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    def one_request(_):
+        response = application(wsgi_environ(token), start_response)
+        b''.join(response)
+        response.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        list(pool.map(one_request, range(requests_count)))
+        elapsed = time.perf_counter() - start
+    return requests_count / elapsed, statuses[0]
+
+
+def bench_asgi(requests_count, concurrency, token):
+    application = get_asgi_application()
+    statuses = []
+
+    async def one_request():
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': PATH,
+            'raw_path': PATH.encode(),
+            'query_string': b'',
+            'headers': [
+                (b'host', b'localhost'),
+                (b'authorization', f'Bearer {token}'.encode()),
+            ],
+            'server': ('localhost', 8000),
+            'client': ('127.0.0.1', 50000),
+        }
+
+        pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if pending:
+                return pending.pop()
+            # The client never disconnects; Django cancels this once the response is sent
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await application(scope, receive, send)
+
+    async def worker(count):
+        for _ in range(count):
+            await one_request()
+
+    async def run():
+        per_worker = requests_count // concurrency
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+    return asyncio.run(run()), statuses[0]
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with LocalKeyServer() as key_server:
+        token = key_server.current.mint(uid='bench-user')
+        verifier = LocalTokenVerifier(PROJECT_ID, source=HttpCertSource(key_server.url))
+        verifier.start()
+        with mock.patch.object(firebase_auth, '_local_verifier', verifier):
+            wsgi_rps, wsgi_status = bench_wsgi(requests_count, concurrency, token)
+            asgi_rps, asgi_status = bench_asgi(requests_count, concurrency, token)
+        verifier.stop()
+
+    print(f"Requests: {requests_count}, concurrency: {concurrency}, path: {PATH}")
+    print(f"WSGI: {wsgi_rps:8.0f} req/s (status {wsgi_status})")
+    print(f"ASGI: {asgi_rps:8.0f} req/s (status {asgi_status})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Benchmark of per-request auth overhead in FirebaseAuthMiddleware.
+
+Firebase ID tokens are minted with a self-signed key served by a local key
+server, so that each uncached verification pays a real RS256 signature
+check, as `auth.verify_id_token` does. Run from the backend directory:
+
+    python benchmarks/bench_auth.py [requests]
+"""
+
+import os
+import sys
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from django.http import HttpResponse
+from django.test import RequestFactory
+from google.auth import jwt
+
+from plant_api.middleware import firebase_auth
+from plant_api.middleware.firebase_auth import FirebaseAuthMiddleware, token_cache
+from plant_api.middleware.token_verifier import HttpCertSource, LocalTokenVerifier
+from plant_api.testing import PROJECT_ID, LocalKeyServer
+
+
+def run(requests_count, token, verify, use_cache):
+    middleware = FirebaseAuthMiddleware(lambda request: HttpResponse('ok'))
+    request = RequestFactory().get('/api/plants/', HTTP_AUTHORIZATION=f'Bearer {token}')
+    token_cache.clear()
+    max_size = token_cache.max_size
+
+    with mock.patch('plant_api.middleware.firebase_auth.auth.verify_id_token', side_effect=verify):
+        if not use_cache:
+            # Disable the cache by making every lookup a miss
+            token_cache.max_size = 0
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            middleware(request)
+        elapsed = time.perf_counter() - start
+        token_cache.max_size = max_size
+
+    return elapsed / requests_count * 1_000_000
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    with LocalKeyServer() as key_server:
+        key = key_server.current
+        token = key.mint(uid='bench-user')
+
+        def verify(id_token):
+            return jwt.decode(id_token, certs={key.kid: key.certificate_pem}, audience=PROJECT_ID)
+
+        uncached = run(requests_count, token, verify, use_cache=False)
+        cached = run(requests_count, token, verify, use_cache=True)
+        cache_stats = token_cache.stats()
+
+        # Local verifier with background-refreshed keys, cache disabled
+        verifier = LocalTokenVerifier(PROJECT_ID, source=HttpCertSource(key_server.url))
+        verifier.start()
+        with mock.patch.object(firebase_auth, '_local_verifier', verifier):
+            local = run(requests_count, token, verify, use_cache=False)
+        verifier.stop()
+
+    print(f"Requests per run: {requests_count}")
+    print(f"Without token cache:        {uncached:8.1f} us/request")
+    print(f"With token cache:           {cached:8.1f} us/request")
+    print(f"Local verifier, no cache:   {local:8.1f} us/request")
+    print(f"Cache speedup:              {uncached / cached:8.1f}x")
+    print(f"Cache stats: {cache_stats}")
+
+
+if __name__ == "__main__":
+    main()
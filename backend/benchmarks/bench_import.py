@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Species importer throughput and peak Python memory at growing file sizes. Rows
+per second should stay flat and peak memory constant, since the file is streamed
+and upserted in fixed-size chunks. Each size is imported twice, the second run
+updating every row in place. Runs against a throwaway test database:
+
+    python benchmarks/bench_import.py [chunk size] [sizes...]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from plant_api.importer import import_species, iter_records
+from plant_api.models import PlantCare
+from plant_api.testing import temporary_database
+
+
+def write_dataset(path, rows):
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(rows):
+            file.write(json.dumps({
+                'common_name': f'Species {i}',
+                'scientific_name': f'Genus{i % 997} species{i}',
+                'water_frequency': f'every {i % 3 + 1} weeks',
+                'light_needs': 'Bright indirect',
+                'summary': 'Keep the soil lightly moist. ' * 4,
+            }) + '\n')
+
+
+def main():
+    chunk_size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    sizes = [int(size) for size in sys.argv[2:]] or [10000, 50000, 200000]
+
+    with temporary_database(), tempfile.TemporaryDirectory() as directory:
+        print(f"{'rows':>8} {'run':>7} {'seconds':>8} {'rows/s':>8} {'peak MiB':>9}")
+        for rows in sizes:
+            path = os.path.join(directory, f'species-{rows}.jsonl')
+            write_dataset(path, rows)
+            PlantCare.objects.all().delete()
+            for run in ('insert', 'update'):
+                tracemalloc.start()
+                start = time.perf_counter()
+                stats = import_species(iter_records(path), chunk_size=chunk_size)
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{stats['read']:>8} {run:>7} {elapsed:>8.2f} {stats['read'] / elapsed:>8.0f} "
+                      f"{peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Render time of the large analytics payloads with DRF's stdlib JSONRenderer and
+the orjson-backed ORJSONRenderer. Payloads come from the real views run against
+a throwaway test database:
+
+    python benchmarks/bench_json.py [days] [repeat]
+"""
+
+import os
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from plant_api import views
+from plant_api.models import AdClick, AdImpression, AdKpi, AdUnit
+from plant_api.renderers import ORJSONRenderer
+from plant_api.testing import temporary_database
+
+
+def seed(days):
+    today = timezone.now().date()
+    unit = AdUnit.objects.create(name='Home', format='banner', placement='home_banner', unit_id_android='unit')
+    for day in range(days):
+        AdKpi.objects.create(date=today - timedelta(days=day), active_users=100 + day, total_impressions=4000 + day * 7)
+    impressions = AdImpression.objects.bulk_create([
+        AdImpression(ad_id=f'ad-{i}', ad_unit=unit, placement='home_banner',
+                     estimated_revenue=Decimal('0.005'), metadata={'app_version': '1.0.0'})
+        for i in range(days * 10)
+    ])
+    AdClick.objects.bulk_create([
+        AdClick(impression=impression, conversion_value=Decimal('0.25'))
+        for impression in impressions[::5]
+    ])
+
+
+def payload(viewset, action, days):
+    request = APIRequestFactory().get('/', {'days': days})
+    return viewset.as_view({'get': action})(request).data
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with temporary_database():
+        seed(days)
+        payloads = {
+            'AdKpiViewSet.summary': payload(views.AdKpiViewSet, 'summary', days),
+            'AdImpressionViewSet.stats': payload(views.AdImpressionViewSet, 'stats', days),
+            'AdImpressionViewSet.list': payload(views.AdImpressionViewSet, 'list', days),
+        }
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    print(f"Days: {days} (best of {repeat})")
+    for label, data in payloads.items():
+        body = stdlib.render(data)
+        assert fast.render(data) == body, f"{label}: renderers disagree"
+        stdlib_ms = best_of(repeat, lambda: stdlib.render(data)) * 1000
+        fast_ms = best_of(repeat, lambda: fast.render(data)) * 1000
+        print(f"{label} ({len(body) / 1024:.0f} KiB)")
+        print(f"  JSONRenderer:   {stdlib_ms:7.3f} ms")
+        print(f"  ORJSONRenderer: {fast_ms:7.3f} ms ({stdlib_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Care summary prompt size before and after prompt compaction. Generations run
+against a local OpenAI stand-in that reports prompt tokens from the prompt
+length, and the recorded ApiUsage rows are summarized as the usage report does.
+"Before" sends the raw Perenual / Trefle search results as indented JSON, as
+the view used to; "after" sends the budgeted care facts. Runs against a
+throwaway test database:
+
+    python benchmarks/bench_prompt.py [generations]
+"""
+
+import json
+import os
+import sys
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from plant_api import views
+from plant_api.breakers import breakers
+from plant_api.care_cache import care_summary_cache
+from plant_api.models import ApiUsage
+from plant_api.testing import LocalOpenAIServer, temporary_database
+from plant_api.usage_stats import generation_stats
+
+
+def perenual_record(i):
+    return {
+        'id': i,
+        'common_name': f'Swiss cheese plant {i}',
+        'scientific_name': [f'Monstera deliciosa {i}'],
+        'other_name': ['Ceriman', 'Split-leaf philodendron', 'Mexican breadfruit', 'Windowleaf', 'Hurricane plant'],
+        'cycle': 'Perennial',
+        'watering': 'Average',
+        'sunlight': ['part shade', 'part sun/part shade'],
+        'default_image': {
+            'license': 45,
+            'license_name': 'Attribution-ShareAlike 3.0 Unported (CC BY-SA 3.0)',
+            'license_url': 'https://creativecommons.org/licenses/by-sa/3.0/deed.en',
+            'original_url': f'https://perenual.com/storage/species_image/{i}/og/monstera.jpg',
+            'regular_url': f'https://perenual.com/storage/species_image/{i}/regular/monstera.jpg',
+            'medium_url': f'https://perenual.com/storage/species_image/{i}/medium/monstera.jpg',
+            'small_url': f'https://perenual.com/storage/species_image/{i}/small/monstera.jpg',
+            'thumbnail': f'https://perenual.com/storage/species_image/{i}/thumbnail/monstera.jpg',
+        },
+    }
+
+
+def trefle_record(i):
+    return {
+        'id': 140000 + i,
+        'common_name': 'Ceriman',
+        'slug': f'monstera-deliciosa-{i}',
+        'scientific_name': f'Monstera deliciosa {i}',
+        'year': 1849,
+        'bibliography': 'Vidensk. Meddel. Dansk Naturhist. Foren. Kjøbenhavn 1849: 19 (1849)',
+        'author': 'Liebm.',
+        'status': 'accepted',
+        'rank': 'species',
+        'family_common_name': 'Arum family',
+        'genus_id': 3211,
+        'image_url': f'https://bs.plantnet.org/image/o/{i}abc',
+        'synonyms': ['Monstera borsigiana', 'Philodendron anatomicum', 'Monstera lennea', 'Tornelia fragrans'],
+        'genus': 'Monstera',
+        'family': 'Araceae',
+        'links': {'self': f'/api/v1/species/monstera-deliciosa-{i}', 'plant': f'/api/v1/plants/monstera-{i}',
+                  'genus': '/api/v1/genus/monstera'},
+    }
+
+
+def legacy_info_text(plant_info):
+    return json.dumps(plant_info, indent=2) if plant_info else "No specific plant information available."
+
+
+def respond(body):
+    return {'plant_name': 'Monstera', 'watering_needs': 'Weekly', 'light_needs': 'Bright indirect',
+            'summary': 'Easy going.', 'tips': ['Wipe the leaves']}
+
+
+def main():
+    generations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    raw = [{'perenual_data': [perenual_record(i) for i in range(3)],
+            'trefle_data': [trefle_record(i) for i in range(3)]} for _ in range(generations)]
+
+    with temporary_database(), LocalOpenAIServer(respond) as server, \
+            mock.patch.object(views, 'client', server.client()):
+        print(f"{'prompt':<7} {'calls':>6} {'p50 ms':>7} {'prompt tok':>11} {'compl. tok':>11} {'USD/call':>10}")
+        for label, build in (('before', legacy_info_text), ('after', views.build_plant_info_text)):
+            ApiUsage.objects.all().delete()
+            breakers.reset()
+            with mock.patch.object(views, 'build_plant_info_text', build):
+                for i, plant_info in enumerate(raw):
+                    care_summary_cache.clear_hot()
+                    views.PlantCareAI.generate_plant_care_summary(f'{label} species {i}', plant_info)
+            stats = generation_stats(ApiUsage.objects.filter(api_name='OpenAI'))
+            print(f"{label:<7} {stats['calls']:>6} {stats['p50_ms']:>7} {stats['prompt_tokens']:>11.0f} "
+                  f"{stats['completion_tokens']:>11.0f} {stats['cost_per_call']:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
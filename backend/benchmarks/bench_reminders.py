@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Watering-reminder fan-out throughput and peak Python memory at growing table sizes.
+Throughput should stay flat and peak memory constant as the plant count grows,
+since plants are streamed and sends are bounded. Runs against a throwaway test
+database with a no-op sender:
+
+    python benchmarks/bench_reminders.py [plants per user] [sizes...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from django.utils import timezone
+
+from plant_api.models import Plant, PlantCare
+from plant_api.reminders import send_watering_reminders
+from plant_api.testing import temporary_database
+
+
+class NullSender:
+    def send(self, notification):
+        pass
+
+
+def grow_to(rows, per_user, care):
+    due = timezone.now() - timedelta(hours=1)
+    existing = Plant.objects.count()
+    batch = []
+    for i in range(existing, rows):
+        batch.append(Plant(name=f'Plant {i}', uid=f'user-{i // per_user:08d}', care=care, next_water_due=due))
+        if len(batch) == 10000:
+            Plant.objects.bulk_create(batch)
+            batch = []
+    Plant.objects.bulk_create(batch)
+
+
+def main():
+    per_user = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sizes = [int(size) for size in sys.argv[2:]] or [10000, 50000, 200000]
+
+    with temporary_database():
+        care = PlantCare.objects.create(name='Fern', water_frequency=3, light_requirements='Shade')
+        print(f"{'plants':>10} {'users':>8} {'seconds':>8} {'plants/s':>10} {'peak MiB':>9}")
+        for rows in sizes:
+            grow_to(rows, per_user, care)
+            # Every size reminds all of its plants, including those reminded by the last run
+            Plant.objects.update(water_reminded_for=None)
+            tracemalloc.start()
+            start = time.perf_counter()
+            stats = send_watering_reminders(sender=NullSender(), window=timedelta(hours=1))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{stats['plants']:>10} {stats['users']:>8} {elapsed:>8.2f} "
+                  f"{stats['plants'] / elapsed:>10.0f} {peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Latency of /api/plant-care/search/ index lookups over a synthetic catalog, for
+prefix, multi-word, diacritic and misspelled queries. Runs against a throwaway
+test database:
+
+    python benchmarks/bench_search.py [species] [queries per kind]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from plant_api.models import PlantCare
+from plant_api.search import SpeciesSearchIndex
+from plant_api.testing import temporary_database
+
+SYLLABLES = ['mon', 'ste', 'ra', 'phi', 'lo', 'den', 'dron', 'fi', 'cus', 'al', 'oe', 'cal', 'a', 'the', 'ne',
+             'phro', 'le', 'pis', 'vi', 'ola', 'ár', 'vács', 'ka', 'sán', 'se', 'vie', 'ri', 'tri', 'cho', 'ma',
+             'nes', 'pe', 'ro', 'mi', 'ae', 'hed', 'ha', 'ly', 'sa', 'ti', 'do', 'on', 'ga', 'us', 'tis']
+
+
+def random_word(rng, parts):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(parts))
+
+
+def seed(species, rng):
+    # Name parts repeat across species the way genera and epithets do in real catalogs
+    genera = [random_word(rng, 3).capitalize() for _ in range(max(species // 20, 1))]
+    epithets = [random_word(rng, 3) + rng.choice(['a', 'um', 'us', 'ii', 'ensis']) for _ in range(max(species // 10, 1))]
+    common = [random_word(rng, 2) for _ in range(max(species // 50, 1))]
+    batch = []
+    for i in range(species):
+        genus = rng.choice(genera)
+        batch.append(PlantCare(
+            name=f'{rng.choice(common).capitalize()} {rng.choice(common)}',
+            scientific_name=f'{genus} {rng.choice(epithets)}',
+            water_frequency=7, light_requirements='Bright',
+        ))
+        if len(batch) == 10000:
+            PlantCare.objects.bulk_create(batch)
+            batch = []
+    PlantCare.objects.bulk_create(batch)
+
+
+def misspell(rng, word):
+    index = rng.randrange(1, len(word) - 1)
+    return word[:index] + word[index + 1] + word[index] + word[index + 2:]
+
+
+def percentile(timings, fraction):
+    return sorted(timings)[int(len(timings) * fraction)] * 1000
+
+
+def main():
+    species = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    per_kind = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rng = random.Random(42)
+
+    with temporary_database():
+        seed(species, rng)
+        names = list(PlantCare.objects.values_list('name', 'scientific_name'))
+        index = SpeciesSearchIndex(max_age=3600)
+        start = time.perf_counter()
+        index.build()
+        print(f"Built index over {species} species in {time.perf_counter() - start:.2f}s: {index.stats()}")
+
+        samples = [rng.choice(names) for _ in range(per_kind)]
+        kinds = {
+            'prefix (3 chars)': [name[:3] for name, _ in samples],
+            'prefix (6 chars)': [name[:6] for name, _ in samples],
+            'two words': [f'{sci.split()[0][:5]} {sci.split()[1][:3]}' for _, sci in samples],
+            'exact scientific': [sci.upper() for _, sci in samples],
+            'misspelled': [misspell(rng, sci.lower()) for _, sci in samples],
+        }
+
+        print(f"{'query kind':<18} {'p50 ms':>8} {'p99 ms':>8}")
+        for kind, queries in kinds.items():
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                index.search(query)
+                timings.append(time.perf_counter() - start)
+            print(f"{kind:<18} {percentile(timings, 0.5):>8.3f} {percentile(timings, 0.99):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
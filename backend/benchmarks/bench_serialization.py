@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Serialization cost per 1k rows for the hot list endpoints, comparing the model-instance
+(DRF ModelSerializer) path with the values()-based fast path. Both paths include the
+query and JSON rendering. Runs against a throwaway test database:
+
+    python benchmarks/bench_serialization.py [rows] [repeat]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'plantkeepersapp.settings')
+
+import django
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from plant_api.models import Plant, PlantCare
+from plant_api.serializers import PlantRowSerializer, PlantSerializer
+from plant_api.testing import temporary_database
+
+SUMMARY = 'Water when the top 2 cm of soil are dry. Bright, indirect light. ' * 20
+
+
+def seed(rows):
+    cares = PlantCare.objects.bulk_create([
+        PlantCare(name=f'Species {i}', scientific_name=f'Plantus {i}', water_frequency=7,
+                  light_requirements='Bright indirect', care_summary=SUMMARY)
+        for i in range(50)
+    ])
+    now = timezone.now()
+    Plant.objects.bulk_create([
+        Plant(name=f'Plant {i}', uid='bench-user', care=cares[i % len(cares)], last_watered=now)
+        for i in range(rows)
+    ])
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    renderer = JSONRenderer()
+
+    with temporary_database():
+        seed(rows)
+        plants = Plant.objects.filter(uid='bench-user').select_related('care')
+        cares = PlantCare.objects.all()
+
+        cases = {
+            'plants (PlantViewSet/UserPlantViewSet)': (
+                lambda: renderer.render(PlantSerializer(plants.all(), many=True).data),
+                lambda: renderer.render(PlantRowSerializer.serialize(plants.all())),
+            ),
+            'plant-care (PlantCareViewSet)': (
+                lambda: renderer.render([
+                    {'id': pc.id, 'name': pc.name, 'scientific_name': pc.scientific_name}
+                    for pc in cares.only('id', 'name', 'scientific_name')
+                ]),
+                lambda: renderer.render(list(cares.values('id', 'name', 'scientific_name'))),
+            ),
+        }
+
+        print(f"Rows: {rows} plants, {cares.count()} plant-care entries (best of {repeat})")
+        for label, (slow, fast) in cases.items():
+            assert slow() == fast(), f"{label}: fast path output differs"
+            count = rows if label.startswith('plants') else cares.count()
+            slow_ms = best_of(repeat, slow) * 1000 / count * 1000
+            fast_ms = best_of(repeat, fast) * 1000 / count * 1000
+            print(f"{label}")
+            print(f"  Model instances: {slow_ms:8.2f} ms per 1k rows")
+            print(f"  values() path:   {fast_ms:8.2f} ms per 1k rows ({slow_ms / fast_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Circuit breakers for the third-party providers (Perenual, Trefle, OpenAI).
+
+Breakers are fed from ApiUsage rows as they are written, so every call that is
+already logged counts towards its provider's error rate and latency. While a
+breaker is open, callers skip the provider and fall back to cached or degraded
+data instead of waiting for another failure.
+"""
+
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Trips when, over the last `window` seconds and at least `min_calls` calls,
+    the share of failed calls reaches `error_rate` or the share of calls slower
+    than `slow_call_ms` reaches `slow_rate`.
+
+    An open breaker rejects calls for `open_seconds`, then lets one probe
+    through (half-open). The probe's outcome closes the breaker or opens it again.
+    """
+    def __init__(self, name, window=60, min_calls=5, error_rate=0.5,
+                 slow_call_ms=5000, slow_rate=0.8, open_seconds=30):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._calls = deque()  # (monotonic time, failed, slow)
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self):
+        """
+        Whether a call may go to the provider now
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and now - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            # One probe at a time; a probe that never reported is replaced after open_seconds
+            if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probe_started = now
+            return True
+
+    def record(self, success, response_ms):
+        now = time.monotonic()
+        slow = response_ms >= self.slow_call_ms
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self._close()
+                else:
+                    self._open(now)
+                return
+            if self.state == OPEN:
+                # Calls that started before the breaker opened
+                return
+            self._calls.append((now, not success, slow))
+            self._expire(now)
+            calls = len(self._calls)
+            if calls < self.min_calls:
+                return
+            failed = sum(1 for _, is_failed, _ in self._calls if is_failed)
+            slowed = sum(1 for _, _, is_slow in self._calls if is_slow)
+            if failed / calls >= self.error_rate or slowed / calls >= self.slow_rate:
+                self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._probe_started = None
+        self._calls.clear()
+        self.trips += 1
+
+    def _close(self):
+        self.state = CLOSED
+        self._probe_started = None
+        self._calls.clear()
+
+    def _expire(self, now):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def reset(self):
+        with self._lock:
+            self._close()
+            self.rejected = 0
+            self.trips = 0
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            calls = len(self._calls)
+            return {
+                'state': self.state,
+                'recent_calls': calls,
+                'error_rate': round(sum(1 for _, failed, _ in self._calls if failed) / calls, 3) if calls else None,
+                'slow_rate': round(sum(1 for _, _, slow in self._calls if slow) / calls, 3) if calls else None,
+                'trips': self.trips,
+                'rejected': self.rejected,
+            }
+
+
+class BreakerRegistry:
+    """
+    One breaker per provider, named like ApiUsage.api_name
+    """
+    def __init__(self, config):
+        slow_call_ms = config.get('SLOW_CALL_MS', {})
+        self._breakers = {
+            name: CircuitBreaker(
+                name,
+                window=config.get('WINDOW_SECONDS', 60),
+                min_calls=config.get('MIN_CALLS', 5),
+                error_rate=config.get('ERROR_RATE', 0.5),
+                slow_call_ms=slow_call_ms.get(name, 5000),
+                slow_rate=config.get('SLOW_RATE', 0.8),
+                open_seconds=config.get('OPEN_SECONDS', 30),
+            )
+            for name in config.get('PROVIDERS', ('Perenual', 'Trefle', 'OpenAI'))
+        }
+
+    def __getitem__(self, name):
+        return self._breakers[name]
+
+    def allow(self, name):
+        return self._breakers[name].allow()
+
+    def record_usage(self, usage):
+        breaker = self._breakers.get(usage.api_name)
+        if breaker is not None and not usage.cache_hit:
+            breaker.record(usage.success, usage.response_time)
+
+    def reset(self):
+        for breaker in self._breakers.values():
+            breaker.reset()
+
+    def stats(self):
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+
+breakers = BreakerRegistry(getattr(settings, 'CIRCUIT_BREAKER_CONFIG', {}))
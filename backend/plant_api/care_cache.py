@@ -0,0 +1,152 @@
+"""
+Cache of OpenAI care summaries. Entries live in the database so every process and
+deploy shares them, with a small in-process LRU in front for popular species.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .concurrency import Interval
+from .models import CareSummaryCacheEntry, normalize
+
+
+class CareSummaryCache:
+    """
+    Two layers: a bounded OrderedDict per process and the CareSummaryCacheEntry
+    table. Entries expire after `ttl` seconds; once the table holds more than
+    `max_entries` rows the least recently used ones are dropped, checked on a
+    write at most every `evict_interval` seconds.
+
+    Hot-layer hits don't touch the table, except to refresh `last_used_at` at most
+    every `touch_interval` seconds so popular entries aren't evicted as idle.
+    """
+    def __init__(self, ttl=30 * 24 * 3600, max_entries=10000, hot_entries=256, touch_interval=3600,
+                 evict_interval=300):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hot_entries = hot_entries
+        self.touch_interval = touch_interval
+        self.evict_interval = evict_interval
+        self._eviction = Interval()
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.hot_hits = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0
+
+    @staticmethod
+    def make_key(plant_name, model, prompt_hash):
+        raw = f"{normalize(plant_name)}\x00{model}\x00{prompt_hash}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Returns (summary, generation_ms) or None
+        """
+        now = timezone.now()
+        with self._lock:
+            entry = self._hot.get(key)
+            if entry is not None and entry['expires_at'] <= now:
+                del self._hot[key]
+                entry = None
+            if entry is not None:
+                self._hot.move_to_end(key)
+                self.hot_hits += 1
+                self.saved_ms += entry['generation_time']
+                touch = now - entry['touched_at'] >= timedelta(seconds=self.touch_interval)
+                if touch:
+                    entry['touched_at'] = now
+        if entry is not None:
+            if touch:
+                CareSummaryCacheEntry.objects.filter(key=key).update(last_used_at=now)
+            return entry['summary'], entry['generation_time']
+
+        row = (
+            CareSummaryCacheEntry.objects
+            .filter(key=key, expires_at__gt=now)
+            .values('summary', 'generation_time', 'expires_at').first()
+        )
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        CareSummaryCacheEntry.objects.filter(key=key).update(last_used_at=now, hits=F('hits') + 1)
+        self._remember(key, row['summary'], row['generation_time'], row['expires_at'], now)
+        with self._lock:
+            self.hits += 1
+            self.saved_ms += row['generation_time']
+        return row['summary'], row['generation_time']
+
+    def set(self, key, plant_name, model, summary, generation_ms):
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=self.ttl)
+        CareSummaryCacheEntry.objects.bulk_create(
+            [CareSummaryCacheEntry(
+                key=key, plant_name=plant_name[:255], model=model, summary=summary,
+                generation_time=generation_ms, last_used_at=now, expires_at=expires_at,
+            )],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['summary', 'generation_time', 'last_used_at', 'expires_at'],
+        )
+        self._remember(key, summary, generation_ms, expires_at, now)
+        # The COUNT(*) behind eviction isn't worth paying on every write
+        if self._eviction.due(self.evict_interval):
+            self.evict(now)
+
+    def evict(self, now=None):
+        """
+        Drop expired rows, then the least recently used beyond `max_entries`
+        """
+        now = now or timezone.now()
+        CareSummaryCacheEntry.objects.filter(expires_at__lte=now).delete()
+        excess = CareSummaryCacheEntry.objects.count() - self.max_entries
+        if excess > 0:
+            oldest = list(
+                CareSummaryCacheEntry.objects.order_by('last_used_at').values_list('pk', flat=True)[:excess])
+            CareSummaryCacheEntry.objects.filter(pk__in=oldest).delete()
+
+    def _remember(self, key, summary, generation_ms, expires_at, now):
+        with self._lock:
+            self._hot[key] = {
+                'summary': summary,
+                'generation_time': generation_ms,
+                'expires_at': expires_at,
+                'touched_at': now,
+            }
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_entries:
+                self._hot.popitem(last=False)
+
+    def clear_hot(self):
+        with self._lock:
+            self._hot.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hot_hits + self.hits + self.misses
+            return {
+                'hot_entries': len(self._hot),
+                'hot_hits': self.hot_hits,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hot_hits + self.hits) / lookups, 3) if lookups else None,
+                'saved_ms': self.saved_ms,
+            }
+
+
+_config = getattr(settings, 'CARE_SUMMARY_CACHE_CONFIG', {})
+care_summary_cache = CareSummaryCache(
+    ttl=_config.get('TTL_SECONDS', 30 * 24 * 3600),
+    max_entries=_config.get('MAX_ENTRIES', 10000),
+    hot_entries=_config.get('HOT_ENTRIES', 256),
+    evict_interval=_config.get('EVICT_INTERVAL_SECONDS', 300),
+)
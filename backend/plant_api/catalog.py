@@ -0,0 +1,89 @@
+"""
+In-process snapshot of the PlantCare catalog ({id, name, scientific_name} for every
+species), kept pre-serialized and pre-compressed so GET /api/plant-care/ is a
+memory copy or a 304.
+"""
+
+import gzip
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.http import quote_etag
+
+from .models import PlantCare
+from .renderers import ORJSONRenderer
+
+CATALOG_FIELDS = ('id', 'name', 'scientific_name')
+
+
+class CatalogSnapshot:
+    """
+    Immutable serialized catalog. The ETag hashes the content, so every process
+    building the same catalog hands out the same validator.
+    """
+    def __init__(self, version, data):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.count = len(data)
+        self.body = ORJSONRenderer().render(data)
+        self.gzipped_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = quote_etag(hashlib.md5(self.body).hexdigest())
+
+
+class PlantCareCatalog:
+    """
+    Holds the current snapshot and rebuilds it lazily after the version moves.
+
+    The version is bumped by PlantCare signals once the write commits. Other
+    processes only see their own signals, so a snapshot is also rebuilt once it
+    is older than `max_age` seconds.
+    """
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self.version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.builds = 0
+
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+
+    def invalidate_on_commit(self):
+        transaction.on_commit(self.invalidate)
+
+    def _is_current(self, snapshot):
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.built_at < self.max_age
+        )
+
+    def get(self):
+        snapshot = self._snapshot
+        if self._is_current(snapshot):
+            return snapshot
+        with self._lock:
+            if not self._is_current(self._snapshot):
+                data = list(PlantCare.objects.order_by('id').values(*CATALOG_FIELDS))
+                self._snapshot = CatalogSnapshot(self.version, data)
+                self.builds += 1
+            return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': self.version,
+            'builds': self.builds,
+            'species': snapshot.count if snapshot else None,
+            'bytes': len(snapshot.body) if snapshot else None,
+            'gzipped_bytes': len(snapshot.gzipped_body) if snapshot else None,
+        }
+
+
+catalog = PlantCareCatalog(
+    max_age=getattr(settings, 'PLANT_CARE_CATALOG_CONFIG', {}).get('MAX_STALENESS_SECONDS', 60),
+)
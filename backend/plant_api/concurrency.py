@@ -0,0 +1,209 @@
+"""
+Concurrency helpers shared by the views and background work.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    function, callers arriving while it runs wait and share its result or
+    exception. Once the call finishes the key is forgotten, so later calls run again.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Returns (result, shared); `shared` is False only for the caller that ran `fn`
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+FanOutResult = namedtuple('FanOutResult', 'value error elapsed attempts')
+
+
+class FanOut:
+    """
+    Runs independent calls concurrently on a shared pool and collects what is
+    back by the deadline. Calls still running then are abandoned and reported
+    with a TimeoutError, so callers can go on with partial results.
+
+    With `hedge_after` set, a call that hasn't answered by then, or that failed,
+    gets one duplicate attempt; whichever attempt succeeds first wins.
+    """
+    def __init__(self, workers=8):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+
+    def _submit(self, fn):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fan-out')
+        return self._executor.submit(fn)
+
+    def run(self, calls, deadline, hedge_after=None):
+        """
+        `calls` maps names to zero-argument callables. Returns a FanOutResult per name.
+        """
+        start = time.monotonic()
+        deadline_at = start + deadline
+        hedge_at = start + hedge_after if hedge_after is not None else None
+        pending = {}
+        attempts = dict.fromkeys(calls, 1)
+        hedged = set()
+        errors = {}
+        results = {}
+
+        def hedge(name):
+            hedged.add(name)
+            attempts[name] += 1
+            pending[self._submit(calls[name])] = (name, True)
+            with self._lock:
+                self.hedges += 1
+
+        for name, fn in calls.items():
+            pending[self._submit(fn)] = (name, False)
+
+        while len(results) < len(calls):
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wake_at = min(deadline_at, hedge_at) if hedge_at is not None else deadline_at
+            done, _ = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name, is_hedge = pending.pop(future)
+                if name in results:
+                    continue
+                try:
+                    value = future.result()
+                except Exception as exc:
+                    errors[name] = exc
+                    if hedge_after is not None and name not in hedged:
+                        hedge(name)
+                    elif name not in (other for other, _ in pending.values()):
+                        results[name] = FanOutResult(None, exc, time.monotonic() - start, attempts[name])
+                else:
+                    results[name] = FanOutResult(value, None, time.monotonic() - start, attempts[name])
+                    if is_hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+            if hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                for name in calls:
+                    if name not in results and name not in hedged:
+                        hedge(name)
+
+        for name in calls:
+            if name not in results:
+                error = TimeoutError(f"No answer within {deadline}s")
+                results[name] = FanOutResult(None, error, time.monotonic() - start, attempts[name])
+                with self._lock:
+                    self.timeouts += 1
+        with self._lock:
+            self.runs += 1
+        return results
+
+    def stats(self):
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'timeouts': self.timeouts,
+            }
+
+
+class Interval:
+    """
+    Thread-safe gate for periodic work: `due(seconds)` is true for one caller at
+    most every `seconds`, and for the first caller
+    """
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._last = None
+        self._lock = threading.Lock()
+
+    def due(self, seconds):
+        now = self.clock()
+        with self._lock:
+            if self._last is not None and now - self._last < seconds:
+                return False
+            self._last = now
+            return True
+
+
+class TokenBucket:
+    """
+    Blocking rate limiter: `rate_per_minute` units refill continuously up to
+    `capacity` (one minute's worth by default). `acquire` waits until enough
+    units are available. `adjust` settles the difference once the real cost of
+    a call is known, and may leave the bucket in debt.
+    """
+    def __init__(self, rate_per_minute, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity or rate_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waited = 0.0
+
+    def _refill(self):
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = (amount - self._tokens) / self.rate
+                self.waited += wait
+            self.sleep(wait)
+
+    def adjust(self, amount):
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
@@ -0,0 +1,196 @@
+"""
+Resumable batch job filling in missing PlantCare fields through PlantCareAI.
+
+Species are walked in id order, a chunk at a time. A bounded pool generates
+summaries behind shared request and token rate limits. Each chunk is written
+with one bulk_update, and the checkpoint is saved in the same transaction, so
+an interrupted run resumes after the last chunk it finished.
+
+A run stops when the OpenAI circuit breaker opens. The checkpoint then stays
+before the first species turned away, so the next run picks it up again.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .breakers import CLOSED, breakers
+from .catalog import catalog
+from .concurrency import TokenBucket
+from .models import BatchCheckpoint, Plant, PlantCare
+from .search import species_index
+from .signals import touch_plants_on_care_change
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'care_enrichment'
+
+# _enrich result for a species turned away while OpenAI is unavailable
+DEFERRED = object()
+
+# PlantCare field -> care summary key it is filled from
+ENRICH_FIELDS = {
+    'light_requirements': 'light_needs',
+    'humidity_level': 'humidity_needs',
+    'temperature_range': 'temperature_range',
+    'soil_type': 'soil_needs',
+    'fertilizer_frequency': 'fertilizer_needs',
+    'care_summary': 'summary',
+}
+
+
+def get_enrichment_config():
+    config = {
+        'WORKERS': 4,
+        'REQUESTS_PER_MINUTE': 60,
+        'TOKENS_PER_MINUTE': 60000,
+        'TOKENS_PER_REQUEST': 1200,
+        'CHUNK_SIZE': 50,
+    }
+    config.update(getattr(settings, 'CARE_ENRICHMENT_CONFIG', {}))
+    return config
+
+
+def missing_fields_filter():
+    condition = Q()
+    for field in ENRICH_FIELDS:
+        condition |= Q(**{f'{field}__isnull': True}) | Q(**{field: ''})
+    return condition
+
+
+def _is_missing(value):
+    return value is None or value == ''
+
+
+def fill_missing(row, summary):
+    """
+    Values from `summary` for the fields `row` lacks; existing values are kept
+    """
+    filled = {}
+    for field, key in ENRICH_FIELDS.items():
+        value = summary.get(key)
+        if _is_missing(row[field]) and isinstance(value, str) and value.strip():
+            max_length = PlantCare._meta.get_field(field).max_length
+            filled[field] = value.strip()[:max_length] if max_length else value.strip()
+    return filled
+
+
+class CareEnrichment:
+    """
+    One run of the job. `generate` takes a plant name and `before_attempt` /
+    `after_attempt` callables, and returns a care summary dict (with an 'error'
+    key on failure); it defaults to PlantCareAI. The rate limits are taken per
+    model attempt, so ladder fallbacks and hedges count too. Each attempt takes
+    `tokens_per_request` up front, settled against its real token usage once
+    it finishes.
+    """
+    def __init__(self, workers=4, requests_per_minute=60, tokens_per_minute=60000,
+                 tokens_per_request=1200, chunk_size=50, generate=None):
+        if generate is None:
+            from .views import PlantCareAI
+            generate = PlantCareAI.generate_plant_care_summary
+        self.generate = generate
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.tokens_per_request = tokens_per_request
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def _acquire(self):
+        self.requests.acquire()
+        self.tokens.acquire(self.tokens_per_request)
+
+    def _settle(self, usage):
+        total_tokens = getattr(usage, 'total_tokens', None)
+        if total_tokens is not None:
+            self.tokens.adjust(total_tokens - self.tokens_per_request)
+
+    def _enrich(self, row):
+        try:
+            summary = self.generate(row['scientific_name'] or row['name'],
+                                    before_attempt=self._acquire, after_attempt=self._settle)
+            if 'error' in summary and breakers['OpenAI'].state != CLOSED:
+                return DEFERRED
+            if 'error' in summary:
+                logger.warning("No care summary for %s: %s", row['name'], summary.get('message'))
+                return None
+            return fill_missing(row, summary)
+        except Exception:
+            logger.exception("Enriching %s failed", row['name'])
+            return None
+        finally:
+            # Pool threads each hold a connection from the usage logging
+            connection.close()
+
+    def _write(self, rows, results, position, checkpoint, stats):
+        now = timezone.now()
+        changed = []
+        for row, filled in zip(rows, results):
+            if filled and filled is not DEFERRED:
+                values = {field: row[field] for field in ENRICH_FIELDS}
+                values.update(filled)
+                changed.append((PlantCare(id=row['id'], last_updated=now, **values), row))
+        stats['enriched'] += len(changed)
+        with transaction.atomic():
+            PlantCare.objects.bulk_update(
+                [plant_care for plant_care, _ in changed], [*ENRICH_FIELDS, 'last_updated'])
+            touched = []
+            for plant_care, row in changed:
+                if plant_care.fertilizer_frequency != row['fertilizer_frequency']:
+                    # Fertilizing due dates follow the species frequency, as on a normal save
+                    plant_care.water_frequency = row['water_frequency']
+                    touch_plants_on_care_change(PlantCare, plant_care, created=False)
+                else:
+                    touched.append(plant_care.id)
+            if touched:
+                # Plants embed their care, so delta-sync clients must see them change
+                Plant.objects.filter(care_id__in=touched).update(updated_at=now)
+            checkpoint.position = position
+            checkpoint.stats = dict(stats)
+            checkpoint.save(update_fields=['position', 'stats', 'updated_at'])
+
+    def run(self, limit=None, restart=False, progress=None):
+        """
+        Enrich species after the checkpoint; returns the run's stats
+        """
+        checkpoint, _ = BatchCheckpoint.objects.get_or_create(name=CHECKPOINT_NAME)
+        if restart:
+            checkpoint.position = 0
+        stats = {'processed': 0, 'enriched': 0, 'failed': 0, 'seconds': 0.0, 'start_position': checkpoint.position}
+        start = time.perf_counter()
+        queryset = PlantCare.objects.filter(missing_fields_filter()).order_by('id').values(
+            'id', 'name', 'scientific_name', 'water_frequency', *ENRICH_FIELDS)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='care-enrichment') as executor:
+            while limit is None or stats['processed'] < limit:
+                size = self.chunk_size if limit is None else min(self.chunk_size, limit - stats['processed'])
+                rows = list(queryset.filter(id__gt=checkpoint.position)[:size])
+                if not rows:
+                    break
+                results = list(executor.map(self._enrich, rows))
+                # Species from the first deferred one on are retried by the next run
+                done = next((i for i, filled in enumerate(results) if filled is DEFERRED), len(rows))
+                stats['processed'] += done
+                stats['failed'] += sum(1 for filled in results[:done] if filled is None)
+                stats['seconds'] = time.perf_counter() - start
+                position = rows[done - 1]['id'] if done else checkpoint.position
+                self._write(rows, results, position, checkpoint, stats)
+                if progress:
+                    progress(stats, checkpoint.position)
+                if done < len(rows):
+                    stats['stopped'] = "OpenAI is unavailable"
+                    logger.warning("Stopping at species %s: OpenAI circuit breaker is open", rows[done]['id'])
+                    break
+
+        if stats['enriched']:
+            # bulk_update sends no signals; other servers catch up within their max age
+            catalog.invalidate()
+            species_index.invalidate()
+        stats['seconds'] = time.perf_counter() - start
+        stats['rate_limited_seconds'] = round(self.requests.waited + self.tokens.waited, 3)
+        return stats
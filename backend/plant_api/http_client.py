@@ -0,0 +1,117 @@
+"""
+Shared HTTP client for outbound integrations (Perenual, Trefle, Google certificates).
+
+One pooled requests.Session per process keeps connections alive between calls,
+applies connect/read timeouts to every request and retries 429/5xx answers and
+failed connects with jittered exponential backoff. A server's Retry-After is
+honoured up to BACKOFF_MAX, so no retry outlasts the callers' deadlines.
+"""
+
+import threading
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CappedRetry(Retry):
+    """
+    Retry that honours Retry-After only up to `retry_after_max` seconds. urllib3
+    otherwise sleeps for whatever the server asks, past any caller's deadline.
+    """
+    def __init__(self, *args, retry_after_max=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after_max = retry_after_max
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.retry_after_max = self.retry_after_max
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None or self.retry_after_max is None:
+            return retry_after
+        return min(retry_after, self.retry_after_max)
+
+
+class TimeoutSession(requests.Session):
+    """
+    Session that falls back to a default (connect, read) timeout, so no request
+    can wait on a stalled server forever
+    """
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+def build_session(config):
+    """
+    Build a pooled session from an HTTP_CLIENT_CONFIG-shaped dict
+    """
+    retry = CappedRetry(
+        total=config['RETRIES'],
+        connect=config['RETRIES'],
+        # A read timeout means the server is stalled; retrying would only multiply the wait
+        read=False,
+        status=config['RETRIES'],
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        backoff_factor=config['BACKOFF_FACTOR'],
+        backoff_jitter=config['BACKOFF_JITTER'],
+        backoff_max=config['BACKOFF_MAX'],
+        respect_retry_after_header=True,
+        retry_after_max=config['BACKOFF_MAX'],
+        # Hand the last response back so callers see the real status
+        raise_on_status=False,
+    )
+    # Pools are kept per host: POOL_CONNECTIONS hosts, POOL_MAXSIZE connections each
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=config['POOL_CONNECTIONS'],
+        pool_maxsize=config['POOL_MAXSIZE'],
+        pool_block=config['POOL_BLOCK'],
+    )
+    session = TimeoutSession(timeout=(config['CONNECT_TIMEOUT'], config['READ_TIMEOUT']))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_session = None
+_lock = threading.Lock()
+
+
+def get_session():
+    """
+    The process-wide session, created on first use (after any worker fork)
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = build_session(settings.HTTP_CLIENT_CONFIG)
+    return _session
+
+
+def reset_session():
+    """
+    Close the shared session; the next call builds a new one from current settings
+    """
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get(url, **kwargs):
+    return get_session().get(url, **kwargs)
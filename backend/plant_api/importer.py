@@ -0,0 +1,180 @@
+"""
+Offline bulk import of species into PlantCare from CSV or JSON Lines files.
+Rows are streamed and upserted in chunks on species_key, so memory stays flat
+however large the file is and re-running an import updates rows in place.
+Columns a row leaves out or blank keep the species' existing values.
+"""
+
+import csv
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import catalog
+from .models import DEFAULT_WATER_FREQUENCY, Plant, PlantCare, parse_frequency_days, species_key
+from .search import species_index
+from .signals import touch_plants_on_care_change
+
+# Column names accepted for each PlantCare field; the care summary names are
+# included so generated summaries can be imported as they are
+FIELD_ALIASES = {
+    'name': ('name', 'common_name', 'plant_name'),
+    'scientific_name': ('scientific_name', 'latin_name'),
+    'water_frequency': ('water_frequency', 'watering_days'),
+    'light_requirements': ('light_requirements', 'light_needs', 'light'),
+    'humidity_level': ('humidity_level', 'humidity_needs', 'humidity'),
+    'temperature_range': ('temperature_range', 'temperature'),
+    'soil_type': ('soil_type', 'soil_needs', 'soil'),
+    'fertilizer_frequency': ('fertilizer_frequency', 'fertilizer_needs'),
+    'care_summary': ('care_summary', 'summary'),
+}
+
+UPDATE_FIELDS = [*FIELD_ALIASES, 'last_updated']
+
+# Values for columns a new species' row leaves out; the name falls back to the scientific name
+NEW_SPECIES_DEFAULTS = {'water_frequency': DEFAULT_WATER_FREQUENCY, 'light_requirements': ''}
+
+
+def iter_records(path, format=None):
+    """
+    Yield one dict per row of a .csv or .jsonl file, reading it lazily
+    """
+    format = format or ('csv' if str(path).lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as source:
+        if format == 'csv':
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _clean(value, max_length=None):
+    if value is None:
+        return None
+    value = ' '.join(str(value).split())
+    if max_length:
+        value = value[:max_length]
+    return value or None
+
+
+def _water_frequency(value):
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else DEFAULT_WATER_FREQUENCY
+    return parse_frequency_days(str(value)) or DEFAULT_WATER_FREQUENCY
+
+
+def build_plant_care(record):
+    """
+    Map an input row to an unsaved PlantCare with its species_key set, or None
+    if the row has no usable name. Fields the row lacks are left None for
+    _upsert to fill in.
+    """
+    values = {}
+    for field, aliases in FIELD_ALIASES.items():
+        values[field] = next((record[alias] for alias in aliases if record.get(alias) not in (None, '')), None)
+
+    text_fields = [field for field in FIELD_ALIASES if field not in ('water_frequency', 'care_summary')]
+    for field in text_fields:
+        values[field] = _clean(values[field], PlantCare._meta.get_field(field).max_length)
+    values['care_summary'] = (values['care_summary'] or '').strip() or None
+
+    key = species_key(values['scientific_name'] or values['name'])
+    if key is None:
+        return None
+    values['water_frequency'] = _water_frequency(values['water_frequency'])
+    return PlantCare(species_key=key, **values)
+
+
+def _fill_missing(plant_care, existing):
+    """
+    Keep the stored value of every field the import left out, or use the
+    defaults for a new species
+    """
+    for field in FIELD_ALIASES:
+        if getattr(plant_care, field) is not None:
+            continue
+        if existing is not None:
+            value = existing[field]
+        elif field == 'name':
+            value = plant_care.scientific_name
+        else:
+            value = NEW_SPECIES_DEFAULTS.get(field)
+        setattr(plant_care, field, value)
+
+
+def _upsert(batch):
+    """
+    Upsert one chunk. As the post_save receiver would, plants of existing species
+    whose values changed are touched for delta sync, and get their due dates
+    recomputed when a frequency moved.
+    """
+    before = {
+        row['species_key']: row
+        for row in PlantCare.objects.filter(species_key__in=batch).values('id', 'species_key', *FIELD_ALIASES)
+    }
+    for key, plant_care in batch.items():
+        _fill_missing(plant_care, before.get(key))
+    with transaction.atomic():
+        PlantCare.objects.bulk_create(
+            batch.values(),
+            update_conflicts=True,
+            unique_fields=['species_key'],
+            update_fields=UPDATE_FIELDS,
+        )
+        changed = []
+        for key, row in before.items():
+            plant_care = batch[key]
+            if all(getattr(plant_care, field) == row[field] for field in FIELD_ALIASES):
+                continue
+            if (plant_care.water_frequency, plant_care.fertilizer_frequency) != (
+                    row['water_frequency'], row['fertilizer_frequency']):
+                plant_care.pk = row['id']
+                touch_plants_on_care_change(PlantCare, plant_care, created=False)
+            else:
+                changed.append(row['id'])
+        if changed:
+            # Due dates stand; one UPDATE covers the rest of the chunk
+            Plant.objects.filter(care_id__in=changed).update(updated_at=timezone.now())
+    return len(before)
+
+
+def import_species(records, chunk_size=1000, progress=None):
+    """
+    Upsert PlantCare rows from an iterable of dicts. `progress` is called with the
+    running stats after every chunk. Returns the final stats.
+    """
+    stats = {'read': 0, 'imported': 0, 'updated': 0, 'skipped': 0, 'seconds': 0.0}
+    start = time.perf_counter()
+    records = iter(records)
+    while True:
+        rows = list(islice(records, chunk_size))
+        if not rows:
+            break
+        # Later rows win, so a species repeated in the file is written once per chunk
+        batch = {}
+        for record in rows:
+            plant_care = build_plant_care(record)
+            if plant_care is None:
+                stats['skipped'] += 1
+            else:
+                batch[plant_care.species_key] = plant_care
+        stats['read'] += len(rows)
+        if batch:
+            stats['updated'] += _upsert(batch)
+            stats['imported'] += len(batch)
+        stats['seconds'] = time.perf_counter() - start
+        if progress:
+            progress(stats)
+
+    # bulk_create sends no signals. This only reaches the current process; servers
+    # pick the rows up within their catalog and index max age.
+    catalog.invalidate()
+    species_index.invalidate()
+    stats['seconds'] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,133 @@
+"""
+Background care-generation jobs. Requests record a CareGenerationJob and answer
+202 straight away; a bounded thread pool does the slow Perenual / Trefle / OpenAI
+work and stores the outcome on the job for clients to poll.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CareGenerationJob
+
+logger = logging.getLogger(__name__)
+
+
+class CareGenerationError(Exception):
+    """
+    Generation finished without usable care data
+    """
+
+
+class CareJobQueue:
+    """
+    Runs registered job kinds on a process-wide pool.
+
+    Active jobs with the same kind and key are shared between requests. A job
+    whose process died is picked up again once it has been idle for
+    `stale_seconds` and someone polls it. With `workers=0` jobs run inline when
+    the enqueuing transaction commits, which tests and debugging rely on.
+    """
+    def __init__(self, workers=4, stale_seconds=300):
+        self.workers = workers
+        self.stale_seconds = stale_seconds
+        self._runners = {}
+        self._executor = None
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def register(self, kind):
+        """
+        Decorator for the function running `kind` jobs. It receives the job params
+        as keyword arguments and returns (JSON result, PlantCare or None).
+        """
+        def decorator(fn):
+            self._runners[kind] = fn
+            return fn
+        return decorator
+
+    def enqueue(self, kind, key, params, uid=None):
+        """
+        Returns (job, created); the user's active job for the same kind and key is
+        reused. Jobs aren't shared between users, who can only poll their own.
+        """
+        job = (
+            CareGenerationJob.objects
+            .filter(kind=kind, key=key, uid=uid, status__in=CareGenerationJob.ACTIVE_STATUSES)
+            .order_by('created_at').first()
+        )
+        if job is not None and not self.is_stale(job):
+            return job, False
+
+        job = CareGenerationJob.objects.create(kind=kind, key=key, params=params, uid=uid)
+        transaction.on_commit(lambda: self.submit(job.pk))
+        return job, True
+
+    def submit(self, job_id):
+        with self._lock:
+            if job_id in self._running:
+                return
+            self._running.add(job_id)
+            if self.workers and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='care-jobs')
+        if self.workers:
+            self._executor.submit(self._run_in_worker, job_id)
+        else:
+            self.run(job_id)
+
+    def is_stale(self, job):
+        return job.updated_at < timezone.now() - timedelta(seconds=self.stale_seconds)
+
+    def resume_if_stale(self, job):
+        """
+        Restart an active job nobody has touched for `stale_seconds`
+        """
+        if job.status not in CareGenerationJob.ACTIVE_STATUSES or not self.is_stale(job):
+            return False
+        with self._lock:
+            if job.pk in self._running:
+                return False
+        CareGenerationJob.objects.filter(pk=job.pk).update(status='pending', updated_at=timezone.now())
+        self.submit(job.pk)
+        return True
+
+    def _run_in_worker(self, job_id):
+        try:
+            self.run(job_id)
+        finally:
+            # Pool threads keep their own connections; don't leak one per job
+            connection.close()
+
+    def run(self, job_id):
+        try:
+            job = CareGenerationJob.objects.get(pk=job_id)
+            CareGenerationJob.objects.filter(pk=job_id).update(status='running', updated_at=timezone.now())
+            try:
+                result, plant_care = self._runners[job.kind](**job.params)
+            except Exception as exc:
+                logger.exception("Care generation job %s failed", job_id)
+                CareGenerationJob.objects.filter(pk=job_id).update(
+                    status='failed', error_message=str(exc), updated_at=timezone.now(), finished_at=timezone.now())
+            else:
+                CareGenerationJob.objects.filter(pk=job_id).update(
+                    status='succeeded', result=result, plant_care=plant_care,
+                    updated_at=timezone.now(), finished_at=timezone.now())
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {'workers': self.workers, 'running': len(self._running)}
+
+
+_config = getattr(settings, 'CARE_JOBS_CONFIG', {})
+care_jobs = CareJobQueue(
+    workers=_config.get('WORKERS', 4),
+    stale_seconds=_config.get('STALE_SECONDS', 300),
+)
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from plant_api.enrichment import CareEnrichment, get_enrichment_config
+
+
+class Command(BaseCommand):
+    help = "Fill in missing PlantCare fields through OpenAI, resuming after the last finished chunk"
+
+    def add_arguments(self, parser):
+        config = get_enrichment_config()
+        parser.add_argument('--workers', type=int, default=config['WORKERS'],
+                            help="Concurrent generations")
+        parser.add_argument('--requests-per-minute', type=int, default=config['REQUESTS_PER_MINUTE'])
+        parser.add_argument('--tokens-per-minute', type=int, default=config['TOKENS_PER_MINUTE'])
+        parser.add_argument('--chunk-size', type=int, default=config['CHUNK_SIZE'],
+                            help="Species generated and written per checkpoint")
+        parser.add_argument('--limit', type=int, help="Stop after this many species")
+        parser.add_argument('--restart', action='store_true',
+                            help="Start from the first species again, retrying earlier failures")
+
+    def handle(self, *args, **options):
+        config = get_enrichment_config()
+
+        def progress(stats, position):
+            self.stdout.write(
+                f"{stats['processed']} species processed, {stats['enriched']} enriched, "
+                f"{stats['failed']} failed (checkpoint {position})")
+
+        stats = CareEnrichment(
+            workers=options['workers'],
+            requests_per_minute=options['requests_per_minute'],
+            tokens_per_minute=options['tokens_per_minute'],
+            tokens_per_request=config['TOKENS_PER_REQUEST'],
+            chunk_size=options['chunk_size'],
+        ).run(limit=options['limit'], restart=options['restart'],
+              progress=progress if options['verbosity'] > 1 else None)
+        self.stdout.write(
+            f"Enriched {stats['enriched']} of {stats['processed']} species, {stats['failed']} failed "
+            f"in {stats['seconds']:.2f}s ({stats['rate_limited_seconds']:.2f}s waiting on rate limits)"
+        )
+        if 'stopped' in stats:
+            self.stdout.write(f"Stopped early: {stats['stopped']}. Run again to continue.")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from plant_api.importer import import_species, iter_records
+
+
+class Command(BaseCommand):
+    help = "Stream species from a CSV or JSON Lines file into PlantCare, upserting on the species key"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON Lines file")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format; guessed from the extension by default")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Rows upserted per statement")
+
+    def handle(self, *args, **options):
+        def progress(stats):
+            rate = stats['read'] / stats['seconds'] if stats['seconds'] else 0
+            self.stdout.write(f"{stats['read']} rows read, {stats['imported']} upserted ({rate:.0f} rows/s)")
+
+        try:
+            records = iter_records(options['path'], options['format'])
+            stats = import_species(records, chunk_size=options['chunk_size'],
+                                   progress=progress if options['verbosity'] > 0 else None)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Import failed: {exc}")
+
+        rate = stats['read'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(
+            f"Imported {stats['imported']} species ({stats['updated']} updated), "
+            f"skipped {stats['skipped']} rows in {stats['seconds']:.2f}s ({rate:.0f} rows/s)"
+        )
@@ -0,0 +1,55 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from plant_api.models import ApiUsage
+from plant_api.usage_stats import generation_stats
+
+
+def _parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Not a date or datetime: {value}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def _number(value, format='.0f'):
+    return '-' if value is None else f'{value:{format}}'
+
+
+class Command(BaseCommand):
+    help = "Latency, tokens and cost per care summary generation, per model, optionally before and after a date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help="Look back this many days")
+        parser.add_argument('--split', help="Compare calls before and after this date or datetime, e.g. a deploy")
+
+    def handle(self, *args, **options):
+        calls = ApiUsage.objects.filter(
+            api_name='OpenAI', request_time__gte=timezone.now() - timedelta(days=options['days']))
+        if options['split']:
+            split = _parse_moment(options['split'])
+            windows = [('before', calls.filter(request_time__lt=split)),
+                       ('after', calls.filter(request_time__gte=split))]
+        else:
+            windows = [('all', calls)]
+
+        self.stdout.write(
+            f"{'window':<7} {'model':<26} {'calls':>6} {'errors':>6} {'hits':>6} {'p50 ms':>7} {'p95 ms':>7} "
+            f"{'prompt':>7} {'compl.':>7} {'USD/call':>10}")
+        for window, queryset in windows:
+            models = sorted(set(queryset.values_list('model', flat=True)))
+            for model in models:
+                stats = generation_stats(queryset.filter(model=model))
+                self.stdout.write(
+                    f"{window:<7} {model or '(unknown)':<26} {stats['calls']:>6} {stats['errors']:>6} "
+                    f"{stats['cache_hits']:>6} {_number(stats['p50_ms']):>7} {_number(stats['p95_ms']):>7} "
+                    f"{_number(stats['prompt_tokens']):>7} {_number(stats['completion_tokens']):>7} "
+                    f"{_number(stats['cost_per_call'], '.6f'):>10}")
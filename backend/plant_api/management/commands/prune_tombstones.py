@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from plant_api.models import PlantTombstone
+
+
+class Command(BaseCommand):
+    help = "Delete plant tombstones older than the delta-sync retention; older cursors get a full sync anyway"
+
+    def add_arguments(self, parser):
+        retention = getattr(settings, 'PLANT_SYNC_CONFIG', {}).get('TOMBSTONE_RETENTION_DAYS', 30)
+        parser.add_argument('--days', type=int, default=retention,
+                            help="Keep tombstones from this many days")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = PlantTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"Deleted {deleted} tombstones from before {cutoff.isoformat()}")
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from plant_api.reminders import get_reminder_config, get_sender, send_watering_reminders
+
+
+class Command(BaseCommand):
+    help = "Send one aggregated watering reminder per user for plants due within the window"
+
+    def add_arguments(self, parser):
+        config = get_reminder_config()
+        parser.add_argument('--window-hours', type=float, default=config['WINDOW_HOURS'],
+                            help="Remind about plants due within this many hours")
+        parser.add_argument('--chunk-size', type=int, default=config['CHUNK_SIZE'],
+                            help="Rows fetched per round trip from the database cursor")
+        parser.add_argument('--workers', type=int, default=config['WORKERS'],
+                            help="Concurrent sends")
+        parser.add_argument('--sender', default=config['SENDER'],
+                            help="Dotted path of the sender class")
+
+    def handle(self, *args, **options):
+        stats = send_watering_reminders(
+            sender=get_sender(options['sender']),
+            window=timedelta(hours=options['window_hours']),
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+        )
+        self.stdout.write(
+            f"Reminded {stats['users']} users about {stats['plants']} plants: "
+            f"{stats['sent']} sent, {stats['failed']} failed in {stats['seconds']:.2f}s"
+        )
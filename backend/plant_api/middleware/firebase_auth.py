@@ -1,8 +1,141 @@
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.http import JsonResponse
+import firebase_admin
 from firebase_admin import auth
 import re
 
+from .token_verifier import HttpCertSource, ID_TOKEN_CERT_URI, LocalTokenVerifier
+
+logger = logging.getLogger(__name__)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified Firebase ID tokens.
+
+    Entries are keyed by a SHA-256 digest of the raw token so the tokens
+    themselves are never kept in memory. Decoded claims are served until the
+    token's own `exp`; rejected tokens are remembered for a short negative TTL
+    so a client retrying with a bad token doesn't trigger a verification each time.
+    """
+    def __init__(self, max_size=1024, negative_ttl=30):
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token):
+        """
+        Return (found, claims). `claims` is None for a cached rejection.
+        """
+        key = self._key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, claims = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    if claims is None:
+                        self.negative_hits += 1
+                    else:
+                        self.hits += 1
+                    return True, claims
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, token, claims):
+        expires_at = claims.get('exp')
+        if not expires_at or expires_at <= time.time():
+            return
+        self._store(self._key(token), float(expires_at), claims)
+
+    def reject(self, token):
+        if self.negative_ttl > 0:
+            self._store(self._key(token), time.time() + self.negative_ttl, None)
+
+    def _store(self, key, expires_at, claims):
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.negative_hits = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_auth_config = getattr(settings, 'FIREBASE_AUTH_CONFIG', {})
+token_cache = VerifiedTokenCache(
+    max_size=_auth_config.get('TOKEN_CACHE_SIZE', 1024),
+    negative_ttl=_auth_config.get('NEGATIVE_CACHE_TTL', 30),
+)
+
+_local_verifier = None
+_local_verifier_lock = threading.Lock()
+
+
+def get_local_verifier():
+    """
+    Return the shared LocalTokenVerifier, creating and starting it on first use.
+    Returns None when local verification is disabled in settings.
+    """
+    global _local_verifier
+    if _local_verifier is not None or not _auth_config.get('LOCAL_VERIFIER', False):
+        return _local_verifier
+
+    with _local_verifier_lock:
+        if _local_verifier is None:
+            project_id = _auth_config.get('PROJECT_ID') or firebase_admin.get_app().project_id
+            verifier = LocalTokenVerifier(
+                project_id,
+                source=HttpCertSource(_auth_config.get('CERT_URL') or ID_TOKEN_CERT_URI),
+                clock_skew_seconds=_auth_config.get('CLOCK_SKEW_SECONDS', 0),
+            )
+            verifier.start()
+            _local_verifier = verifier
+    return _local_verifier
+
+
 class FirebaseAuthMiddleware:
+    """
+    Authenticates requests with a Firebase ID token from the Authorization header.
+
+    Supports both sync (WSGI) and async (ASGI) stacks; in async mode cache hits are
+    served inline and only actual signature verification runs in a worker thread.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
         # Only exact or specific paths are allowed without auth
@@ -12,24 +145,86 @@ class FirebaseAuthMiddleware:
             '/api/health/',
             '/api-docs/.*',
         ]
+        self.exempt_matcher = re.compile('|'.join(f'(?:{exempt_path})' for exempt_path in self.exempt_paths))
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        # Load signing certificates at startup rather than on the first request
+        get_local_verifier()
 
     def __call__(self, request):
-        path = request.path
+        if self.async_mode:
+            return self.__acall__(request)
 
         # Use exact match for exempted paths
-        for exempt_path in self.exempt_paths:
-            if re.fullmatch(exempt_path, path):
-                return self.get_response(request)
+        if self.exempt_matcher.fullmatch(request.path):
+            return self.get_response(request)
 
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if not auth_header.startswith('Bearer '):
+        token = self.get_bearer_token(request)
+        if token is None:
             return JsonResponse({'error': 'Authorization header missing or invalid'}, status=401)
 
-        token = auth_header.split('Bearer ')[1]
-        try:
-            decoded_token = auth.verify_id_token(token)
-            request.firebase_user = decoded_token
-        except Exception:
+        decoded_token = self.verify_token(token)
+        if decoded_token is None:
             return JsonResponse({'error': 'Invalid or expired token'}, status=401)
+        request.firebase_user = decoded_token
 
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.exempt_matcher.fullmatch(request.path):
+            return await self.get_response(request)
+
+        token = self.get_bearer_token(request)
+        if token is None:
+            return JsonResponse({'error': 'Authorization header missing or invalid'}, status=401)
+
+        found, decoded_token = token_cache.get(token)
+        if not found:
+            decoded_token = await sync_to_async(self.verify_uncached, thread_sensitive=False)(token)
+        if decoded_token is None:
+            return JsonResponse({'error': 'Invalid or expired token'}, status=401)
+        request.firebase_user = decoded_token
+
+        return await self.get_response(request)
+
+    @staticmethod
+    def get_bearer_token(request):
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+        if not auth_header.startswith('Bearer '):
+            return None
+        return auth_header.split('Bearer ')[1]
+
+    @staticmethod
+    def verify_token(token):
+        """
+        Verify a Firebase ID token, consulting the verified-token cache first.
+        Returns the decoded claims, or None if the token is rejected.
+        """
+        found, claims = token_cache.get(token)
+        if found:
+            return claims
+        return FirebaseAuthMiddleware.verify_uncached(token)
+
+    @staticmethod
+    def verify_uncached(token):
+        """
+        Verify a token that missed the cache and record the outcome in it
+        """
+        verifier = get_local_verifier()
+        try:
+            if verifier is not None and verifier.ready:
+                claims = verifier.verify(token)
+            else:
+                claims = auth.verify_id_token(token)
+        except auth.InvalidIdTokenError:
+            # Only a verdict on the token itself is remembered
+            token_cache.reject(token)
+            return None
+        except Exception as e:
+            # Certificate fetches and transport errors pass; the next request tries again
+            logger.warning(f"Could not verify Firebase ID token: {str(e)}")
+            return None
+
+        token_cache.put(token, claims)
+        return claims
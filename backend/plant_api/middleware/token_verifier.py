@@ -0,0 +1,193 @@
+import logging
+import re
+import threading
+import time
+
+from firebase_admin import auth
+from google.auth import jwt
+
+from .. import http_client
+
+logger = logging.getLogger(__name__)
+
+ID_TOKEN_CERT_URI = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+ID_TOKEN_ISSUER_PREFIX = 'https://securetoken.google.com/'
+FIREBASE_CUSTOM_TOKEN_AUDIENCE = 'https://identitytoolkit.googleapis.com/google.identity.identitytoolkit.v1.IdentityToolkit'
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class HttpCertSource:
+    """
+    Fetches a `{kid: x509 PEM}` certificate map over HTTP.
+
+    Defaults to Google's securetoken endpoint; tests and benchmarks point it at
+    a local key server instead.
+    """
+    def __init__(self, url=ID_TOKEN_CERT_URI, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        """
+        Return (certs, max_age) where max_age comes from the Cache-Control header
+        """
+        response = http_client.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        match = _MAX_AGE_RE.search(response.headers.get('Cache-Control', ''))
+        max_age = int(match.group(1)) if match else None
+        return response.json(), max_age
+
+
+class LocalTokenVerifier:
+    """
+    Verifies Firebase ID tokens against a locally held copy of the signing certificates.
+
+    The certificates are refreshed by a daemon thread according to the source's
+    cache headers, so `verify` never downloads keys on the request thread. A
+    token signed with an unknown kid wakes the refresher (at most once per
+    min_refresh_interval) and is handed to `auth.verify_id_token` meanwhile,
+    rather than rejected. Claim checks mirror `firebase_admin.auth.verify_id_token`
+    and raise the same error types.
+    """
+    def __init__(self, project_id, source=None, clock_skew_seconds=0,
+                 refresh_margin=300, min_refresh_interval=60, retry_interval=30):
+        if clock_skew_seconds < 0 or clock_skew_seconds > 60:
+            raise ValueError(
+                f'Illegal clock_skew_seconds value: {clock_skew_seconds}. Must be between 0 and 60, inclusive.')
+        self.project_id = project_id
+        self.issuer = ID_TOKEN_ISSUER_PREFIX + project_id
+        self.source = source or HttpCertSource()
+        self.clock_skew_seconds = clock_skew_seconds
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        self.retry_interval = retry_interval
+
+        self._certs = {}
+        self._last_refresh = 0.0
+        self._last_attempt = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.refresh_count = 0
+        self.refresh_failures = 0
+
+    @property
+    def ready(self):
+        return bool(self._certs)
+
+    def start(self):
+        """
+        Load the certificates once and start the background refresher
+        """
+        if self._thread is not None:
+            return
+        delay = self.refresh()
+        self._thread = threading.Thread(
+            target=self._run, args=(delay,), name='firebase-cert-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def refresh(self):
+        """
+        Fetch the certificates now. Returns the number of seconds until the next refresh.
+        On failure the previous certificates are kept.
+        """
+        self._last_attempt = time.monotonic()
+        try:
+            certs, max_age = self.source.fetch()
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning(f"Failed to refresh Firebase signing certificates: {str(e)}")
+            return self.retry_interval
+
+        # Swap the whole mapping so readers never see a partial update
+        self._certs = dict(certs)
+        self._last_refresh = time.monotonic()
+        self.refresh_count += 1
+        if max_age is None:
+            return self.min_refresh_interval
+        return max(self.min_refresh_interval, max_age - self.refresh_margin)
+
+    def _run(self, delay):
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            delay = self.refresh()
+
+    def _request_refresh(self):
+        # Refreshes are rate limited by their start, so failing fetches aren't retried in a loop
+        if self._last_attempt is None or time.monotonic() - self._last_attempt >= self.min_refresh_interval:
+            self._wake.set()
+
+    def verify(self, token):
+        token = token.encode('utf-8') if isinstance(token, str) else token
+        if not isinstance(token, bytes) or not token:
+            raise ValueError(f'Illegal ID token provided: {token}. ID token must be a non-empty string.')
+
+        try:
+            header = jwt.decode_header(token)
+            payload = jwt.decode(token, verify=False)
+        except ValueError as error:
+            raise auth.InvalidIdTokenError(str(error), cause=error)
+
+        audience = payload.get('aud')
+        subject = payload.get('sub')
+        error_message = None
+        if audience == FIREBASE_CUSTOM_TOKEN_AUDIENCE:
+            error_message = 'verify_id_token() expects an ID token, but was given a custom token.'
+        elif not header.get('kid'):
+            error_message = 'Firebase ID token has no "kid" claim.'
+        elif header.get('alg') != 'RS256':
+            error_message = f'Firebase ID token has incorrect algorithm. Expected "RS256" but got "{header.get("alg")}".'
+        elif audience != self.project_id:
+            error_message = f'Firebase ID token has incorrect "aud" (audience) claim. Expected "{self.project_id}" but got "{audience}".'
+        elif payload.get('iss') != self.issuer:
+            error_message = f'Firebase ID token has incorrect "iss" (issuer) claim. Expected "{self.issuer}" but got "{payload.get("iss")}".'
+        elif subject is None or not isinstance(subject, str):
+            error_message = 'Firebase ID token has no "sub" (subject) claim.'
+        elif not subject:
+            error_message = 'Firebase ID token has an empty string "sub" (subject) claim.'
+        elif len(subject) > 128:
+            error_message = 'Firebase ID token has a "sub" (subject) claim longer than 128 characters.'
+        if error_message:
+            raise auth.InvalidIdTokenError(error_message)
+
+        certs = self._certs
+        if header['kid'] not in certs:
+            # An unknown kid usually means the keys rotated ahead of our schedule. The
+            # refresher fetches them; until then firebase_admin checks the token with
+            # its own certificate cache.
+            self._request_refresh()
+            return auth.verify_id_token(token)
+
+        try:
+            claims = jwt.decode(
+                token,
+                certs=certs,
+                audience=self.project_id,
+                clock_skew_in_seconds=self.clock_skew_seconds,
+            )
+        except ValueError as error:
+            if 'Token expired' in str(error):
+                raise auth.ExpiredIdTokenError(str(error), cause=error)
+            raise auth.InvalidIdTokenError(str(error), cause=error)
+
+        claims['uid'] = claims['sub']
+        return claims
+
+    def stats(self):
+        return {
+            'keys': len(self._certs),
+            'refreshes': self.refresh_count,
+            'refresh_failures': self.refresh_failures,
+            'seconds_since_refresh': round(time.monotonic() - self._last_refresh, 1) if self._last_refresh else None,
+        }
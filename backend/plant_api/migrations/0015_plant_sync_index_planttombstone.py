@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0014_alter_plant_last_fertilized_alter_plant_last_watered'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('plant_id', models.BigIntegerField()),
+                ('uid', models.CharField(help_text="Firebase UID of the plant's owner", max_length=500, null=True)),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['uid', 'updated_at'], name='plant_uid_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='planttombstone',
+            index=models.Index(fields=['uid', 'deleted_at'], name='tombstone_uid_deleted_idx'),
+        ),
+    ]
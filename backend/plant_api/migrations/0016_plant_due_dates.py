@@ -0,0 +1,90 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:00
+
+import re
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+# Frozen copies of plant_api.models as of this migration, so later edits there
+# don't change what the backfill computes
+DEFAULT_WATER_FREQUENCY = 7
+
+_FREQUENCY_UNITS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+_FREQUENCY_WORDS = {'biweekly': 14, 'fortnightly': 14, 'daily': 1, 'weekly': 7, 'monthly': 30, 'yearly': 365}
+_FREQUENCY_PATTERN = re.compile(r'(\d+)(?:\s*(?:-|to)\s*\d+)?\s*(day|week|month|year)s?\b')
+
+
+def parse_frequency_days(value):
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    text = str(value).strip().lower()
+    if text.isdigit():
+        return int(text) or None
+    match = _FREQUENCY_PATTERN.search(text)
+    if match:
+        days = int(match.group(1)) * _FREQUENCY_UNITS[match.group(2)]
+        return days if days > 0 else None
+    for word, days in _FREQUENCY_WORDS.items():
+        if word in text:
+            return days
+    return None
+
+
+def _due_after(last_done, days):
+    if days is None:
+        return None
+    return models.ExpressionWrapper(
+        Coalesce(last_done, 'created_at') + timedelta(days=days), output_field=models.DateTimeField()
+    )
+
+
+def backfill_due_dates(apps, schema_editor):
+    """
+    One UPDATE per PlantCare, plus one for plants without care
+    """
+    Plant = apps.get_model('plant_api', 'Plant')
+    PlantCare = apps.get_model('plant_api', 'PlantCare')
+    for care in PlantCare.objects.only('id', 'water_frequency', 'fertilizer_frequency').iterator():
+        Plant.objects.filter(care=care).update(
+            next_water_due=_due_after('last_watered', care.water_frequency),
+            next_fertilize_due=_due_after('last_fertilized', parse_frequency_days(care.fertilizer_frequency)),
+        )
+    Plant.objects.filter(care__isnull=True).update(
+        next_water_due=_due_after('last_watered', DEFAULT_WATER_FREQUENCY),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0015_plant_sync_index_planttombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='next_fertilize_due',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='next_water_due',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['uid', 'next_water_due'], name='plant_uid_water_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['uid', 'next_fertilize_due'], name='plant_uid_fertilize_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['next_water_due'], name='plant_water_due_idx'),
+        ),
+        migrations.RunPython(backfill_due_dates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:30
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copies of plant_api.models as of this migration, so later edits there
+# don't change the stored keys
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_NON_ALNUM.sub(' ', text.casefold()).split())
+
+
+def species_key(name):
+    return ' '.join(word for word in normalize(name).split() if word != 'x')[:255] or None
+
+
+def backfill_species_keys(apps, schema_editor):
+    """
+    The oldest row of each species gets the key; later duplicates keep null
+    """
+    PlantCare = apps.get_model('plant_api', 'PlantCare')
+    seen = set()
+    updated = []
+    for care in PlantCare.objects.order_by('id').only('id', 'name', 'scientific_name').iterator():
+        key = species_key(care.scientific_name or care.name)
+        if key and key not in seen:
+            seen.add(key)
+            care.species_key = key
+            updated.append(care)
+    PlantCare.objects.bulk_update(updated, ['species_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0016_plant_due_dates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantcare',
+            name='species_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.RunPython(backfill_species_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='plantcare',
+            name='species_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True, unique=True),
+        ),
+    ]
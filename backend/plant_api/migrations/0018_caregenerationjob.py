@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:16
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0017_plantcare_species_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareGenerationJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('plant_care', 'PlantCare creation'), ('care_summary', 'Care summary')], max_length=20)),
+                ('key', models.CharField(help_text='Species key; active jobs with the same kind and key are shared', max_length=255)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('uid', models.CharField(help_text='Firebase UID of the requesting user', max_length=500, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('plant_care', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='plant_api.plantcare')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'key', 'status'], name='care_job_lookup_idx')],
+            },
+        ),
+    ]
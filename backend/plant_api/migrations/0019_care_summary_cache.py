@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0018_caregenerationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiusage',
+            name='cache_hit',
+            field=models.BooleanField(default=False, help_text='Answered from a cache instead of calling the API'),
+        ),
+        migrations.AddField(
+            model_name='apiusage',
+            name='saved_time',
+            field=models.IntegerField(blank=True, help_text='Milliseconds the original call took, for cache hits', null=True),
+        ),
+        migrations.CreateModel(
+            name='CareSummaryCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='sha256 of normalized name, prompt hash and model', max_length=64, unique=True)),
+                ('plant_name', models.CharField(max_length=255)),
+                ('model', models.CharField(max_length=100)),
+                ('summary', models.JSONField()),
+                ('generation_time', models.IntegerField(help_text='Milliseconds the original generation took')),
+                ('hits', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='care_cache_lru_idx'), models.Index(fields=['expires_at'], name='care_cache_expiry_idx')],
+            },
+        ),
+    ]
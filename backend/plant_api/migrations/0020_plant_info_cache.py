@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0019_care_summary_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantInfoCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=20)),
+                ('query', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, default=list)),
+                ('failed', models.BooleanField(default=False, help_text='The lookup errored; cached briefly like an empty result')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'unique_together': {('source', 'query')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0021_batchcheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apiusage',
+            name='completion_tokens',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='apiusage',
+            name='cost',
+            field=models.DecimalField(blank=True, decimal_places=8, help_text='USD, from the configured pricing', max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='apiusage',
+            name='model',
+            field=models.CharField(blank=True, default='', help_text='Model used, for OpenAI calls', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='apiusage',
+            name='prompt_tokens',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
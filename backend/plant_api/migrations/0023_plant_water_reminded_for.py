@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0022_apiusage_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='water_reminded_for',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
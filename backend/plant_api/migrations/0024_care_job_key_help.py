@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plant_api', '0023_plant_water_reminded_for'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='caregenerationjob',
+            name='key',
+            field=models.CharField(help_text="Species key; a user's active jobs with the same kind and key are shared", max_length=255),
+        ),
+    ]
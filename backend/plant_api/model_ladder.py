@@ -0,0 +1,212 @@
+"""
+Care summary model ladder. Models are tried cheapest first: when one fails or
+runs past its latency budget, the next is started, and the first valid answer
+wins. Optionally the first two race from the start.
+
+Routing follows recent latency percentiles from ApiUsage. A model whose
+percentile is over the budget moves behind the others. The wait before
+starting the next model is the running model's percentile, when that is
+shorter than the budget.
+
+Calls run on a shared pool and never touch the database there. Outcomes are
+logged by the calling thread; calls still running when the caller returns
+are logged by the next run.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ApiUsage
+from .usage_stats import percentile
+
+
+class ModelLadder:
+
+    def __init__(self, models, latency_budget=8.0, race=False, latency_percentile=0.95,
+                 window=3600, min_calls=20, refresh_seconds=60, workers=8):
+        if not models:
+            raise ValueError("A model ladder needs at least one model")
+        self.models = list(models)
+        self.latency_budget = latency_budget
+        self.race = race
+        self.latency_percentile = latency_percentile
+        self.window = window
+        self.min_calls = min_calls
+        self.refresh_seconds = refresh_seconds
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._checked_at = None
+        self._late = deque()
+        self.wins = dict.fromkeys(self.models, 0)
+        self.fallbacks = 0
+        self.hedges = 0
+        self.exhausted = 0
+
+    @property
+    def primary(self):
+        return self.models[0]
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='model-ladder')
+        return self._executor.submit(fn, *args)
+
+    def latencies(self):
+        """
+        {model: percentile latency in ms} for models with enough recent calls,
+        read from ApiUsage at most every `refresh_seconds`
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.refresh_seconds:
+                return self._latencies
+            self._checked_at = now
+
+        # Failed calls count too; timeouts are the slowest answers of all
+        rows = ApiUsage.objects.filter(
+            api_name='OpenAI', cache_hit=False, model__in=self.models,
+            request_time__gte=timezone.now() - timedelta(seconds=self.window),
+        ).values_list('model', 'response_time')
+        samples = {}
+        for model, response_time in rows:
+            samples.setdefault(model, []).append(response_time)
+        latencies = {
+            model: percentile(sorted(values), self.latency_percentile)
+            for model, values in samples.items() if len(values) >= self.min_calls
+        }
+        with self._lock:
+            self._latencies = latencies
+        return latencies
+
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = None
+
+    def order(self):
+        """
+        Models in the order they will be tried
+        """
+        latencies = self.latencies()
+        budget_ms = self.latency_budget * 1000
+        within = [model for model in self.models if latencies.get(model, 0) <= budget_ms]
+        over = sorted((model for model in self.models if model not in within), key=latencies.get)
+        return within + over
+
+    def hedge_after(self, model):
+        """
+        Seconds to wait on `model` before starting the next one
+        """
+        latency = self.latencies().get(model)
+        if latency is None:
+            return self.latency_budget
+        return min(self.latency_budget, latency / 1000)
+
+    @staticmethod
+    def _timed(call, model):
+        start = time.monotonic()
+        try:
+            result = call(model)
+        except Exception as exc:
+            return None, exc, time.monotonic() - start
+        return result, None, time.monotonic() - start
+
+    def _flush_late(self):
+        with self._lock:
+            finished = [late for late in self._late if late[2].done()]
+            for late in finished:
+                self._late.remove(late)
+        for log, model, future in finished:
+            log(model, *future.result())
+
+    def run(self, call, log, before_attempt=None):
+        """
+        Calls `call(model)` down the ladder until one returns. `log(model, result,
+        error, elapsed)` is called in this thread for every finished attempt.
+        `before_attempt()`, if given, is called in this thread before each model
+        is started, e.g. to take a rate limit. Returns (result, model); raises the
+        last error if every model failed.
+        """
+        self._flush_late()
+        remaining = self.order()
+        pending = {}
+        last_error = None
+
+        def start():
+            model = remaining.pop(0)
+            if before_attempt is not None:
+                before_attempt()
+            pending[self._submit(self._timed, call, model)] = model
+            return time.monotonic() + self.hedge_after(model)
+
+        hedge_at = start()
+        if self.race and remaining:
+            hedge_at = start()
+
+        try:
+            while pending:
+                timeout = max(hedge_at - time.monotonic(), 0) if remaining else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Over budget: start the next model alongside
+                    hedge_at = start()
+                    with self._lock:
+                        self.hedges += 1
+                    continue
+                for future in done:
+                    model = pending.pop(future)
+                    result, error, elapsed = future.result()
+                    log(model, result, error, elapsed)
+                    if error is None:
+                        with self._lock:
+                            self.wins[model] = self.wins.get(model, 0) + 1
+                        return result, model
+                    last_error = error
+                    if remaining:
+                        hedge_at = start()
+                        with self._lock:
+                            self.fallbacks += 1
+        finally:
+            with self._lock:
+                self._late.extend((log, model, future) for future, model in pending.items())
+
+        with self._lock:
+            self.exhausted += 1
+        raise last_error
+
+    def stats(self):
+        latencies = self.latencies()
+        with self._lock:
+            return {
+                'models': self.models,
+                'race': self.race,
+                'latency_budget_seconds': self.latency_budget,
+                f'p{round(self.latency_percentile * 100)}_ms': dict(latencies),
+                'wins': dict(self.wins),
+                'fallbacks': self.fallbacks,
+                'hedges': self.hedges,
+                'exhausted': self.exhausted,
+                'late_outcomes': len(self._late),
+            }
+
+
+def _ladder_from_config(config):
+    return ModelLadder(
+        config.get('MODELS') or ['gpt-4.1-nano-2025-04-14'],
+        latency_budget=config.get('LATENCY_BUDGET_SECONDS', 8.0),
+        race=config.get('RACE', False),
+        latency_percentile=config.get('ROUTING_PERCENTILE', 0.95),
+        window=config.get('ROUTING_WINDOW_SECONDS', 3600),
+        min_calls=config.get('ROUTING_MIN_CALLS', 20),
+    )
+
+
+care_models = _ladder_from_config(getattr(settings, 'OPENAI_CONFIG', {}))
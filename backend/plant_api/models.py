@@ -1,8 +1,66 @@
+import re
+import unicodedata
+import uuid
+from datetime import timedelta
+
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
 from django.db import models
 
+# Used for plants without care info, matching the app's own fallback
+DEFAULT_WATER_FREQUENCY = 7
+
+_FREQUENCY_UNITS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+# Checked in order, so "biweekly" wins over "weekly"
+_FREQUENCY_WORDS = {'biweekly': 14, 'fortnightly': 14, 'daily': 1, 'weekly': 7, 'monthly': 30, 'yearly': 365}
+_FREQUENCY_PATTERN = re.compile(r'(\d+)(?:\s*(?:-|to)\s*\d+)?\s*(day|week|month|year)s?\b')
+
+
+def parse_frequency_days(value):
+    """
+    Interval in days from a free-text frequency such as "14", "every 2 weeks",
+    "4-6 weeks" (the shorter bound) or "monthly". None if no interval is found.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    text = str(value).strip().lower()
+    if text.isdigit():
+        return int(text) or None
+    match = _FREQUENCY_PATTERN.search(text)
+    if match:
+        days = int(match.group(1)) * _FREQUENCY_UNITS[match.group(2)]
+        return days if days > 0 else None
+    for word, days in _FREQUENCY_WORDS.items():
+        if word in text:
+            return days
+    return None
+
+
+_NON_ALNUM = re.compile(r'[\W_]+')
+
+
+def normalize(text):
+    """
+    "Árvácska", "ARVACSKA" and "arvácska!" all normalize to "arvacska"
+    """
+    text = text or ''
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(_NON_ALNUM.sub(' ', text.casefold()).split())
+
+
+def species_key(name):
+    """
+    De-duplication key for a species name; None if nothing is left after normalizing.
+    The hybrid marker is dropped, so "Viola × wittrockiana" and "Viola x wittrockiana" match.
+    """
+    return ' '.join(word for word in normalize(name).split() if word != 'x')[:255] or None
+
+
 class PlantCare(models.Model):
     """
     Model for plant care information, describing species-level data.
@@ -18,10 +76,21 @@ class PlantCare(models.Model):
     fertilizer_frequency = models.CharField(max_length=100, blank=True, null=True)
     care_summary = models.TextField(blank=True, null=True)
     last_updated = models.DateTimeField(auto_now=True)
+    # Normalized scientific name (or name), so spelling variants map to one species.
+    # Null only for duplicates that predate the key.
+    species_key = models.CharField(max_length=255, unique=True, null=True, blank=True, editable=False)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.species_key is not None:
+            self.species_key = species_key(self.scientific_name or self.name)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'species_key'}
+        super().save(*args, **kwargs)
+
 class Plant(models.Model):
     """
     Model for a user's plant instance.
@@ -35,10 +104,114 @@ class Plant(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     last_watered = models.DateTimeField(blank=True, null=True)
     last_fertilized = models.DateTimeField(blank=True, null=True)
+    # Materialized from the last care date and the PlantCare frequencies
+    next_water_due = models.DateTimeField(blank=True, null=True)
+    next_fertilize_due = models.DateTimeField(blank=True, null=True)
+    # next_water_due as of the last watering reminder, so re-runs don't remind twice
+    water_reminded_for = models.DateTimeField(blank=True, null=True)
+
+    DUE_FIELDS = ('next_water_due', 'next_fertilize_due')
+
+    class Meta:
+        indexes = [
+            # Delta sync scans a user's plants by modification time
+            models.Index(fields=['uid', 'updated_at'], name='plant_uid_updated_idx'),
+            # "What is due before X" is a range scan per user, or across users for reminders
+            models.Index(fields=['uid', 'next_water_due'], name='plant_uid_water_due_idx'),
+            models.Index(fields=['uid', 'next_fertilize_due'], name='plant_uid_fertilize_due_idx'),
+            models.Index(fields=['next_water_due'], name='plant_water_due_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def refresh_due_dates(self):
+        """
+        Recompute next_water_due / next_fertilize_due from the current care fields.
+        A plant that was never watered or fertilized counts from its creation.
+        """
+        start = self.created_at or timezone.now()
+        water_days = self.care.water_frequency if self.care else DEFAULT_WATER_FREQUENCY
+        self.next_water_due = (self.last_watered or start) + timedelta(days=water_days)
+        fertilize_days = parse_frequency_days(self.care.fertilizer_frequency) if self.care else None
+        if fertilize_days is None:
+            self.next_fertilize_due = None
+        else:
+            self.next_fertilize_due = (self.last_fertilized or start) + timedelta(days=fertilize_days)
+
+    def save(self, *args, **kwargs):
+        self.refresh_due_dates()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *self.DUE_FIELDS}
+        super().save(*args, **kwargs)
+
+class PlantTombstone(models.Model):
+    """
+    Record of a deleted plant, so delta-sync clients can drop their local copy.
+    """
+    plant_id = models.BigIntegerField()
+    uid = models.CharField(max_length=500, null=True, help_text="Firebase UID of the plant's owner")
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['uid', 'deleted_at'], name='tombstone_uid_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"Plant {self.plant_id} deleted at {self.deleted_at}"
+
+class CareGenerationJob(models.Model):
+    """
+    Background generation of species care data through the external plant APIs and OpenAI.
+    """
+    KIND_CHOICES = [
+        ('plant_care', 'PlantCare creation'),
+        ('care_summary', 'Care summary'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('pending', 'running')
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255, help_text="Species key; a user's active jobs with the same kind and key are shared")
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(blank=True, null=True)
+    error_message = models.TextField(blank=True, null=True)
+    plant_care = models.ForeignKey(PlantCare, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    uid = models.CharField(max_length=500, null=True, help_text="Firebase UID of the requesting user")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'key', 'status'], name='care_job_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} job for {self.key}: {self.status}"
+
+class BatchCheckpoint(models.Model):
+    """
+    Progress of a resumable batch job: the last PlantCare id it finished
+    """
+    name = models.CharField(max_length=100, unique=True)
+    position = models.BigIntegerField(default=0)
+    stats = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.position}"
+
 class AdUnit(models.Model):
     """
     Model for AdMob ad units configuration.
@@ -139,10 +312,57 @@ class ApiUsage(models.Model):
     response_time = models.IntegerField(help_text="Response time in milliseconds")
     success = models.BooleanField(default=True)
     error_message = models.TextField(blank=True, null=True)
+    cache_hit = models.BooleanField(default=False, help_text="Answered from a cache instead of calling the API")
+    saved_time = models.IntegerField(blank=True, null=True, help_text="Milliseconds the original call took, for cache hits")
+    model = models.CharField(max_length=100, blank=True, default='', help_text="Model used, for OpenAI calls")
+    prompt_tokens = models.IntegerField(blank=True, null=True)
+    completion_tokens = models.IntegerField(blank=True, null=True)
+    cost = models.DecimalField(max_digits=12, decimal_places=8, blank=True, null=True, help_text="USD, from the configured pricing")
     
     def __str__(self):
         return f"{self.api_name} - {self.endpoint} - {self.request_time}"
 
+class CareSummaryCacheEntry(models.Model):
+    """
+    Stored OpenAI care summary, keyed by plant name, prompt template and model.
+    """
+    key = models.CharField(max_length=64, unique=True, help_text="sha256 of normalized name, prompt hash and model")
+    plant_name = models.CharField(max_length=255)
+    model = models.CharField(max_length=100)
+    summary = models.JSONField()
+    generation_time = models.IntegerField(help_text="Milliseconds the original generation took")
+    hits = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['last_used_at'], name='care_cache_lru_idx'),
+            models.Index(fields=['expires_at'], name='care_cache_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"Care summary for {self.plant_name} ({self.model})"
+
+class PlantInfoCacheEntry(models.Model):
+    """
+    Cached Perenual / Trefle search result for a normalized query. Only the
+    fields used in the care summary prompt are kept.
+    """
+    source = models.CharField(max_length=20)
+    query = models.CharField(max_length=255)
+    data = models.JSONField(default=list, blank=True)
+    failed = models.BooleanField(default=False, help_text="The lookup errored; cached briefly like an empty result")
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ['source', 'query']
+
+    def __str__(self):
+        return f"{self.source} results for {self.query}"
+
 class ActiveUser(models.Model):
     """
     Model for tracking daily active users.
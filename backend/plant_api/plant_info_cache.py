@@ -0,0 +1,135 @@
+"""
+Cache of Perenual / Trefle search results per normalized query: a small
+in-process LRU in front of the PlantInfoCacheEntry table. Empty results and
+errors are cached too, for a shorter time, so typos and unknown plants don't
+send every retry back to the APIs.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .concurrency import Interval
+from .models import PlantInfoCacheEntry, normalize
+
+# The parts of each source's first search hit that go into the care summary prompt
+PROMPT_FIELDS = {
+    'perenual': ('common_name', 'scientific_name', 'other_name', 'cycle', 'watering', 'sunlight'),
+    'trefle': ('common_name', 'scientific_name', 'family', 'family_common_name', 'genus'),
+}
+
+
+def prompt_data(source, records):
+    """
+    Keep the first record, reduced to the fields used in the prompt
+    """
+    if not records:
+        return []
+    record = records[0]
+    return [{field: record[field] for field in PROMPT_FIELDS[source] if record.get(field) not in (None, '', [])}]
+
+
+def cache_query(plant_name):
+    return normalize(plant_name)[:255]
+
+
+class PlantInfoCache:
+    """
+    Results live for `ttl` seconds, empty results and failures for `negative_ttl`.
+    Expired rows are purged on a write at most every `evict_interval` seconds.
+    """
+    def __init__(self, ttl=7 * 24 * 3600, negative_ttl=900, hot_entries=512, evict_interval=300):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hot_entries = hot_entries
+        self.evict_interval = evict_interval
+        self._eviction = Interval()
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.hot_hits = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def get_many(self, sources, plant_name):
+        """
+        Returns {source: data} for the sources with a live entry; data may be []
+        """
+        query = cache_query(plant_name)
+        now = timezone.now()
+        found = {}
+        with self._lock:
+            for source in sources:
+                entry = self._hot.get((source, query))
+                if entry is not None and entry[1] > now:
+                    self._hot.move_to_end((source, query))
+                    found[source] = entry[0]
+                    self.hot_hits += 1
+
+        missing = [source for source in sources if source not in found]
+        if missing:
+            rows = PlantInfoCacheEntry.objects.filter(
+                source__in=missing, query=query, expires_at__gt=now,
+            ).values_list('source', 'data', 'expires_at')
+            for source, data, expires_at in rows:
+                found[source] = data
+                self._remember(source, query, data, expires_at)
+                with self._lock:
+                    self.hits += 1
+
+        with self._lock:
+            self.misses += sum(1 for source in sources if source not in found)
+            self.negative_hits += sum(1 for data in found.values() if not data)
+        return found
+
+    def set(self, source, plant_name, data, failed=False):
+        query = cache_query(plant_name)
+        now = timezone.now()
+        ttl = self.ttl if data and not failed else self.negative_ttl
+        expires_at = now + timedelta(seconds=ttl)
+        PlantInfoCacheEntry.objects.bulk_create(
+            [PlantInfoCacheEntry(source=source, query=query, data=data, failed=failed, expires_at=expires_at)],
+            update_conflicts=True,
+            unique_fields=['source', 'query'],
+            update_fields=['data', 'failed', 'expires_at'],
+        )
+        self._remember(source, query, data, expires_at)
+        # Reads skip expired rows anyway, so purging them can wait
+        if self._eviction.due(self.evict_interval):
+            self.evict(now)
+
+    def evict(self, now=None):
+        PlantInfoCacheEntry.objects.filter(expires_at__lte=now or timezone.now()).delete()
+
+    def _remember(self, source, query, data, expires_at):
+        with self._lock:
+            self._hot[(source, query)] = (data, expires_at)
+            self._hot.move_to_end((source, query))
+            while len(self._hot) > self.hot_entries:
+                self._hot.popitem(last=False)
+
+    def clear_hot(self):
+        with self._lock:
+            self._hot.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hot_entries': len(self._hot),
+                'hot_hits': self.hot_hits,
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+            }
+
+
+_config = getattr(settings, 'PLANT_INFO_CONFIG', {})
+plant_info_cache = PlantInfoCache(
+    ttl=_config.get('CACHE_TTL_SECONDS', 7 * 24 * 3600),
+    negative_ttl=_config.get('NEGATIVE_CACHE_TTL_SECONDS', 900),
+    hot_entries=_config.get('CACHE_HOT_ENTRIES', 512),
+    evict_interval=_config.get('CACHE_EVICT_INTERVAL_SECONDS', 300),
+)
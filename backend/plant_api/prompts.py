@@ -0,0 +1,80 @@
+"""
+Plant information for the care summary prompt. Perenual and Trefle hits are
+reduced to the facts that matter for care and written as compact
+"field: value" lines, dropping the least useful facts until the text fits a
+token budget.
+"""
+
+from django.conf import settings
+
+NO_PLANT_INFO = "No specific plant information available."
+
+# Prompt facts in priority order, each read from the first source that has it
+CARE_FACTS = (
+    ('scientific_name', (('trefle_data', 'scientific_name'), ('perenual_data', 'scientific_name'))),
+    ('watering', (('perenual_data', 'watering'),)),
+    ('sunlight', (('perenual_data', 'sunlight'),)),
+    ('cycle', (('perenual_data', 'cycle'),)),
+    ('family', (('trefle_data', 'family'),)),
+    ('common_name', (('trefle_data', 'common_name'), ('perenual_data', 'common_name'))),
+    ('other_names', (('perenual_data', 'other_name'),)),
+    ('family_common_name', (('trefle_data', 'family_common_name'),)),
+    ('genus', (('trefle_data', 'genus'),)),
+)
+
+# Longest list kept for a single fact, e.g. Perenual's other names
+MAX_LIST_ITEMS = 4
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for English text and JSON, about four characters a token
+    """
+    return (len(text) + 3) // 4
+
+
+def _first_record(plant_info, source):
+    records = plant_info.get(source)
+    if isinstance(records, list) and records and isinstance(records[0], dict):
+        return records[0]
+    return {}
+
+
+def _format(value):
+    if isinstance(value, (list, tuple)):
+        items = []
+        for item in value:
+            item = str(item).strip()
+            if item and item not in items:
+                items.append(item)
+        return ', '.join(items[:MAX_LIST_ITEMS])
+    return ' '.join(str(value).split()) if value is not None else ''
+
+
+def care_facts(plant_info):
+    """
+    [(fact, text)] in priority order, skipping facts no source has
+    """
+    if not isinstance(plant_info, dict):
+        return []
+    records = {source: _first_record(plant_info, source) for source in ('perenual_data', 'trefle_data')}
+    facts = []
+    for fact, fields in CARE_FACTS:
+        for source, field in fields:
+            text = _format(records[source].get(field))
+            if text:
+                facts.append((fact, text))
+                break
+    return facts
+
+
+def build_plant_info_text(plant_info, token_budget=None):
+    """
+    Prompt text for `plant_info`, at most `token_budget` estimated tokens
+    """
+    if token_budget is None:
+        token_budget = getattr(settings, 'OPENAI_CONFIG', {}).get('PROMPT_INFO_TOKENS', 150)
+    lines = [f'{fact}: {text}' for fact, text in care_facts(plant_info)]
+    while lines and estimate_tokens('\n'.join(lines)) > token_budget:
+        lines.pop()
+    return '\n'.join(lines) or NO_PLANT_INFO
@@ -0,0 +1,156 @@
+"""
+Server-side watering reminders: one aggregated notification per user for every
+plant due within a window, streamed from the database and sent by a bounded pool.
+
+A plant is reminded once per due date. Sent reminders record the due date they
+were for, so re-running the job skips them until the plant is watered or its
+due date otherwise moves.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Plant
+
+logger = logging.getLogger(__name__)
+
+# Longer lists are summarised so the payload stays within push size limits
+MAX_NAMES_IN_BODY = 10
+
+
+def get_reminder_config():
+    config = {
+        'SENDER': 'plant_api.reminders.LogSender',
+        'WINDOW_HOURS': 24,
+        'CHUNK_SIZE': 2000,
+        'WORKERS': 8,
+    }
+    config.update(getattr(settings, 'REMINDER_CONFIG', {}))
+    return config
+
+
+def get_sender(path=None):
+    return import_string(path or get_reminder_config()['SENDER'])()
+
+
+class LogSender:
+    """
+    Default sender: logs each notification. Replace with a push-service sender
+    via REMINDER_CONFIG['SENDER']; senders must be safe to call from several threads.
+    """
+    def send(self, notification):
+        logger.info("Watering reminder for %s: %s", notification['uid'], notification['body'])
+
+
+def build_notification(uid, plants):
+    """
+    Same content as the app's scheduleAggregatedNotificationIfNeeded
+    """
+    names = [name for _, name in plants]
+    if len(names) > MAX_NAMES_IN_BODY:
+        names = names[:MAX_NAMES_IN_BODY] + [f'and {len(plants) - MAX_NAMES_IN_BODY} more']
+    return {
+        'uid': uid,
+        'title': 'Time to water your plants!',
+        'body': f"The following need water: {', '.join(names)}",
+        'category': 'WATER_PLANT_CATEGORY',
+        'data': {'plantIds': [plant_id for plant_id, _ in plants]},
+    }
+
+
+def iter_due_plants(before, chunk_size):
+    """
+    (uid, id, name) for every plant due before `before` and not yet reminded about
+    that due date, ordered by uid so users can be grouped while streaming.
+    iterator() uses a server-side cursor where the database supports one, so
+    memory stays flat regardless of table size.
+    """
+    return (
+        Plant.objects.filter(next_water_due__lte=before, uid__isnull=False)
+        .exclude(water_reminded_for=F('next_water_due'))
+        .order_by('uid', 'id')
+        .values_list('uid', 'id', 'name')
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def mark_reminded(plant_ids, before, chunk_size):
+    """
+    Record the current due date of reminded plants. Plants watered since they
+    were read are now due after `before` and stay unmarked.
+    """
+    for start in range(0, len(plant_ids), chunk_size):
+        Plant.objects.filter(id__in=plant_ids[start:start + chunk_size], next_water_due__lte=before).update(
+            water_reminded_for=F('next_water_due'))
+
+
+def send_watering_reminders(sender=None, window=None, chunk_size=None, workers=None, now=None):
+    """
+    Dispatch one notification per user with plants due in the next `window`.
+
+    At most `workers` sends run at once and at most twice that many are queued,
+    so neither pending notifications nor plant rows accumulate in memory. Sent
+    plants are marked every `chunk_size` ids, and once more when the run ends
+    or fails, so a crash re-sends at most the last unmarked chunk.
+    Returns counters for the run.
+    """
+    config = get_reminder_config()
+    sender = sender or get_sender()
+    window = window if window is not None else timedelta(hours=config['WINDOW_HOURS'])
+    chunk_size = chunk_size or config['CHUNK_SIZE']
+    workers = workers or config['WORKERS']
+    before = (now or timezone.now()) + window
+
+    stats = {'users': 0, 'plants': 0, 'sent': 0, 'failed': 0}
+    reminded = []
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(workers * 2)
+
+    def deliver(notification):
+        try:
+            sender.send(notification)
+            outcome = 'sent'
+        except Exception:
+            logger.exception("Failed to send watering reminder to %s", notification['uid'])
+            outcome = 'failed'
+        finally:
+            slots.release()
+        with lock:
+            stats[outcome] += 1
+            if outcome == 'sent':
+                reminded.extend(notification['data']['plantIds'])
+
+    def flush(minimum):
+        # Marked from this thread, which owns the database connection
+        with lock:
+            if not reminded or len(reminded) < minimum:
+                return
+            batch = reminded[:]
+            reminded.clear()
+        mark_reminded(batch, before, chunk_size)
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reminders') as pool:
+            for uid, rows in groupby(iter_due_plants(before, chunk_size), key=itemgetter(0)):
+                plants = [(plant_id, name) for _, plant_id, name in rows]
+                stats['users'] += 1
+                stats['plants'] += len(plants)
+                slots.acquire()
+                pool.submit(deliver, build_notification(uid, plants))
+                flush(chunk_size)
+    finally:
+        # Failed sends stay unmarked and are retried by the next run
+        flush(1)
+    stats['seconds'] = time.perf_counter() - start
+    return stats
@@ -0,0 +1,63 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Types orjson doesn't handle natively are encoded exactly as DRF does
+_default = encoders.JSONEncoder().default
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer backed by orjson, producing the same bytes as DRF's renderer.
+
+    datetime, date, time and UUID are encoded natively by orjson; anything else it
+    doesn't know (Decimal, lazy strings, querysets...) goes through DRF's encoder.
+    Indented output, and any payload orjson can't encode, fall back to the stdlib path.
+    """
+    options = 0
+    if orjson is not None:
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=self.options)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same strict-javascript-subset escaping as JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+
+def sse_event(event, data):
+    """
+    One Server-Sent Event with `data` encoded as single-line JSON
+    """
+    return b'event: %s\ndata: %s\n\n' % (event.encode('utf-8'), ORJSONRenderer().render(data))
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Renders a whole response as one Server-Sent Event, so text/event-stream
+    clients get answers that aren't streamed (and errors) in the same framing.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        event = 'error' if response is not None and response.status_code >= 400 else 'summary'
+        return sse_event(event, data)
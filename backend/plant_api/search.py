@@ -0,0 +1,314 @@
+"""
+In-memory typeahead index over PlantCare.name and scientific_name.
+
+Names are normalized (diacritics stripped, casefolded, punctuation removed) and
+indexed two ways: a sorted token list for prefix matches, and word trigrams for
+typo-tolerant fallback. The index is updated per row by PlantCare signals and
+reconciled with the database periodically for writes made by other processes.
+"""
+
+import heapq
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import PlantCare, normalize
+
+# Entries examined per lookup stage, so short or common queries stay cheap
+MAX_CANDIDATES = 100
+# Share of the query's trigrams a fuzzy match must contain
+MIN_COVERAGE = 0.5
+
+# Prefix matches always rank above fuzzy (trigram similarity <= 1) matches
+EXACT_SCORE = 4.0
+PHRASE_PREFIX_SCORE = 3.0
+TOKEN_PREFIX_SCORE = 2.0
+
+
+_EMPTY = frozenset()
+
+
+def _remove_sorted(items, item):
+    index = bisect_left(items, item)
+    if index < len(items) and items[index] == item:
+        del items[index]
+
+
+def _keep_best(scores, key, score):
+    if score > scores.get(key, 0):
+        scores[key] = score
+
+
+def trigrams(normalized):
+    """
+    Word trigrams padded like pg_trgm, so short words and word starts still count
+    """
+    grams = set()
+    for word in normalized.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SpeciesSearchIndex:
+    """
+    Thread-safe; built lazily on the first search
+    """
+    def __init__(self, max_age=60):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._built = False
+        self._checked_at = 0.0
+        self._high_water = None
+        self._clear()
+
+    def _clear(self):
+        self._docs = {}  # id -> (name, scientific_name, normalized names, all their words, trigram count, length bonus)
+        self._postings = {}  # token -> {ids}
+        self._tokens = []  # sorted distinct tokens, for word-prefix ranges
+        self._phrases = []  # sorted (normalized name, id), for whole-name prefix ranges
+        self._trigrams = {}  # trigram -> {ids}
+
+    # Maintenance
+
+    def build(self):
+        rows = PlantCare.objects.values_list('id', 'name', 'scientific_name', 'last_updated')
+        with self._lock:
+            self._clear()
+            self._high_water = None
+            for row in rows.iterator(chunk_size=5000):
+                self._add(*row[:3])
+                self._advance_high_water(row[3])
+            self._tokens.sort()
+            self._phrases.sort()
+            self._built = True
+            self._checked_at = time.monotonic()
+
+    def refresh(self):
+        """
+        Apply rows changed since the last sync, then rebuild if the row count
+        still disagrees (a delete made by another process)
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            rows = PlantCare.objects.values_list('id', 'name', 'scientific_name', 'last_updated')
+            if self._high_water is not None:
+                rows = rows.filter(last_updated__gte=self._high_water)
+            rows = list(rows)
+            if len(rows) > max(1000, len(self._docs) // 10):
+                # A bulk import; one sorted build beats thousands of ordered inserts
+                self.build()
+                return
+            for plant_care_id, name, scientific_name, last_updated in rows:
+                self.upsert(plant_care_id, name, scientific_name)
+                self._advance_high_water(last_updated)
+            if PlantCare.objects.count() != len(self._docs):
+                self.build()
+
+    def invalidate(self):
+        """
+        Make the next search catch up with the table, for writes that bypass signals
+        """
+        with self._lock:
+            self._checked_at = float('-inf')
+
+    def _is_stale(self):
+        return time.monotonic() - self._checked_at > self.max_age
+
+    def ensure_current(self):
+        if self._built and not self._is_stale():
+            return
+        with self._lock:
+            # Another thread may have caught up while this one waited
+            if not self._built:
+                self.build()
+            elif self._is_stale():
+                self.refresh()
+
+    def upsert(self, plant_care_id, name, scientific_name):
+        with self._lock:
+            self._remove(plant_care_id)
+            self._add(plant_care_id, name, scientific_name, keep_sorted=True)
+
+    def remove(self, plant_care_id):
+        with self._lock:
+            self._remove(plant_care_id)
+
+    def upsert_on_commit(self, plant_care):
+        transaction.on_commit(lambda: self.upsert(plant_care.id, plant_care.name, plant_care.scientific_name))
+
+    def remove_on_commit(self, plant_care_id):
+        transaction.on_commit(lambda: self.remove(plant_care_id))
+
+    def _advance_high_water(self, last_updated):
+        if last_updated is not None and (self._high_water is None or last_updated > self._high_water):
+            self._high_water = last_updated
+
+    def _add(self, plant_care_id, name, scientific_name, keep_sorted=False):
+        values = tuple(value for value in dict.fromkeys((normalize(name), normalize(scientific_name))) if value)
+        grams = set()
+        for value in values:
+            grams |= trigrams(value)
+            if keep_sorted:
+                insort(self._phrases, (value, plant_care_id))
+            else:
+                self._phrases.append((value, plant_care_id))
+            for token in value.split():
+                ids = self._postings.get(token)
+                if ids is None:
+                    ids = self._postings[token] = set()
+                    if keep_sorted:
+                        insort(self._tokens, token)
+                    else:
+                        self._tokens.append(token)
+                ids.add(plant_care_id)
+        for gram in grams:
+            ids = self._trigrams.get(gram)
+            if ids is None:
+                ids = self._trigrams[gram] = set()
+            ids.add(plant_care_id)
+        # A leading space turns "some word starts with w" into a substring test for " w"
+        words = ' ' + ' '.join(values)
+        # Shorter names rank first among equally good matches
+        bonus = 1 / (min(map(len, values), default=0) + 2)
+        self._docs[plant_care_id] = (name, scientific_name, values, words, len(grams), bonus)
+
+    def _remove(self, plant_care_id):
+        doc = self._docs.pop(plant_care_id, None)
+        if doc is None:
+            return
+        for value in doc[2]:
+            _remove_sorted(self._phrases, (value, plant_care_id))
+            for gram in trigrams(value):
+                ids = self._trigrams.get(gram)
+                if ids is not None:
+                    ids.discard(plant_care_id)
+                    if not ids:
+                        del self._trigrams[gram]
+            for token in value.split():
+                ids = self._postings.get(token)
+                if ids is not None:
+                    ids.discard(plant_care_id)
+                    if not ids:
+                        del self._postings[token]
+                        _remove_sorted(self._tokens, token)
+
+    # Lookup
+
+    def search(self, query, limit=10):
+        """
+        Up to `limit` (id, name, scientific_name, score) tuples, best first.
+
+        Each stage examines a bounded number of entries and later stages only run
+        when earlier ones found fewer than `limit` species, so lookups cost the
+        same whatever the catalog size; very broad prefixes rank within the first
+        entries in alphabetical order rather than across every match.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        self.ensure_current()
+        with self._lock:
+            scores = {}
+            self._phrase_matches(normalized, scores)
+            if len(scores) < limit:
+                self._token_matches(normalized, scores)
+            # Typo tolerance is for queries that don't name a species outright
+            if len(scores) < limit and len(normalized) >= 3 and max(scores.values(), default=0) < EXACT_SCORE:
+                self._fuzzy_matches(normalized, scores)
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(plant_care_id, *self._docs[plant_care_id][:2], round(score, 3)) for plant_care_id, score in best]
+
+    def best_match(self, query):
+        """
+        The species whose name or scientific name is exactly `query` after normalization
+        """
+        results = self.search(query, limit=1)
+        if results and results[0][3] >= EXACT_SCORE:
+            return results[0][0]
+        return None
+
+    def _phrase_matches(self, normalized, scores):
+        """
+        Names starting with the whole query; an exact name sorts first in the range
+        """
+        phrases = self._phrases
+        index = bisect_left(phrases, (normalized,))
+        stop = min(index + MAX_CANDIDATES, len(phrases))
+        while index < stop:
+            value, plant_care_id = phrases[index]
+            if not value.startswith(normalized):
+                break
+            base = EXACT_SCORE if value == normalized else PHRASE_PREFIX_SCORE
+            # Shorter names first among equally good matches
+            _keep_best(scores, plant_care_id, base + 1 / (len(value) + 2))
+            index += 1
+
+    def _token_matches(self, normalized, scores):
+        """
+        Species where every query word starts a word of the name or scientific
+        name, e.g. "fern" or "monstera ada"
+        """
+        words = normalized.split()
+        # Candidates come from the longest word, usually the most selective
+        anchor_index = max(range(len(words)), key=lambda i: len(words[i]))
+        anchor = words[anchor_index]
+        tokens = self._tokens
+        index = bisect_left(tokens, anchor)
+        candidates = set()
+        while index < len(tokens) and len(candidates) < MAX_CANDIDATES and tokens[index].startswith(anchor):
+            candidates.update(islice(self._postings[tokens[index]], MAX_CANDIDATES - len(candidates)))
+            index += 1
+        candidates.difference_update(scores)
+
+        # The anchor is skipped by position; identity depends on string interning
+        word_starts = [f' {word}' for i, word in enumerate(words) if i != anchor_index]
+        docs = self._docs
+        for plant_care_id in candidates:
+            doc = docs[plant_care_id]
+            if all(word_start in doc[3] for word_start in word_starts):
+                scores[plant_care_id] = TOKEN_PREFIX_SCORE + doc[5]
+
+    def _fuzzy_matches(self, normalized, scores):
+        """
+        Species sharing at least MIN_COVERAGE of the query's trigrams.
+
+        Any such species must contain one of the (total - needed + 1) rarest query
+        trigrams, so only those postings are read to find candidates.
+        """
+        grams = trigrams(normalized)
+        needed = max(1, math.ceil(len(grams) * MIN_COVERAGE))
+        postings = sorted((self._trigrams.get(gram, _EMPTY) for gram in grams), key=len)
+        candidates = set()
+        for posting in postings[:len(grams) - needed + 1]:
+            candidates.update(islice(posting, MAX_CANDIDATES - len(candidates)))
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+        candidates.difference_update(scores)
+        shared = Counter()
+        for posting in postings:
+            shared.update(candidates & posting)
+        for plant_care_id, count in shared.items():
+            if count >= needed:
+                # Share of the query found in the species, like pg_trgm's word_similarity,
+                # with a small nudge towards species with little else in their names
+                overlap = count / (len(grams) + self._docs[plant_care_id][4] - count)
+                scores[plant_care_id] = 0.9 * count / len(grams) + 0.1 * overlap
+
+    def stats(self):
+        return {
+            'species': len(self._docs),
+            'tokens': len(self._tokens),
+            'trigrams': len(self._trigrams),
+        }
+
+
+species_index = SpeciesSearchIndex(
+    max_age=getattr(settings, 'PLANT_CARE_CATALOG_CONFIG', {}).get('MAX_STALENESS_SECONDS', 60),
+)
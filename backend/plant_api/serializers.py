@@ -1,5 +1,7 @@
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
-from .models import ActiveUser, Plant, PlantCare, AdImpression, AdClick, AdUnit, AdRevenue, AdKpi
+from .models import ActiveUser, Plant, PlantCare, AdImpression, AdClick, AdUnit, AdRevenue, AdKpi, species_key
 from rest_framework.validators import UniqueValidator
 
 
@@ -21,6 +23,25 @@ class PlantCareSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['last_updated']
 
+    def validate(self, attrs):
+        """
+        A rename must not collide with another species' de-duplication key,
+        which save() recomputes (rows without a key keep none)
+        """
+        instance = self.instance
+        if instance is not None and instance.species_key is None:
+            return attrs
+        name = attrs.get('name', getattr(instance, 'name', None))
+        scientific_name = attrs.get('scientific_name', getattr(instance, 'scientific_name', None))
+        key = species_key(scientific_name or name)
+        clashes = PlantCare.objects.filter(species_key=key)
+        if instance is not None:
+            clashes = clashes.exclude(pk=instance.pk)
+        if key and clashes.exists():
+            raise serializers.ValidationError(
+                {'scientific_name' if scientific_name else 'name': 'A species with this name already exists'})
+        return attrs
+
 class PlantSerializer(serializers.ModelSerializer):
     care = PlantCareSerializer(read_only=True)
 
@@ -37,8 +58,71 @@ class PlantSerializer(serializers.ModelSerializer):
             'updated_at',
             'last_watered',
             'last_fertilized',
+            'next_water_due',
+            'next_fertilize_due',
         ]
-        read_only_fields = ['created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at', 'next_water_due', 'next_fertilize_due']
+
+def _datetime_to_representation(value):
+    """
+    Same output as DRF's DateTimeField with the default ISO 8601 format
+    """
+    if value is None:
+        return None
+    value = timezone.localtime(value).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _build_field_map(model, field_names, prefix=''):
+    """
+    Precompute (output name, values() key, converter) for each serializer field
+    """
+    field_map = []
+    for name in field_names:
+        field = model._meta.get_field(name)
+        converter = _datetime_to_representation if isinstance(field, models.DateTimeField) else None
+        field_map.append((name, prefix + name, converter))
+    return field_map
+
+
+def _convert_row(row, field_map):
+    data = {}
+    for name, key, converter in field_map:
+        value = row[key]
+        data[name] = converter(value) if converter is not None and value is not None else value
+    return data
+
+
+class PlantRowSerializer:
+    """
+    Fast read path producing byte-for-byte the same JSON as PlantSerializer(many=True),
+    built from queryset.values() rows instead of model instances and DRF field trees.
+    """
+    care_field_map = _build_field_map(PlantCare, PlantCareSerializer.Meta.fields, prefix='care__')
+    # `care` keeps its declared position; a None key marks the nested object
+    plant_field_map = [
+        ('care', None, None) if name == 'care' else _build_field_map(Plant, [name])[0]
+        for name in PlantSerializer.Meta.fields
+    ]
+    values_keys = [key for _, key, _ in plant_field_map if key] + [key for _, key, _ in care_field_map]
+
+    @classmethod
+    def serialize(cls, queryset):
+        care_map = cls.care_field_map
+        data = []
+        for row in queryset.values(*cls.values_keys):
+            plant = {}
+            for name, key, converter in cls.plant_field_map:
+                if key is None:
+                    plant[name] = _convert_row(row, care_map) if row['care__id'] is not None else None
+                    continue
+                value = row[key]
+                plant[name] = converter(value) if converter is not None and value is not None else value
+            data.append(plant)
+        return data
+
 
 class AdUnitSerializer(serializers.ModelSerializer):
     """
@@ -73,7 +157,7 @@ class AdImpressionSerializer(serializers.ModelSerializer):
         model = AdImpression
         fields = [
             'id', 'ad_id', 'ad_network', 'ad_unit', 'ad_unit_name', 'placement', 
-            'impression_time', 'device_id', 'device_platform', 'device_model', 'user',
+            'impression_time', 'device_id', 'device_platform', 'device_model', 'uid',
             'estimated_revenue', 'is_test_ad', 'metadata', 'clicks'
         ]
         read_only_fields = ['impression_time']
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.db.models import DateTimeField, ExpressionWrapper
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .breakers import breakers
+from .catalog import catalog
+from .models import ApiUsage, Plant, PlantCare, PlantTombstone, parse_frequency_days
+from .search import species_index
+
+
+@receiver(post_delete, sender=Plant)
+def record_plant_tombstone(sender, instance, **kwargs):
+    """
+    Leave a tombstone for every deleted plant, including cascades from PlantCare
+    """
+    PlantTombstone.objects.create(plant_id=instance.pk, uid=instance.uid)
+
+
+def _due_after(last_done, days):
+    if days is None:
+        return None
+    return ExpressionWrapper(Coalesce(last_done, 'created_at') + timedelta(days=days), output_field=DateTimeField())
+
+
+@receiver(post_save, sender=PlantCare)
+def touch_plants_on_care_change(sender, instance, created, **kwargs):
+    """
+    Plants embed their PlantCare, so a care edit must show up as a plant change.
+    Their due dates are recomputed in the same UPDATE, since the frequencies may have moved.
+    """
+    if not created:
+        Plant.objects.filter(care=instance).update(
+            updated_at=timezone.now(),
+            next_water_due=_due_after('last_watered', instance.water_frequency),
+            next_fertilize_due=_due_after('last_fertilized', parse_frequency_days(instance.fertilizer_frequency)),
+        )
+
+
+@receiver(post_save, sender=PlantCare)
+@receiver(post_delete, sender=PlantCare)
+def bump_catalog_version(sender, **kwargs):
+    """
+    Rebuild the catalog snapshot once the write is visible to other connections
+    """
+    catalog.invalidate_on_commit()
+
+
+@receiver(post_save, sender=PlantCare)
+def index_plant_care(sender, instance, **kwargs):
+    species_index.upsert_on_commit(instance)
+
+
+@receiver(post_delete, sender=PlantCare)
+def unindex_plant_care(sender, instance, **kwargs):
+    species_index.remove_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=ApiUsage)
+def feed_circuit_breakers(sender, instance, created, **kwargs):
+    """
+    Every logged provider call counts towards its circuit breaker
+    """
+    if created:
+        breakers.record_usage(instance)
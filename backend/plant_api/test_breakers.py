@@ -0,0 +1,104 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from . import views
+from .breakers import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, breakers
+from .models import ApiUsage
+from .plant_info_cache import plant_info_cache
+from .testing import LocalPlantAPIServer
+
+
+class CircuitBreakerTest(SimpleTestCase):
+
+    def test_trips_on_error_rate(self):
+        breaker = CircuitBreaker('api', min_calls=4, error_rate=0.5)
+        for success in (True, True, False):
+            breaker.record(success, 100)
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record(False, 100)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.stats()['rejected'], 1)
+
+    def test_trips_on_slow_calls(self):
+        breaker = CircuitBreaker('api', min_calls=3, slow_call_ms=1000, slow_rate=0.6)
+        for response_ms in (1500, 200, 2000):
+            breaker.record(True, response_ms)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker('api', min_calls=1, open_seconds=0)
+        breaker.record(False, 100)
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+        # A failed probe opens the breaker again, a successful one closes it
+        breaker.record(False, 100)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertTrue(breaker.allow())
+        breaker.record(True, 100)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.stats()['trips'], 2)
+
+    def test_one_probe_at_a_time(self):
+        breaker = CircuitBreaker('api', min_calls=1, open_seconds=0.05)
+        breaker.record(False, 100)
+        with mock.patch('plant_api.breakers.time.monotonic', side_effect=lambda: breaker._opened_at + 0.06):
+            self.assertTrue(breaker.allow())
+            self.assertFalse(breaker.allow())
+
+
+class ProviderBreakerTest(TestCase):
+
+    def setUp(self):
+        breakers.reset()
+        self.addCleanup(breakers.reset)
+        plant_info_cache.clear_hot()
+
+    def fail(self, api_name, times):
+        for _ in range(times):
+            ApiUsage.objects.create(api_name=api_name, endpoint='x', response_time=50, success=False)
+
+    def test_usage_rows_feed_breakers(self):
+        ApiUsage.objects.create(api_name='OpenAI', endpoint='x', response_time=0, success=True, cache_hit=True)
+        self.fail('Trefle', 5)
+        self.assertEqual(breakers['Trefle'].state, OPEN)
+        self.assertEqual(breakers['OpenAI'].stats()['recent_calls'], 0)
+
+    def test_open_openai_circuit_fails_fast(self):
+        self.fail('OpenAI', 5)
+        with mock.patch.object(views.client.chat.completions, 'create') as create, \
+                mock.patch.object(views.PlantInfoAPI, 'gather_plant_info') as gather:
+            summary = views.PlantCareAI.generate_plant_care_summary('Unknown fern')
+        self.assertIn('unavailable', summary['message'])
+        create.assert_not_called()
+        gather.assert_not_called()
+        self.assertEqual(ApiUsage.objects.count(), 5)
+
+    def test_open_source_is_skipped(self):
+        self.fail('Perenual', 5)
+        with LocalPlantAPIServer() as perenual, LocalPlantAPIServer() as trefle:
+            config = {
+                **views.settings.PLANT_INFO_CONFIG,
+                'PERENUAL_URL': perenual.url, 'TREFLE_URL': trefle.url, 'HEDGE_AFTER_SECONDS': None,
+            }
+            with override_settings(PLANT_INFO_CONFIG=config):
+                info = views.PlantInfoAPI.gather_plant_info('Monstera')
+        self.assertEqual(info, {'perenual_data': [], 'trefle_data': [{'common_name': 'Monstera'}]})
+        self.assertEqual((len(perenual.requests), len(trefle.requests)), (0, 1))
+        # Degraded answers are not cached
+        self.assertEqual(plant_info_cache.get_many(['perenual'], 'Monstera'), {})
+
+
+class HealthBreakerTest(APITestCase):
+
+    def test_health_reports_breakers(self):
+        breakers.reset()
+        self.addCleanup(breakers.reset)
+        for _ in range(5):
+            ApiUsage.objects.create(api_name='Perenual', endpoint='x', response_time=50, success=False)
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.json()['circuit_breakers']['Perenual']['state'], OPEN)
+        self.assertEqual(response.json()['circuit_breakers']['OpenAI']['state'], CLOSED)
@@ -0,0 +1,99 @@
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from . import views
+from .breakers import breakers
+from .care_cache import CareSummaryCache, care_summary_cache
+from .models import ApiUsage, CareSummaryCacheEntry
+
+SUMMARY = {'plant_name': 'Pothos', 'water_frequency': 7, 'summary': 'Forgiving.'}
+
+
+def completion(content):
+    message = SimpleNamespace(content=json.dumps(content))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class CareSummaryCacheTest(TestCase):
+
+    def setUp(self):
+        care_summary_cache.clear_hot()
+        breakers.reset()
+        patcher = mock.patch('plant_api.views.PlantInfoAPI.gather_plant_info', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(views.client.chat.completions, 'create', return_value=completion(SUMMARY))
+        self.openai = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_lookups_skip_openai(self):
+        self.assertEqual(views.PlantCareAI.generate_plant_care_summary('Pothos'), SUMMARY)
+        # Spelling variants share the normalized key
+        self.assertEqual(views.PlantCareAI.generate_plant_care_summary(' POTHOS '), SUMMARY)
+        care_summary_cache.clear_hot()
+        with self.assertNumQueries(3):
+            self.assertEqual(views.PlantCareAI.generate_plant_care_summary('pothos'), SUMMARY)
+        self.openai.assert_called_once()
+
+        usage = ApiUsage.objects.filter(api_name='OpenAI').order_by('id')
+        self.assertEqual([row.cache_hit for row in usage], [False, True, True])
+        generation_time = CareSummaryCacheEntry.objects.get().generation_time
+        self.assertEqual([row.saved_time for row in usage[1:]], [generation_time, generation_time])
+        self.assertEqual(CareSummaryCacheEntry.objects.get().hits, 1)
+
+    def test_prompt_or_model_change_misses(self):
+        views.PlantCareAI.generate_plant_care_summary('Pothos')
+        with mock.patch.object(views, 'CARE_SUMMARY_PROMPT_HASH', 'edited'):
+            views.PlantCareAI.generate_plant_care_summary('Pothos')
+        with mock.patch.object(views, 'CARE_SUMMARY_MODEL', 'another-model'):
+            views.PlantCareAI.generate_plant_care_summary('Pothos')
+        self.assertEqual(self.openai.call_count, 3)
+        self.assertEqual(CareSummaryCacheEntry.objects.count(), 3)
+
+    def test_errors_are_not_cached(self):
+        self.openai.side_effect = RuntimeError('timeout')
+        self.assertIn('error', views.PlantCareAI.generate_plant_care_summary('Pothos'))
+        self.openai.side_effect = None
+        self.assertEqual(views.PlantCareAI.generate_plant_care_summary('Pothos'), SUMMARY)
+        # Both models of the ladder failed the first time
+        self.assertEqual(self.openai.call_count, len(views.care_models.models) + 1)
+
+    def test_expired_entries_miss(self):
+        cache = CareSummaryCache(ttl=60)
+        cache.set('key', 'Pothos', 'model', SUMMARY, 900)
+        self.assertEqual(cache.get('key'), (SUMMARY, 900))
+        CareSummaryCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        cache.clear_hot()
+        self.assertIsNone(cache.get('key'))
+
+    def test_least_recently_used_rows_are_evicted(self):
+        cache = CareSummaryCache(max_entries=2, hot_entries=1, evict_interval=0)
+        for key in ('a', 'b'):
+            cache.set(key, key, 'model', SUMMARY, 100)
+        CareSummaryCacheEntry.objects.filter(key='b').update(last_used_at=timezone.now() - timedelta(hours=1))
+        cache.set('c', 'c', 'model', SUMMARY, 100)
+        self.assertEqual(set(CareSummaryCacheEntry.objects.values_list('key', flat=True)), {'a', 'c'})
+        self.assertEqual(cache.stats()['hot_entries'], 1)
+
+    def test_eviction_runs_at_most_every_interval(self):
+        cache = CareSummaryCache(max_entries=1)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, key, 'model', SUMMARY, 100)
+        # Only the first write evicted; the rest wait for the interval
+        self.assertEqual(CareSummaryCacheEntry.objects.count(), 3)
+        cache.evict_interval = 0
+        cache.set('d', 'd', 'model', SUMMARY, 100)
+        self.assertEqual(CareSummaryCacheEntry.objects.count(), 1)
+
+    def test_stats(self):
+        cache = CareSummaryCache()
+        self.assertIsNone(cache.get('missing'))
+        cache.set('key', 'Pothos', 'model', SUMMARY, 500)
+        cache.get('key')
+        self.assertEqual(cache.stats(), {
+            'hot_entries': 1, 'hot_hits': 1, 'hits': 0, 'misses': 1, 'hit_rate': 0.5, 'saved_ms': 500})
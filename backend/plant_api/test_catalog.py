@@ -0,0 +1,73 @@
+import gzip
+import json
+
+from rest_framework.test import APITestCase
+
+from .catalog import catalog
+from .models import PlantCare
+from .testing import FirebaseAuthMixin
+
+
+class PlantCareCatalogTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        catalog.invalidate()
+        self.fern = PlantCare.objects.create(
+            name='Fern', scientific_name='Nephrolepis exaltata', water_frequency=3, light_requirements='Shade')
+        PlantCare.objects.create(name='Cactus', water_frequency=21, light_requirements='Sun')
+
+    def _list(self, **headers):
+        return self.client.get('/api/plant-care/', **self.auth(), **headers)
+
+    def test_snapshot_matches_catalog(self):
+        response = self._list()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), list(
+            PlantCare.objects.order_by('id').values('id', 'name', 'scientific_name')))
+        self.assertIn('ETag', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_repeat_fetches_skip_the_database(self):
+        etag = self._list()['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self._list().status_code, 200)
+            not_modified = self._list(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_gzip_when_accepted(self):
+        plain = self._list()
+        response = self._list(HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip_refused_with_zero_quality(self):
+        for header in ('gzip;q=0, deflate', 'identity', '*;q=0', 'br, gzip; q=0.0'):
+            self.assertNotIn('Content-Encoding', self._list(HTTP_ACCEPT_ENCODING=header), header)
+        for header in ('gzip;q=0.5', '*', 'identity;q=0, x-gzip'):
+            self.assertEqual(self._list(HTTP_ACCEPT_ENCODING=header)['Content-Encoding'], 'gzip', header)
+
+    def test_writes_bump_version_after_commit(self):
+        etag = self._list()['ETag']
+        version = catalog.version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fern.name = 'Boston fern'
+            self.fern.save()
+        self.assertEqual(catalog.version, version + 1)
+        response = self._list(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Boston fern', response.content.decode())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.fern.delete()
+        self.assertNotIn('Boston fern', self._list().content.decode())
+
+    def test_uncommitted_writes_do_not_bump_version(self):
+        version = catalog.version
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            PlantCare.objects.create(name='Ivy', water_frequency=5, light_requirements='Shade')
+        self.assertEqual(catalog.version, version)
+        self.assertIn(catalog.invalidate, callbacks)
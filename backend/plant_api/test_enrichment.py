@@ -0,0 +1,187 @@
+import re
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from . import views
+from .breakers import breakers
+from .care_cache import care_summary_cache
+from .concurrency import TokenBucket
+from .enrichment import CHECKPOINT_NAME, CareEnrichment
+from .catalog import catalog
+from .models import ApiUsage, BatchCheckpoint, Plant, PlantCare
+from .testing import LocalOpenAIServer
+
+PLANT_NAME = re.compile(r'care summary for a (.+?) plant')
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(SimpleTestCase):
+
+    def test_waits_for_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)
+        for _ in range(60):
+            bucket.acquire()
+        self.assertEqual(clock.now, 0)
+        bucket.acquire()
+        self.assertAlmostEqual(clock.now, 1)
+        bucket.acquire(3)
+        self.assertAlmostEqual(clock.now, 4)
+
+    def test_adjust_leaves_debt(self):
+        clock = FakeClock()
+        bucket = TokenBucket(600, clock=clock, sleep=clock.sleep)
+        bucket.acquire(600)
+        bucket.adjust(300)
+        bucket.acquire(100)
+        self.assertAlmostEqual(clock.now, 40)
+        self.assertAlmostEqual(bucket.waited, 40)
+
+
+class CareEnrichmentTest(TransactionTestCase):
+
+    def setUp(self):
+        breakers.reset()
+        care_summary_cache.clear_hot()
+        self.server = LocalOpenAIServer(self.respond).start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            mock.patch.object(views, 'client', self.server.client()),
+            mock.patch('plant_api.views.PlantInfoAPI.gather_plant_info', return_value={}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.fern = PlantCare.objects.create(name='Fern', water_frequency=3, light_requirements='Shade')
+        PlantCare.objects.create(
+            name='Cactus', water_frequency=21, light_requirements='Sun', humidity_level='Low',
+            temperature_range='10-30°C', soil_type='Gritty', fertilizer_frequency='Yearly', care_summary='Tough.')
+        self.broken = PlantCare.objects.create(name='Broken', water_frequency=7, light_requirements='')
+        self.ivy = PlantCare.objects.create(name='Ivy', scientific_name='Hedera helix', water_frequency=5,
+                                            light_requirements='')
+        self.plant = Plant.objects.create(name='Desk fern', uid='alice', care=self.fern,
+                                          last_fertilized=timezone.now())
+
+    @staticmethod
+    def respond(body):
+        name = PLANT_NAME.search(body['messages'][-1]['content']).group(1)
+        if name == 'Broken':
+            return 500
+        return {
+            'plant_name': name,
+            'light_needs': 'Bright indirect',
+            'humidity_needs': 'High',
+            'temperature_range': '18-27°C',
+            'soil_needs': 'Peat-based mix',
+            'fertilizer_needs': 'Every 4 weeks in summer',
+            'summary': f'{name} is easy.',
+        }
+
+    def requested_names(self):
+        # Failures are retried on the ladder's fallback models; count each species once
+        return sorted({PLANT_NAME.search(body['messages'][-1]['content']).group(1) for body in self.server.requests})
+
+    def test_missing_fields_are_filled(self):
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            stats = CareEnrichment(workers=3, chunk_size=2).run()
+        self.assertEqual((stats['processed'], stats['enriched'], stats['failed']), (3, 2, 1))
+        self.assertEqual(self.requested_names(), ['Broken', 'Fern', 'Hedera helix'])
+
+        self.fern.refresh_from_db()
+        self.assertEqual(self.fern.light_requirements, 'Shade')
+        self.assertEqual(self.fern.soil_type, 'Peat-based mix')
+        self.assertEqual(self.fern.care_summary, 'Fern is easy.')
+        self.assertEqual(PlantCare.objects.get(id=self.ivy.id).light_requirements, 'Bright indirect')
+        self.assertIsNone(PlantCare.objects.get(id=self.broken.id).humidity_level)
+
+        # The species' new fertilizer frequency reaches its plants
+        self.plant.refresh_from_db()
+        self.assertAlmostEqual(self.plant.next_fertilize_due, self.plant.last_fertilized + timedelta(days=28),
+                               delta=timedelta(seconds=1))
+        checkpoint = BatchCheckpoint.objects.get(name=CHECKPOINT_NAME)
+        self.assertEqual(checkpoint.position, self.ivy.id)
+        self.assertEqual(checkpoint.stats['enriched'], 2)
+
+    def test_rate_limits_are_taken_per_attempt(self):
+        enrichment = CareEnrichment(workers=2)
+        with mock.patch.object(enrichment.requests, 'acquire', wraps=enrichment.requests.acquire) as acquire, \
+                self.assertLogs('plant_api.enrichment', 'WARNING'):
+            enrichment.run()
+        # Broken is tried on every model of the ladder
+        self.assertEqual(acquire.call_count, len(self.server.requests))
+        self.assertEqual(len(self.server.requests), 2 + len(views.care_models.models))
+
+    def test_token_budget_is_settled_with_real_usage(self):
+        enrichment = CareEnrichment(workers=1, tokens_per_request=1200)
+        with mock.patch.object(enrichment.tokens, 'adjust', wraps=enrichment.tokens.adjust) as adjust, \
+                self.assertLogs('plant_api.enrichment', 'WARNING'):
+            enrichment.run()
+        used = list(ApiUsage.objects.filter(api_name='OpenAI', success=True).values_list(
+            'prompt_tokens', 'completion_tokens'))
+        settled = sorted(call.args[0] for call in adjust.call_args_list)
+        # Failed attempts answer without usage and keep the estimate
+        self.assertEqual(settled, sorted(prompt + completion - 1200 for prompt, completion in used))
+
+    def test_plants_of_every_changed_species_are_touched(self):
+        PlantCare.objects.filter(id=self.fern.id).update(fertilizer_frequency='Every 4 weeks in summer')
+        Plant.objects.filter(id=self.plant.id).update(updated_at=timezone.now() - timedelta(days=1))
+        self.plant.refresh_from_db()
+        version = catalog.version
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            CareEnrichment(workers=2).run()
+        self.assertGreater(Plant.objects.get(id=self.plant.id).updated_at, self.plant.updated_at)
+        self.assertGreater(catalog.version, version)
+
+    def test_open_breaker_stops_without_skipping(self):
+        for _ in range(5):
+            ApiUsage.objects.create(api_name='OpenAI', endpoint='chat/completions', success=False,
+                                    response_time=100)
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            stats = CareEnrichment(workers=2, chunk_size=2).run()
+        self.assertEqual(stats['processed'], 0)
+        self.assertIn('stopped', stats)
+        self.assertEqual(BatchCheckpoint.objects.get(name=CHECKPOINT_NAME).position, 0)
+        self.assertIsNone(PlantCare.objects.get(id=self.fern.id).soil_type)
+
+        # Once OpenAI is back the same species are picked up
+        breakers.reset()
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            stats = CareEnrichment(workers=2, chunk_size=2).run()
+        self.assertEqual((stats['processed'], stats['enriched']), (3, 2))
+
+    def test_run_resumes_after_checkpoint(self):
+        first = CareEnrichment(workers=2, chunk_size=1).run(limit=1)
+        self.assertEqual(first['processed'], 1)
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            second = CareEnrichment(workers=2, chunk_size=1).run()
+        self.assertEqual(second['start_position'], self.fern.id)
+        self.assertEqual(second['processed'], 2)
+        self.assertEqual(self.requested_names(), ['Broken', 'Fern', 'Hedera helix'])
+
+        # Nothing left after the checkpoint; a restart retries the failure
+        self.assertEqual(CareEnrichment().run()['processed'], 0)
+        breakers.reset()
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            self.assertEqual(CareEnrichment().run(restart=True)['processed'], 1)
+
+    def test_management_command(self):
+        out = StringIO()
+        with self.assertLogs('plant_api.enrichment', 'WARNING'):
+            call_command('enrich_plant_care', '--workers', '2', '--requests-per-minute', '600', stdout=out)
+        self.assertIn('Enriched 2 of 3 species, 1 failed', out.getvalue())
@@ -0,0 +1,111 @@
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+from firebase_admin import auth
+
+from .middleware.firebase_auth import FirebaseAuthMiddleware, VerifiedTokenCache, token_cache
+
+
+class VerifiedTokenCacheTest(SimpleTestCase):
+
+    def test_claims_cached_until_exp(self):
+        cache = VerifiedTokenCache(max_size=4)
+        cache.put('tok', {'uid': 'u1', 'exp': time.time() + 60})
+        self.assertEqual(cache.get('tok'), (True, {'uid': 'u1', 'exp': mock.ANY}))
+
+        cache.put('old', {'uid': 'u2', 'exp': time.time() - 1})
+        self.assertEqual(cache.get('old'), (False, None))
+
+    def test_lru_eviction(self):
+        cache = VerifiedTokenCache(max_size=2)
+        exp = time.time() + 60
+        cache.put('a', {'exp': exp})
+        cache.put('b', {'exp': exp})
+        cache.get('a')
+        cache.put('c', {'exp': exp})
+        self.assertTrue(cache.get('a')[0])
+        self.assertFalse(cache.get('b')[0])
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_negative_entries_expire(self):
+        cache = VerifiedTokenCache(negative_ttl=30)
+        cache.reject('bad')
+        self.assertEqual(cache.get('bad'), (True, None))
+        with mock.patch('plant_api.middleware.firebase_auth.time.time', return_value=time.time() + 31):
+            self.assertEqual(cache.get('bad'), (False, None))
+
+
+class FirebaseAuthMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = FirebaseAuthMiddleware(lambda request: HttpResponse('ok'))
+
+    def _get(self, token):
+        return self.middleware(self.factory.get('/api/plants/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+
+    @mock.patch('plant_api.middleware.firebase_auth.auth.verify_id_token')
+    def test_repeated_token_verified_once(self, verify):
+        verify.return_value = {'uid': 'u1', 'exp': time.time() + 3600}
+        for _ in range(5):
+            self.assertEqual(self._get('good').status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(token_cache.stats()['hits'], 4)
+
+    @mock.patch('plant_api.middleware.firebase_auth.auth.verify_id_token')
+    def test_rejected_token_negatively_cached(self, verify):
+        verify.side_effect = auth.InvalidIdTokenError('bad signature')
+        for _ in range(3):
+            self.assertEqual(self._get('bad').status_code, 401)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(token_cache.stats()['negative_hits'], 2)
+
+    @mock.patch('plant_api.middleware.firebase_auth.auth.verify_id_token')
+    def test_transient_failures_not_cached(self, verify):
+        for error in (auth.CertificateFetchError('certs unavailable', cause=None), ConnectionError('reset')):
+            verify.side_effect = error
+            with self.assertLogs('plant_api.middleware.firebase_auth', 'WARNING'):
+                self.assertEqual(self._get('good').status_code, 401)
+        verify.side_effect = None
+        verify.return_value = {'uid': 'u1', 'exp': time.time() + 3600}
+        self.assertEqual(self._get('good').status_code, 200)
+        self.assertEqual(token_cache.stats()['negative_hits'], 0)
+
+
+class AsyncFirebaseAuthMiddlewareTest(SimpleTestCase):
+
+    def setUp(self):
+        token_cache.clear()
+        self.factory = RequestFactory()
+
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        self.middleware = FirebaseAuthMiddleware(get_response)
+
+    def _get(self, path, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return async_to_sync(self.middleware)(self.factory.get(path, **headers))
+
+    def test_async_mode_detected(self):
+        self.assertTrue(self.middleware.async_mode)
+        self.assertTrue(iscoroutinefunction(self.middleware))
+
+    def test_exempt_paths_fullmatch(self):
+        self.assertEqual(self._get('/').status_code, 200)
+        self.assertEqual(self._get('/api/health/').status_code, 200)
+        self.assertEqual(self._get('/api-docs/schema/').status_code, 200)
+        self.assertEqual(self._get('/api/plants/').status_code, 401)
+        self.assertEqual(self._get('/api/health/extra/').status_code, 401)
+
+    @mock.patch('plant_api.middleware.firebase_auth.auth.verify_id_token')
+    def test_async_verification_uses_cache(self, verify):
+        verify.return_value = {'uid': 'u1', 'exp': time.time() + 3600}
+        for _ in range(3):
+            self.assertEqual(self._get('/api/plants/', 'good').status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+        self.assertEqual(token_cache.stats()['misses'], 1)
@@ -0,0 +1,62 @@
+import time
+
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from . import http_client
+from .testing import LocalPlantAPIServer
+
+CONFIG = {
+    **settings.HTTP_CLIENT_CONFIG,
+    'CONNECT_TIMEOUT': 1, 'READ_TIMEOUT': 0.3, 'RETRIES': 2,
+    'BACKOFF_FACTOR': 0.01, 'BACKOFF_JITTER': 0.01, 'POOL_MAXSIZE': 2,
+}
+
+
+@override_settings(HTTP_CLIENT_CONFIG=CONFIG)
+class HttpClientTest(SimpleTestCase):
+
+    def setUp(self):
+        http_client.reset_session()
+        self.addCleanup(http_client.reset_session)
+
+    def test_connections_are_reused(self):
+        with LocalPlantAPIServer() as server:
+            for _ in range(5):
+                self.assertEqual(http_client.get(server.url).json(), {'data': server.data})
+        self.assertEqual(len(server.requests), 5)
+        self.assertEqual(len(server.connections), 1)
+
+    def test_server_errors_are_retried(self):
+        with LocalPlantAPIServer(statuses=[503, 429, 200]) as server:
+            response = http_client.get(server.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(server.requests), 3)
+
+    @override_settings(HTTP_CLIENT_CONFIG={**CONFIG, 'BACKOFF_MAX': 0.2})
+    def test_retry_after_is_capped(self):
+        with LocalPlantAPIServer(statuses=[429, 200], retry_after='120') as server:
+            start = time.monotonic()
+            response = http_client.get(server.url)
+            self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_retries_are_bounded(self):
+        with LocalPlantAPIServer(statuses=[502]) as server:
+            response = http_client.get(server.url)
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(len(server.requests), CONFIG['RETRIES'] + 1)
+
+    def test_stalled_server_times_out_without_retry(self):
+        with LocalPlantAPIServer(delays=[1]) as server:
+            start = time.monotonic()
+            with self.assertRaises(requests.Timeout):
+                http_client.get(server.url)
+            self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_explicit_timeout_wins(self):
+        with LocalPlantAPIServer(delays=[0.5]) as server:
+            self.assertEqual(http_client.get(server.url, timeout=2).status_code, 200)
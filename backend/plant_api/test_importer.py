@@ -0,0 +1,116 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+
+from .catalog import catalog
+from .importer import import_species
+from .models import Plant, PlantCare
+from .search import species_index
+
+
+class SpeciesImportTest(TestCase):
+
+    def setUp(self):
+        self.pansy = PlantCare.objects.create(
+            name='Pansy', scientific_name='Viola × wittrockiana', water_frequency=3, light_requirements='Sun')
+        self.plant = Plant.objects.create(
+            name='Balcony pansy', uid='alice', care=self.pansy, last_watered=timezone.now() - timedelta(days=1))
+        species_index.build()
+
+    def write(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_csv_import(self):
+        path = self.write('.csv', (
+            'common_name,scientific_name,water_frequency,light_needs,summary\n'
+            'Monstera,  Monstera   deliciosa ,7,Bright indirect,Easy going.\n'
+            'Snake plant,Dracaena trifasciata,every 2-3 weeks,Low,\n'
+            ',,7,Sun,No name at all\n'
+        ))
+        out = StringIO()
+        call_command('import_species', path, stdout=out)
+        self.assertIn('3 rows read, 2 upserted', out.getvalue())
+        self.assertIn('Imported 2 species (0 updated), skipped 1 rows', out.getvalue())
+
+        monstera = PlantCare.objects.get(species_key='monstera deliciosa')
+        self.assertEqual(monstera.scientific_name, 'Monstera deliciosa')
+        self.assertEqual(monstera.light_requirements, 'Bright indirect')
+        self.assertEqual(monstera.care_summary, 'Easy going.')
+        self.assertEqual(PlantCare.objects.get(name='Snake plant').water_frequency, 14)
+
+    def test_jsonl_upserts_existing_species(self):
+        rows = [
+            {'name': 'Garden pansy', 'scientific_name': 'Viola x wittrockiana', 'water_frequency': 2,
+             'light_requirements': 'Full sun'},
+            {'name': 'Fern', 'water_frequency': 4},
+            # Repeated species: the last row wins
+            {'name': 'Boston fern', 'scientific_name': 'fern', 'water_frequency': 5},
+        ]
+        path = self.write('.jsonl', '\n'.join(json.dumps(row) for row in rows) + '\n')
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_species', path, '--chunk-size', '2', stdout=StringIO())
+
+        self.pansy.refresh_from_db()
+        self.assertEqual((self.pansy.name, self.pansy.water_frequency), ('Garden pansy', 2))
+        self.assertEqual(PlantCare.objects.count(), 2)
+        self.assertEqual(PlantCare.objects.get(species_key='fern').name, 'Boston fern')
+
+        # Plants of updated species get new due dates, like a normal save
+        self.plant.refresh_from_db()
+        self.assertAlmostEqual(
+            self.plant.next_water_due, self.plant.last_watered + timedelta(days=2), delta=timedelta(seconds=1))
+
+    def test_any_changed_value_touches_plants(self):
+        Plant.objects.filter(pk=self.plant.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        unchanged = {'name': 'Pansy', 'scientific_name': 'Viola × wittrockiana', 'water_frequency': 3,
+                     'light_requirements': 'Sun'}
+        import_species([unchanged])
+        self.plant.refresh_from_db()
+        self.assertLess(self.plant.updated_at, timezone.now() - timedelta(hours=1))
+
+        import_species([{**unchanged, 'summary': 'Deadhead often.'}])
+        self.plant.refresh_from_db()
+        self.assertGreater(self.plant.updated_at, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.plant.care.care_summary, 'Deadhead often.')
+
+    def test_sparse_rows_keep_existing_values(self):
+        PlantCare.objects.filter(pk=self.pansy.pk).update(
+            care_summary='Deadhead often.', humidity_level='Medium', fertilizer_frequency='Monthly')
+        import_species([{'scientific_name': 'Viola x wittrockiana', 'soil': 'Loam', 'humidity': ''}])
+        self.pansy.refresh_from_db()
+        self.assertEqual(self.pansy.soil_type, 'Loam')
+        self.assertEqual((self.pansy.name, self.pansy.water_frequency, self.pansy.light_requirements),
+                         ('Pansy', 3, 'Sun'))
+        self.assertEqual((self.pansy.care_summary, self.pansy.humidity_level, self.pansy.fertilizer_frequency),
+                         ('Deadhead often.', 'Medium', 'Monthly'))
+
+    def test_catalog_and_index_are_refreshed(self):
+        version = catalog.version
+        stats = import_species([{'name': 'Peace lily', 'scientific_name': 'Spathiphyllum wallisii'}])
+        self.assertEqual(stats['imported'], 1)
+        self.assertGreater(catalog.version, version)
+        lily = PlantCare.objects.get(species_key='spathiphyllum wallisii')
+        self.assertEqual(species_index.best_match('Spathiphyllum wallisii'), lily.id)
+
+    def test_progress_is_reported_per_chunk(self):
+        reports = []
+        records = ({'name': f'Species {i}'} for i in range(25))
+        # Per chunk: existing keys, savepoint, upsert, release
+        with self.assertNumQueries(3 * 4):
+            import_species(records, chunk_size=10, progress=lambda stats: reports.append(stats['read']))
+        self.assertEqual(reports, [10, 20, 25])
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command('import_species', '/nonexistent/species.csv', stdout=StringIO())
@@ -0,0 +1,95 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from .jobs import care_jobs
+from .models import CareGenerationJob, PlantCare
+from .testing import FirebaseAuthMixin
+
+SUMMARY = {
+    'plant_name': 'Snake plant',
+    'scientific_name': 'Dracaena trifasciata',
+    'water_frequency': 14,
+    'light_needs': 'Low to bright',
+    'summary': 'Hard to kill.',
+    'tips': ['Let the soil dry out'],
+}
+
+
+@mock.patch.object(care_jobs, 'workers', 0)
+class CareSummaryJobTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('plant_api.views.PlantInfoAPI.gather_plant_info', return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('plant_api.views.PlantCareAI.generate_plant_care_summary', return_value=SUMMARY)
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _request(self, plant_name='Snake plant', execute=True):
+        with self.captureOnCommitCallbacks(execute=execute):
+            return self.client.get('/api/care-summary/', {'plant_name': plant_name}, **self.auth())
+
+    def _poll(self, response):
+        return self.client.get(response.json()['status_url'], **self.auth())
+
+    def test_unknown_plant_is_accepted_and_generated(self):
+        response = self._request()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response['Location'], response.json()['status_url'])
+
+        job = self._poll(response).json()
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result']['plant_name'], 'Snake plant')
+        self.assertIsNotNone(job['finished_at'])
+
+        # The stored species answers later lookups directly
+        species = PlantCare.objects.get(id=job['plant_care_id'])
+        self.assertEqual(species.scientific_name, 'Dracaena trifasciata')
+        self.assertEqual(self._request('dracaena trifasciata').status_code, 200)
+        self.generate.assert_called_once()
+
+    def test_pending_job_is_shared(self):
+        first = self._request(execute=False)
+        second = self._request(execute=False)
+        self.assertEqual(first.json()['job_id'], second.json()['job_id'])
+        self.assertEqual(self._poll(first).json()['status'], 'pending')
+        self.assertEqual(CareGenerationJob.objects.count(), 1)
+
+    def test_jobs_are_private_to_their_user(self):
+        mine = self._request(execute=False)
+        self.assertEqual(self.client.get(mine.json()['status_url'], **self.auth('mallory')).status_code, 404)
+
+        # Another user asking for the same plant gets a job of their own
+        with self.captureOnCommitCallbacks(execute=False):
+            theirs = self.client.get('/api/care-summary/', {'plant_name': 'Snake plant'}, **self.auth('mallory'))
+        self.assertNotEqual(theirs.json()['job_id'], mine.json()['job_id'])
+        self.assertEqual(self.client.get(theirs.json()['status_url'], **self.auth('mallory')).status_code, 200)
+
+    def test_generation_error_fails_job(self):
+        self.generate.return_value = {'error': 'openai', 'message': 'Rate limited'}
+        with self.assertLogs('plant_api.jobs', 'ERROR'):
+            response = self._request()
+        job = self._poll(response).json()
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], 'Rate limited')
+        self.assertFalse(PlantCare.objects.exists())
+
+        # A failed job is not reused
+        self.generate.return_value = SUMMARY
+        retry = self._request()
+        self.assertNotEqual(retry.json()['job_id'], response.json()['job_id'])
+        self.assertEqual(self._poll(retry).json()['status'], 'succeeded')
+
+    def test_stale_job_is_resumed_when_polled(self):
+        response = self._request(execute=False)
+        CareGenerationJob.objects.update(updated_at=timezone.now() - timedelta(seconds=care_jobs.stale_seconds + 1))
+        self.assertEqual(self._poll(response).json()['status'], 'succeeded')
+
+    def test_unknown_job(self):
+        response = self.client.get('/api/care-jobs/00000000-0000-0000-0000-000000000000/', **self.auth())
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,124 @@
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from . import views
+from .breakers import breakers
+from .care_cache import care_summary_cache
+from .model_ladder import ModelLadder
+from .models import ApiUsage
+from .testing import LocalOpenAIServer
+
+FAST, STRONG = 'fast-model', 'strong-model'
+
+
+def summary(model):
+    return {'plant_name': 'Monstera', 'summary': f'Answered by {model}.'}
+
+
+class ModelLadderTest(TestCase):
+
+    def setUp(self):
+        breakers.reset()
+        care_summary_cache.clear_hot()
+        # Scripted per model: seconds before answering, and the answer (an int fails with that status)
+        self.latency = {FAST: 0, STRONG: 0}
+        self.answers = {FAST: summary(FAST), STRONG: summary(STRONG)}
+        self.server = LocalOpenAIServer(self.respond).start()
+        self.addCleanup(self.server.stop)
+        self.ladder = ModelLadder([FAST, STRONG], latency_budget=0.3, min_calls=3, refresh_seconds=0)
+        for patcher in (
+            mock.patch.object(views, 'client', self.server.client()),
+            mock.patch.object(views, 'care_models', self.ladder),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def respond(self, body):
+        time.sleep(self.latency[body['model']])
+        return self.answers[body['model']]
+
+    def generate(self, plant_name='Monstera'):
+        start = time.monotonic()
+        result = views.PlantCareAI.generate_plant_care_summary(plant_name, {})
+        return result, time.monotonic() - start
+
+    def requested_models(self):
+        return [body['model'] for body in self.server.requests]
+
+    def usage(self):
+        return list(ApiUsage.objects.filter(api_name='OpenAI').order_by('id').values_list('model', 'success'))
+
+    def test_primary_answers(self):
+        result, _ = self.generate()
+        self.assertEqual(result, summary(FAST))
+        self.assertEqual(self.requested_models(), [FAST])
+        self.assertEqual(self.usage(), [(FAST, True)])
+
+    def test_error_falls_back(self):
+        self.answers[FAST] = 500
+        result, _ = self.generate()
+        self.assertEqual(result, summary(STRONG))
+        self.assertEqual(self.usage(), [(FAST, False), (STRONG, True)])
+        self.assertEqual(self.ladder.stats()['fallbacks'], 1)
+
+    def test_before_attempt_runs_for_every_model(self):
+        self.answers[FAST] = 500
+        attempts = []
+        views.PlantCareAI.generate_plant_care_summary('Monstera', {}, before_attempt=lambda: attempts.append(1))
+        self.assertEqual(len(attempts), 2)
+
+    def test_invalid_json_falls_back(self):
+        self.answers[FAST] = {'summary': 'No plant name'}
+        result, _ = self.generate()
+        self.assertEqual(result, summary(STRONG))
+        failed = ApiUsage.objects.get(model=FAST)
+        self.assertIn('not a valid care summary', failed.error_message)
+        self.assertIsNotNone(failed.prompt_tokens)
+
+    def test_slow_primary_is_hedged(self):
+        self.latency[FAST] = 1.0
+        result, elapsed = self.generate()
+        self.assertEqual(result, summary(STRONG))
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(self.ladder.stats()['hedges'], 1)
+        self.assertEqual(self.usage(), [(STRONG, True)])
+
+        # The abandoned call is logged, with its real latency, by the next run
+        time.sleep(0.9)
+        self.latency[FAST] = 0
+        self.assertEqual(self.generate('Pothos')[0], summary(FAST))
+        slow = ApiUsage.objects.filter(model=FAST).order_by('id').first()
+        self.assertGreaterEqual(slow.response_time, 1000)
+
+    def test_race_takes_first_valid_answer(self):
+        self.ladder.race = True
+        self.latency[FAST] = 0.5
+        result, elapsed = self.generate()
+        self.assertEqual(result, summary(STRONG))
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(sorted(self.requested_models()), [FAST, STRONG])
+        self.assertEqual(self.ladder.stats()['hedges'], 0)
+
+    def test_latency_percentiles_drive_routing(self):
+        for response_time in (200, 250, 900):
+            ApiUsage.objects.create(api_name='OpenAI', endpoint='chat/completions', model=FAST,
+                                    response_time=response_time)
+        for response_time in (100, 150, 200):
+            ApiUsage.objects.create(api_name='OpenAI', endpoint='chat/completions', model=STRONG,
+                                    response_time=response_time)
+        # The primary's p95 is over the 300 ms budget, so it moves behind
+        self.assertEqual(self.ladder.order(), [STRONG, FAST])
+        self.assertEqual(self.ladder.hedge_after(STRONG), 0.2)
+        self.assertEqual(self.ladder.stats()['p95_ms'], {FAST: 900, STRONG: 200})
+
+        self.assertEqual(self.generate()[0], summary(STRONG))
+        self.assertEqual(self.requested_models(), [STRONG])
+
+    def test_all_models_fail(self):
+        self.answers[FAST] = self.answers[STRONG] = 503
+        result, _ = self.generate()
+        self.assertEqual(result['error'], 'Failed to generate care summary')
+        self.assertEqual(self.usage(), [(FAST, False), (STRONG, False)])
+        self.assertEqual(self.ladder.stats()['exhausted'], 1)
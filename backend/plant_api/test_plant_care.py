@@ -0,0 +1,193 @@
+import threading
+import time
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework.test import APIClient, APITestCase
+
+from . import views
+from .concurrency import SingleFlight
+from .jobs import care_jobs
+from .models import CareGenerationJob, PlantCare, species_key
+from .search import species_index
+from .testing import FirebaseAuthMixin
+
+GENERATED = {
+    'scientific_name': 'Monstera deliciosa',
+    'water_frequency': 7,
+    'light_needs': 'Bright indirect',
+    'summary': 'Easy going.',
+}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting for condition')
+        time.sleep(0.005)
+
+
+class SingleFlightTest(SimpleTestCase):
+
+    def run_concurrently(self, flight, count, fn):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.call(flight, fn))) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def call(flight, fn):
+        try:
+            return flight.do('key', fn)
+        except ValueError as exc:
+            return exc
+
+    def test_concurrent_calls_share_one_result(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            wait_for(lambda: flight.coalesced == 4)
+            return 'result'
+
+        results = self.run_concurrently(flight, 5, slow)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(results), [('result', False)] + [('result', True)] * 4)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_exceptions_are_shared_and_key_is_released(self):
+        flight = SingleFlight()
+
+        def failing():
+            wait_for(lambda: flight.coalesced == 2)
+            raise ValueError('boom')
+
+        results = self.run_concurrently(flight, 3, failing)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(flight.do('key', lambda: 'again'), ('again', False))
+
+
+class PlantCareCreateTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.existing = PlantCare.objects.create(
+            name='Pansy', scientific_name='Viola × wittrockiana', water_frequency=3, light_requirements='Sun')
+        species_index.build()
+        patcher = mock.patch('plant_api.views.PlantCareAI.generate_plant_care_summary', return_value=GENERATED)
+        self.generate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _create(self, **data):
+        # Jobs run inline when the request's transaction commits
+        with mock.patch.object(care_jobs, 'workers', 0), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/plant-care/', data, format='json', **self.auth())
+        if response.status_code == 202:
+            job = self.client.get(response['Location'], **self.auth()).json()
+            self.assertEqual(job['status'], 'succeeded')
+            return job
+        return response.json()
+
+    def test_species_key_is_normalized(self):
+        self.assertEqual(self.existing.species_key, 'viola wittrockiana')
+        self.assertEqual(species_key(' VIOLA  wittróckiana! '), 'viola wittrockiana')
+
+    def test_existing_species_skips_generation(self):
+        for data in ({'scientific_name': 'viola wittrockiana'}, {'name': 'PANSY'}):
+            response = self.client.post('/api/plant-care/', data, format='json', **self.auth())
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['id'], self.existing.id)
+        self.generate.assert_not_called()
+        self.assertFalse(CareGenerationJob.objects.exists())
+
+    def test_new_species_is_generated_once(self):
+        job = self._create(name='Monstera')
+        created = job['result']
+        self.assertEqual(PlantCare.objects.get(id=created['id']).species_key, 'monstera deliciosa')
+
+        again = self._create(scientific_name='Monstera Deliciosa')
+        self.assertEqual(again['id'], created['id'])
+        self.generate.assert_called_once()
+
+    def test_generated_name_matching_existing_species(self):
+        self.generate.return_value = {**GENERATED, 'scientific_name': 'Viola x wittrockiana'}
+        job = self._create(name='Garden pansy')
+        self.assertEqual(job['result']['id'], self.existing.id)
+        self.assertEqual(PlantCare.objects.count(), 1)
+
+    def test_free_form_generated_values_are_stored(self):
+        self.generate.return_value = {
+            **GENERATED, 'water_frequency': 'every 10-14 days', 'light_needs': None, 'soil_needs': 'x' * 300}
+        job = self._create(name='Monstera')
+        plantcare = PlantCare.objects.get(id=job['result']['id'])
+        self.assertEqual(plantcare.water_frequency, 10)
+        self.assertEqual(plantcare.light_requirements, '')
+        self.assertEqual(len(plantcare.soil_type), 100)
+
+        self.generate.return_value = {**GENERATED, 'scientific_name': 'Pilea', 'water_frequency': None}
+        self.assertEqual(PlantCare.objects.get(id=self._create(name='Pilea')['result']['id']).water_frequency, 7)
+
+    def test_rename_onto_another_species_is_rejected(self):
+        fern = PlantCare.objects.create(name='Fern', water_frequency=3, light_requirements='Shade')
+        response = self.client.patch(f'/api/plant-care/{fern.id}/', {'scientific_name': 'Viola x wittrockiana'},
+                                     format='json', **self.auth())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('scientific_name', response.json())
+        self.assertEqual(PlantCare.objects.get(id=fern.id).species_key, 'fern')
+
+        # Renaming within its own key is fine
+        response = self.client.patch(f'/api/plant-care/{self.existing.id}/', {'name': 'Garden pansy'},
+                                     format='json', **self.auth())
+        self.assertEqual(response.status_code, 200)
+
+    def test_unrelated_integrity_error_is_raised(self):
+        with mock.patch.object(PlantCare.objects, 'create', side_effect=views.IntegrityError('other')):
+            with self.assertRaises(views.IntegrityError):
+                views.PlantCareViewSet.store_species('Fern', 'Nephrolepis', GENERATED)
+
+
+class PlantCareCreateConcurrencyTest(FirebaseAuthMixin, TransactionTestCase):
+
+    def test_concurrent_requests_coalesce(self):
+        workers = 4
+        release = threading.Event()
+
+        def slow_generation(name):
+            release.wait(5)
+            return GENERATED
+
+        responses = []
+
+        def request():
+            try:
+                responses.append(APIClient().post(
+                    '/api/plant-care/', {'name': 'Monstera'}, format='json', **self.auth()))
+            finally:
+                connection.close()
+
+        with mock.patch('plant_api.views.PlantCareAI.generate_plant_care_summary',
+                        side_effect=slow_generation) as generate:
+            threads = [threading.Thread(target=request) for _ in range(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            release.set()
+
+            self.assertEqual([response.status_code for response in responses], [202] * workers)
+            # Requests that raced past the job lookup still share one generation
+            job_ids = {response.json()['job_id'] for response in responses}
+            wait_for(lambda: not CareGenerationJob.objects.filter(
+                pk__in=job_ids, status__in=CareGenerationJob.ACTIVE_STATUSES).exists())
+
+        generate.assert_called_once()
+        jobs = CareGenerationJob.objects.filter(pk__in=job_ids)
+        self.assertEqual({job.status for job in jobs}, {'succeeded'})
+        self.assertEqual(PlantCare.objects.count(), 1)
+        self.assertEqual({job.plant_care_id for job in jobs}, {PlantCare.objects.get().id})
@@ -0,0 +1,142 @@
+import time
+from datetime import timedelta
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .breakers import breakers
+from .concurrency import FanOut
+from .models import ApiUsage, PlantInfoCacheEntry
+from .plant_info_cache import PlantInfoCache, plant_info_cache
+from .testing import LocalPlantAPIServer
+from .views import PlantInfoAPI
+
+
+class FanOutTest(SimpleTestCase):
+
+    def test_calls_run_concurrently(self):
+        fan_out = FanOut(workers=4)
+        start = time.monotonic()
+        results = fan_out.run({'a': lambda: time.sleep(0.2) or 'a', 'b': lambda: time.sleep(0.2) or 'b'}, deadline=2)
+        self.assertLess(time.monotonic() - start, 0.35)
+        self.assertEqual({name: result.value for name, result in results.items()}, {'a': 'a', 'b': 'b'})
+
+    def test_deadline_returns_partial_results(self):
+        fan_out = FanOut(workers=4)
+        results = fan_out.run({'fast': lambda: 'fast', 'slow': lambda: time.sleep(1) or 'slow'}, deadline=0.2)
+        self.assertEqual(results['fast'].value, 'fast')
+        self.assertIsNone(results['slow'].value)
+        self.assertIsInstance(results['slow'].error, TimeoutError)
+        self.assertEqual(fan_out.stats()['timeouts'], 1)
+
+    def test_failed_call_is_hedged(self):
+        fan_out = FanOut(workers=4)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError('reset')
+            return 'ok'
+
+        results = fan_out.run({'flaky': flaky}, deadline=1, hedge_after=0.5)
+        self.assertEqual(results['flaky'], results['flaky']._replace(value='ok', error=None, attempts=2))
+        self.assertLess(results['flaky'].elapsed, 0.4)
+        self.assertEqual(fan_out.stats()['hedge_wins'], 1)
+
+
+class GatherPlantInfoTest(TestCase):
+
+    def setUp(self):
+        plant_info_cache.clear_hot()
+        breakers.reset()
+
+    def gather(self, perenual, trefle, deadline=1.0, hedge_after=None, plant_name='Monstera'):
+        config = {
+            'PERENUAL_URL': perenual.url, 'PERENUAL_API_KEY': 'key',
+            'TREFLE_URL': trefle.url, 'TREFLE_API_KEY': 'token',
+            'DEADLINE_SECONDS': deadline, 'HEDGE_AFTER_SECONDS': hedge_after, 'WORKERS': 4,
+        }
+        with override_settings(PLANT_INFO_CONFIG=config):
+            start = time.monotonic()
+            info = PlantInfoAPI.gather_plant_info(plant_name)
+            return info, time.monotonic() - start
+
+    def test_sources_are_queried_concurrently(self):
+        with LocalPlantAPIServer(delays=[0.3]) as perenual, \
+                LocalPlantAPIServer(data=[{'scientific_name': 'Monstera deliciosa'}], delays=[0.3]) as trefle:
+            info, elapsed = self.gather(perenual, trefle)
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(info, {
+            'perenual_data': [{'common_name': 'Monstera'}],
+            'trefle_data': [{'scientific_name': 'Monstera deliciosa'}],
+        })
+        self.assertIn('q=Monstera', perenual.requests[0])
+        self.assertEqual(ApiUsage.objects.filter(success=True).count(), 3)
+
+    def test_slow_source_is_dropped_at_deadline(self):
+        with LocalPlantAPIServer() as perenual, LocalPlantAPIServer(delays=[1]) as trefle:
+            info, elapsed = self.gather(perenual, trefle, deadline=0.3)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(info['perenual_data'], [{'common_name': 'Monstera'}])
+        self.assertEqual(info['trefle_data'], [])
+        self.assertFalse(ApiUsage.objects.get(api_name='Trefle').success)
+        enrichment = ApiUsage.objects.get(api_name='PlantInfo')
+        self.assertEqual(enrichment.error_message, 'No data from trefle_data')
+        self.assertLess(enrichment.response_time, 600)
+
+    def test_hedged_request_beats_slow_first_attempt(self):
+        with LocalPlantAPIServer() as perenual, LocalPlantAPIServer(delays=[1, 0]) as trefle:
+            info, elapsed = self.gather(perenual, trefle, deadline=1.0, hedge_after=0.1)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(info['trefle_data'], [{'common_name': 'Monstera'}])
+        self.assertEqual(len(trefle.requests), 2)
+        self.assertEqual(len(perenual.requests), 1)
+
+    def test_server_error_is_retried(self):
+        with LocalPlantAPIServer(statuses=[503, 200]) as perenual, LocalPlantAPIServer() as trefle:
+            info, _ = self.gather(perenual, trefle, hedge_after=0.5)
+        self.assertEqual(info['perenual_data'], [{'common_name': 'Monstera'}])
+        self.assertEqual(len(perenual.requests), 2)
+
+    def test_results_are_cached_per_normalized_name(self):
+        record = {'common_name': 'Monstera', 'scientific_name': 'Monstera deliciosa', 'images': ['x.jpg'], 'id': 1}
+        with LocalPlantAPIServer(data=[record, record]) as perenual, LocalPlantAPIServer(data=[]) as trefle:
+            info, _ = self.gather(perenual, trefle)
+            # Only the prompt fields of the first hit are kept
+            self.assertEqual(info['perenual_data'], [{'common_name': 'Monstera', 'scientific_name': 'Monstera deliciosa'}])
+            self.assertEqual(info['trefle_data'], [])
+
+            with self.assertNumQueries(0):
+                self.assertEqual(self.gather(perenual, trefle, plant_name=' monstera ')[0], info)
+            plant_info_cache.clear_hot()
+            self.assertEqual(self.gather(perenual, trefle, plant_name='MONSTERA')[0], info)
+        self.assertEqual((len(perenual.requests), len(trefle.requests)), (1, 1))
+
+    def test_empty_results_and_errors_expire_sooner(self):
+        with LocalPlantAPIServer(data=[]) as perenual, LocalPlantAPIServer(statuses=[500]) as trefle:
+            self.gather(perenual, trefle, plant_name='Monstra')
+        entries = {entry.source: entry for entry in PlantInfoCacheEntry.objects.all()}
+        self.assertFalse(entries['perenual'].failed)
+        self.assertTrue(entries['trefle'].failed)
+        for entry in entries.values():
+            ttl = (entry.expires_at - entry.created_at).total_seconds()
+            self.assertAlmostEqual(ttl, plant_info_cache.negative_ttl, delta=1)
+
+
+class PlantInfoCacheTest(TestCase):
+
+    def expire_all(self):
+        PlantInfoCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_expired_rows_are_purged_at_most_every_interval(self):
+        cache = PlantInfoCache()
+        cache.set('perenual', 'Monstera', [{'common_name': 'Monstera'}])
+        self.expire_all()
+        # The first write purged; the next waits for the interval
+        cache.set('perenual', 'Pothos', [{'common_name': 'Pothos'}])
+        self.assertEqual(PlantInfoCacheEntry.objects.count(), 2)
+        self.expire_all()
+        cache.evict_interval = 0
+        cache.set('trefle', 'Fern', [])
+        self.assertEqual(list(PlantInfoCacheEntry.objects.values_list('query', flat=True)), ['fern'])
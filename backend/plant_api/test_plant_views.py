@@ -0,0 +1,308 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from .models import Plant, PlantCare, PlantTombstone, parse_frequency_days
+from .serializers import PlantRowSerializer, PlantSerializer
+from .testing import FirebaseAuthMixin
+
+
+class PlantListConditionalGetTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.care = PlantCare.objects.create(name='Monstera', water_frequency=7, light_requirements='Bright')
+        self.plant = Plant.objects.create(name='Monty', uid=self.uid, care=self.care)
+        Plant.objects.create(name='Not mine', uid='someone-else', care=self.care)
+
+    def _list(self, etag=None):
+        headers = self.auth()
+        if etag:
+            headers['HTTP_IF_NONE_MATCH'] = etag
+        return self.client.get('/api/plants/', **headers)
+
+    def test_matching_etag_returns_304(self):
+        response = self._list()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            not_modified = self._list(response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_etag_is_per_user(self):
+        mine = self._list()['ETag']
+        theirs = self.client.get('/api/plants/', **self.auth('someone-else'))['ETag']
+        self.assertNotEqual(mine, theirs)
+
+    def test_writes_invalidate_etag(self):
+        etag = self._list()['ETag']
+
+        self.client.post('/api/plants/', {'plantcare_id': self.care.id}, format='json', **self.auth())
+        self.assertEqual(self._list(etag).status_code, 200)
+        etag = self._list()['ETag']
+
+        self.client.put(f'/api/plants/{self.plant.id}/', {'mark_watered': True}, format='json', **self.auth())
+        self.assertEqual(self._list(etag).status_code, 200)
+        etag = self._list()['ETag']
+
+        self.client.delete(f'/api/plants/{self.plant.id}/', **self.auth())
+        self.assertEqual(self._list(etag).status_code, 200)
+        etag = self._list()['ETag']
+
+        self.care.care_summary = 'Updated'
+        self.care.save()
+        self.assertEqual(self._list(etag).status_code, 200)
+
+
+class PlantChangesTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.care = PlantCare.objects.create(name='Monstera', water_frequency=7, light_requirements='Bright')
+        self.old = Plant.objects.create(name='Old', uid=self.uid, care=self.care)
+
+    def _changes(self, since=None):
+        params = {'since': since} if since else {}
+        return self.client.get('/api/plants/changes/', params, **self.auth()).json()
+
+    def _age(self, plant, seconds):
+        Plant.objects.filter(id=plant.id).update(updated_at=timezone.now() - timedelta(seconds=seconds))
+
+    def test_full_sync_without_cursor(self):
+        data = self._changes()
+        self.assertTrue(data['full_sync'])
+        self.assertEqual([p['id'] for p in data['changed']], [self.old.id])
+
+    @override_settings(PLANT_SYNC_CONFIG={'OVERLAP_SECONDS': 10, 'TOMBSTONE_RETENTION_DAYS': 30})
+    def test_only_changes_after_cursor(self):
+        self._age(self.old, 60)
+        cursor = self._changes()['cursor']
+
+        new = Plant.objects.create(name='New', uid=self.uid, care=self.care)
+        Plant.objects.create(name='Not mine', uid='someone-else', care=self.care)
+        doomed = Plant.objects.create(name='Doomed', uid=self.uid, care=self.care)
+        self.client.delete(f'/api/plants/{doomed.id}/', **self.auth())
+
+        data = self._changes(cursor)
+        self.assertFalse(data['full_sync'])
+        self.assertEqual([p['id'] for p in data['changed']], [new.id])
+        self.assertEqual(data['deleted'], [doomed.id])
+
+    def test_care_edit_marks_plants_changed(self):
+        self._age(self.old, 60)
+        cursor = self._changes()['cursor']
+        self._age(self.old, 60)
+
+        self.care.care_summary = 'Water less in winter'
+        self.care.save()
+        self.assertEqual([p['id'] for p in self._changes(cursor)['changed']], [self.old.id])
+
+    def test_expired_cursor_forces_full_sync(self):
+        stale = int((timezone.now() - timedelta(days=31)).timestamp() * 1_000_000)
+        self.assertTrue(self._changes(str(stale))['full_sync'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/plants/changes/', {'since': 'yesterday'}, **self.auth())
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PLANT_SYNC_CONFIG={'OVERLAP_SECONDS': 10, 'TOMBSTONE_RETENTION_DAYS': 30})
+    def test_expired_tombstones_are_pruned(self):
+        PlantTombstone.objects.create(plant_id=1, uid=self.uid,
+                                      deleted_at=timezone.now() - timedelta(days=31))
+        recent = PlantTombstone.objects.create(plant_id=2, uid=self.uid,
+                                               deleted_at=timezone.now() - timedelta(days=29))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('Deleted 1 tombstones', out.getvalue())
+        self.assertEqual(list(PlantTombstone.objects.values_list('id', flat=True)), [recent.id])
+
+
+class PlantBulkTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.care = PlantCare.objects.create(name='Monstera', water_frequency=7, light_requirements='Bright')
+        self.plants = [Plant.objects.create(name=f'Plant {i}', uid=self.uid, care=self.care) for i in range(10)]
+        self.foreign = Plant.objects.create(name='Not mine', uid='someone-else', care=self.care)
+
+    def _bulk(self, operations):
+        return self.client.post('/api/plants/bulk/', {'operations': operations}, format='json', **self.auth())
+
+    def test_set_based_operations(self):
+        ids = [plant.id for plant in self.plants]
+        operations = [
+            {'op': 'water', 'ids': ids},
+            {'op': 'fertilize', 'ids': ids[:5]},
+            {'op': 'delete', 'ids': ids[8:]},
+            {'op': 'create', 'items': [{'plantcare_id': self.care.id, 'name': 'Fresh'}, {'plantcare_id': 999}]},
+        ]
+        # ownership + water + fertilize + care lookup + insert, plus savepoint bookkeeping,
+        # independent of the number of plants; a delete collects, deletes and leaves one
+        # tombstone per deleted plant
+        with self.assertNumQueries(11):
+            response = self._bulk(operations)
+        self.assertEqual(response.status_code, 200)
+
+        results = response.json()['results']
+        self.assertEqual(len(results), 10 + 5 + 2 + 2)
+        self.assertTrue(all(r['status'] == 'ok' for r in results[:17]))
+        self.assertEqual(results[-1]['status'], 'error')
+
+        self.assertFalse(Plant.objects.filter(uid=self.uid, last_watered__isnull=True).exclude(name='Fresh').exists())
+        self.assertEqual(Plant.objects.filter(last_fertilized__isnull=False).count(), 5)
+        self.assertFalse(Plant.objects.filter(id__in=ids[8:]).exists())
+        self.assertEqual(PlantTombstone.objects.filter(uid=self.uid).count(), 2)
+        self.assertTrue(Plant.objects.filter(id=results[-2]['id'], uid=self.uid, name='Fresh').exists())
+
+    def test_other_users_plants_untouched(self):
+        response = self._bulk([{'op': 'water', 'ids': [self.foreign.id]}, {'op': 'delete', 'ids': [self.foreign.id]}])
+        self.assertEqual([r['status'] for r in response.json()['results']], ['not_found', 'not_found'])
+        self.foreign.refresh_from_db()
+        self.assertIsNone(self.foreign.last_watered)
+
+    def test_create_items_are_validated(self):
+        response = self._bulk([{'op': 'create', 'items': [
+            {'plantcare_id': self.care.id, 'name': 'x' * 300},
+            {'plantcare_id': self.care.id, 'image_url': 'not a url'},
+            {'plantcare_id': self.care.id, 'description': 'By the window'},
+        ]}])
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['error', 'error', 'ok'])
+        self.assertIn('name', results[0]['error'])
+        self.assertIn('image_url', results[1]['error'])
+        self.assertEqual(Plant.objects.get(id=results[2]['id']).name, 'Monstera')
+
+    def test_booleans_are_not_ids(self):
+        Plant.objects.filter(id=self.plants[0].id).delete()
+        plant = Plant.objects.create(id=1, name='Number one', uid=self.uid, care=self.care)
+        response = self._bulk([
+            {'op': 'water', 'ids': [True]},
+            {'op': 'create', 'items': [{'plantcare_id': True}]},
+        ])
+        self.assertEqual([r['status'] for r in response.json()['results']], ['not_found', 'error'])
+        plant.refresh_from_db()
+        self.assertIsNone(plant.last_watered)
+
+    def test_repeated_id_in_delete(self):
+        plant_id = self.plants[0].id
+        response = self._bulk([{'op': 'delete', 'ids': [plant_id, plant_id]}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['ok', 'ok'])
+        self.assertFalse(Plant.objects.filter(id=plant_id).exists())
+        self.assertEqual(PlantTombstone.objects.filter(plant_id=plant_id).count(), 1)
+
+    def test_deleted_ids_not_reported_as_watered(self):
+        plant_id = self.plants[0].id
+        response = self._bulk([{'op': 'delete', 'ids': [plant_id]}, {'op': 'water', 'ids': [plant_id]}])
+        self.assertEqual([r['status'] for r in response.json()['results']], ['ok', 'not_found'])
+
+    def test_invalid_payload(self):
+        self.assertEqual(self._bulk([{'op': 'prune', 'ids': [1]}]).status_code, 400)
+        self.assertEqual(self._bulk([{'op': 'water'}]).status_code, 400)
+        self.assertEqual(self._bulk([]).status_code, 400)
+
+
+class PlantDueDatesTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.care = PlantCare.objects.create(
+            name='Monstera', water_frequency=7, light_requirements='Bright', fertilizer_frequency='Every 2-3 weeks')
+        self.plant = Plant.objects.create(name='Monty', uid=self.uid, care=self.care)
+
+    def assertDue(self, plant, water_days, fertilize_days):
+        # New rows take their due dates from the clock just before created_at is stamped
+        plant.refresh_from_db()
+        self.assertAlmostEqual(plant.next_water_due, (plant.last_watered or plant.created_at) + timedelta(days=water_days),
+                               delta=timedelta(seconds=1))
+        if fertilize_days is None:
+            self.assertIsNone(plant.next_fertilize_due)
+        else:
+            self.assertAlmostEqual(plant.next_fertilize_due,
+                                   (plant.last_fertilized or plant.created_at) + timedelta(days=fertilize_days),
+                                   delta=timedelta(seconds=1))
+
+    def _due(self, **params):
+        response = self.client.get('/api/plants/due/', params, **self.auth())
+        self.assertEqual(response.status_code, 200)
+        return [plant['id'] for plant in response.json()]
+
+    def test_parse_frequency_days(self):
+        self.assertEqual(parse_frequency_days('14'), 14)
+        self.assertEqual(parse_frequency_days('Every 2-3 weeks in spring'), 14)
+        self.assertEqual(parse_frequency_days('Monthly during the growing season'), 30)
+        self.assertEqual(parse_frequency_days('Biweekly'), 14)
+        self.assertIsNone(parse_frequency_days('Use a balanced 10-10-10 feed'))
+        self.assertIsNone(parse_frequency_days(''))
+
+    def test_write_paths_keep_due_dates_current(self):
+        self.assertDue(self.plant, 7, 14)
+
+        self.client.put(f'/api/plants/{self.plant.id}/', {'mark_watered': True}, format='json', **self.auth())
+        self.assertDue(self.plant, 7, 14)
+
+        self.client.post('/api/plants/bulk/', {'operations': [
+            {'op': 'water', 'ids': [self.plant.id]},
+            {'op': 'fertilize', 'ids': [self.plant.id]},
+            {'op': 'create', 'items': [{'plantcare_id': self.care.id}]},
+        ]}, format='json', **self.auth())
+        self.assertDue(self.plant, 7, 14)
+        for plant in Plant.objects.filter(uid=self.uid):
+            self.assertDue(plant, 7, 14)
+
+    def test_care_frequency_change_recomputes_plants(self):
+        other = Plant.objects.create(name='Other', uid='someone-else', care=self.care, last_watered=timezone.now())
+        self.care.water_frequency = 3
+        self.care.fertilizer_frequency = 'never'
+        with self.assertNumQueries(2):
+            self.care.save()
+        self.assertDue(self.plant, 3, None)
+        self.assertDue(other, 3, None)
+
+    def test_due_endpoint(self):
+        thirsty = Plant.objects.create(
+            name='Thirsty', uid=self.uid, care=self.care, last_watered=timezone.now() - timedelta(days=10))
+        Plant.objects.create(name='Not mine', uid='someone-else', care=self.care, last_watered=timezone.now() - timedelta(days=10))
+
+        self.assertEqual(self._due(), [thirsty.id])
+        self.assertEqual(self._due(care='fertilize'), [])
+        in_a_week = (timezone.now() + timedelta(days=8)).date().isoformat()
+        self.assertEqual(self._due(before=in_a_week, care='water'), [thirsty.id, self.plant.id])
+        self.assertEqual(self._due(before=in_a_week, care='fertilize'), [])
+
+    def test_due_endpoint_invalid_params(self):
+        self.assertEqual(self.client.get('/api/plants/due/', {'before': 'soon'}, **self.auth()).status_code, 400)
+        self.assertEqual(self.client.get('/api/plants/due/', {'care': 'prune'}, **self.auth()).status_code, 400)
+
+
+class PlantRowSerializerTest(TestCase):
+
+    def setUp(self):
+        care = PlantCare.objects.create(
+            name='Árvácska', scientific_name='Viola × wittrockiana', water_frequency=3,
+            light_requirements='Sun', care_summary='⚠️ Toxic to cats. Keep moist.')
+        Plant.objects.create(name='Balcony', uid='u1', care=care, last_watered=timezone.now())
+        Plant.objects.create(name='Orphan', uid='u1', care=None, image_url=None, description=None)
+
+    def assertSameJson(self):
+        queryset = Plant.objects.select_related('care')
+        renderer = JSONRenderer()
+        self.assertEqual(
+            renderer.render(PlantRowSerializer.serialize(queryset)),
+            renderer.render(PlantSerializer(queryset, many=True).data),
+        )
+
+    def test_matches_model_serializer(self):
+        self.assertSameJson()
+
+    def test_matches_model_serializer_in_other_timezone(self):
+        with timezone.override('Europe/Budapest'):
+            self.assertSameJson()
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from . import views
+from .breakers import breakers
+from .care_cache import care_summary_cache
+from .models import ApiUsage
+from .prompts import NO_PLANT_INFO, build_plant_info_text, estimate_tokens
+from .testing import LocalOpenAIServer
+from .usage_stats import call_cost, percentile
+
+PLANT_INFO = {
+    'perenual_data': [{
+        'common_name': 'Swiss cheese plant',
+        'scientific_name': ['Monstera deliciosa'],
+        'other_name': ['Ceriman', 'Ceriman', 'Windowleaf', 'Mexican breadfruit', 'Hurricane plant', 'Fruit salad'],
+        'watering': 'Average',
+        'sunlight': ['part shade', 'part sun/part shade'],
+        'default_image': {'original_url': 'https://example.com/monstera.jpg'},
+    }],
+    'trefle_data': [{
+        'common_name': 'Ceriman',
+        'scientific_name': 'Monstera deliciosa',
+        'family': 'Araceae',
+        'genus': 'Monstera',
+        'links': {'self': '/api/v1/species/monstera-deliciosa'},
+    }],
+}
+
+
+class PromptBuilderTest(SimpleTestCase):
+
+    def test_care_facts_only(self):
+        text = build_plant_info_text(PLANT_INFO, token_budget=1000)
+        self.assertEqual(text.splitlines(), [
+            'scientific_name: Monstera deliciosa',
+            'watering: Average',
+            'sunlight: part shade, part sun/part shade',
+            'family: Araceae',
+            'common_name: Ceriman',
+            'other_names: Ceriman, Windowleaf, Mexican breadfruit, Hurricane plant',
+            'genus: Monstera',
+        ])
+
+    def test_budget_drops_least_useful_facts(self):
+        text = build_plant_info_text(PLANT_INFO, token_budget=20)
+        self.assertLessEqual(estimate_tokens(text), 20)
+        self.assertEqual(text.splitlines()[0], 'scientific_name: Monstera deliciosa')
+        self.assertNotIn('genus', text)
+
+    def test_nothing_known(self):
+        for plant_info in (None, {}, {'perenual_data': [], 'trefle_data': []}, {'perenual_data': 'oops'}):
+            self.assertEqual(build_plant_info_text(plant_info), NO_PLANT_INFO)
+
+    def test_cost_and_percentile(self):
+        self.assertEqual(call_cost('gpt-4.1-nano-2025-04-14', 1000, 500), Decimal('0.00030000'))
+        self.assertIsNone(call_cost('unpriced-model', 1000, 500))
+        self.assertIsNone(call_cost('gpt-4.1-nano-2025-04-14', None, None))
+        self.assertEqual(percentile([10, 20, 30, 40], 0.5), 20)
+        self.assertEqual(percentile([10, 20, 30, 40], 0.95), 40)
+        self.assertIsNone(percentile([], 0.5))
+
+
+class TokenAccountingTest(TestCase):
+
+    def setUp(self):
+        breakers.reset()
+        care_summary_cache.clear_hot()
+        self.server = LocalOpenAIServer(lambda body: {'plant_name': 'Monstera', 'summary': 'Easy.'}).start()
+        self.addCleanup(self.server.stop)
+        patcher = mock.patch.object(views, 'client', self.server.client())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_usage_is_recorded(self):
+        views.PlantCareAI.generate_plant_care_summary('Monstera', PLANT_INFO)
+        prompt = self.server.requests[0]['messages'][-1]['content']
+        self.assertIn('watering: Average', prompt)
+        self.assertNotIn('example.com', prompt)
+
+        usage = ApiUsage.objects.get(api_name='OpenAI')
+        self.assertEqual(usage.model, views.CARE_SUMMARY_MODEL)
+        self.assertGreater(usage.prompt_tokens, 0)
+        self.assertGreater(usage.completion_tokens, 0)
+        self.assertEqual(usage.cost, call_cost(usage.model, usage.prompt_tokens, usage.completion_tokens))
+
+    def test_streamed_usage_is_recorded(self):
+        events = list(views.PlantCareAI.stream_plant_care_summary('Monstera', PLANT_INFO))
+        self.assertEqual(events[-1][0], 'summary')
+        self.assertTrue(self.server.requests[0]['stream_options']['include_usage'])
+        self.assertIsNotNone(ApiUsage.objects.get(api_name='OpenAI').cost)
+
+    def test_report_before_and_after(self):
+        model = views.CARE_SUMMARY_MODEL
+        split = timezone.now() - timedelta(days=1)
+        for response_time, prompt_tokens in ((900, 1800), (1100, 1800)):
+            usage = ApiUsage.objects.create(api_name='OpenAI', endpoint='chat/completions', model=model,
+                                            response_time=response_time, prompt_tokens=prompt_tokens,
+                                            completion_tokens=200)
+            ApiUsage.objects.filter(pk=usage.pk).update(request_time=split - timedelta(hours=1))
+        views.PlantCareAI.generate_plant_care_summary('Monstera', PLANT_INFO)
+        views.PlantCareAI.generate_plant_care_summary('Monstera', PLANT_INFO)
+
+        out = StringIO()
+        call_command('openai_usage_report', '--split', split.isoformat(), stdout=out)
+        before, after = out.getvalue().splitlines()[1:]
+        self.assertEqual(before.split()[:7], ['before', model, '2', '0', '0', '900', '1100'])
+        self.assertEqual(after.split()[:5], ['after', model, '1', '0', '1'])
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from . import views
+from .catalog import catalog
+from .models import (
+    ActiveUser, AdClick, AdImpression, AdKpi, AdRevenue, AdUnit, Plant, PlantCare, PlantTombstone
+)
+from .testing import FirebaseAuthMixin
+
+
+class QueryBudgetTest(FirebaseAuthMixin, APITestCase):
+    """
+    Every endpoint has a fixed query budget that must not grow with the number of rows.
+    Each check runs at two collection sizes (3 and 12 rows) and asserts the same count at both.
+    """
+
+    def seed(self, start, stop):
+        today = timezone.now().date()
+        for i in range(start, stop):
+            care = PlantCare.objects.create(name=f'Species {i}', water_frequency=7, light_requirements='Bright')
+            plant = Plant.objects.create(name=f'Plant {i}', uid=self.uid, care=care)
+            PlantTombstone.objects.create(plant_id=10_000 + plant.id, uid=self.uid)
+            unit = AdUnit.objects.create(
+                name=f'Unit {i}', format='banner', placement='home_banner', unit_id_android=f'unit-{i}')
+            impression = AdImpression.objects.create(ad_id=f'ad-{i}', ad_unit=unit, placement='home_banner')
+            AdClick.objects.create(impression=impression)
+            AdClick.objects.create(impression=impression)
+            AdRevenue.objects.create(ad_unit=unit, date=today - timedelta(days=i % 5), revenue=Decimal('1.5'))
+            AdKpi.objects.create(date=today - timedelta(days=i), active_users=i, total_impressions=i * 40)
+            ActiveUser.objects.create(uid=f'user-{i}', date=today - timedelta(days=i % 7))
+        return plant, impression
+
+    def count_queries(self, request):
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+        self.assertLess(response.status_code, 300, getattr(response, 'data', response))
+        return len(queries)
+
+    def assertBudget(self, budget, make_request):
+        counts = []
+        for start, stop in ((0, 3), (3, 12)):
+            plant, impression = self.seed(start, stop)
+            counts.append(self.count_queries(lambda: make_request(plant, impression)))
+        self.assertEqual(counts, [budget, budget])
+
+    def get(self, path):
+        return lambda plant, impression: self.client.get(path.format(plant=plant, impression=impression), **self.auth())
+
+    def view(self, viewset, action, detail=False):
+        def make_request(plant, impression):
+            request = APIRequestFactory().get('/')
+            request.firebase_user = {'uid': self.uid}
+            kwargs = {'pk': plant.pk} if detail else {}
+            return viewset.as_view({'get': action})(request, **kwargs)
+        return make_request
+
+    def test_plants_list(self):
+        # ETag aggregate + list
+        self.assertBudget(2, self.get('/api/plants/'))
+
+    def test_plant_detail(self):
+        self.assertBudget(1, self.get('/api/plants/{plant.id}/'))
+
+    def test_plant_changes(self):
+        since = int((timezone.now() - timedelta(hours=1)).timestamp() * 1_000_000)
+        self.assertBudget(2, self.get(f'/api/plants/changes/?since={since}'))
+
+    def test_plants_due(self):
+        self.assertBudget(1, self.get('/api/plants/due/?before=2100-01-01'))
+
+    def test_user_plants_list(self):
+        self.assertBudget(1, self.view(views.UserPlantViewSet, 'list'))
+
+    def test_plant_care_list(self):
+        # Budget for rebuilding the snapshot; a current snapshot costs nothing
+        fetch = self.get('/api/plant-care/')
+
+        def rebuild_and_fetch(plant, impression):
+            catalog.invalidate()
+            return fetch(plant, impression)
+        self.assertBudget(1, rebuild_and_fetch)
+
+    def test_ad_impressions_list(self):
+        # impressions joined with ad units + prefetched clicks
+        self.assertBudget(2, self.get('/api/ad-impressions/'))
+
+    def test_ad_impression_detail(self):
+        self.assertBudget(2, self.get('/api/ad-impressions/{impression.id}/'))
+
+    def test_ad_impression_stats(self):
+        self.assertBudget(3, self.get('/api/ad-impressions/stats/'))
+
+    def test_ad_clicks_list(self):
+        self.assertBudget(1, self.get('/api/ad-clicks/'))
+
+    def test_ad_revenue_list(self):
+        self.assertBudget(1, self.view(views.AdRevenueViewSet, 'list'))
+
+    def test_ad_revenue_summary(self):
+        self.assertBudget(2, self.view(views.AdRevenueViewSet, 'summary'))
+
+    def test_active_user_stats(self):
+        self.assertBudget(2, self.view(views.ActiveUserViewSet, 'stats'))
+
+    def test_ad_kpi_list(self):
+        self.assertBudget(1, self.view(views.AdKpiViewSet, 'list'))
+
+    def test_ad_kpi_summary(self):
+        self.assertBudget(2, self.view(views.AdKpiViewSet, 'summary'))
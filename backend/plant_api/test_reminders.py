@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import reminders
+from .models import Plant, PlantCare
+from .reminders import MAX_NAMES_IN_BODY, send_watering_reminders
+from .testing import RecordingSender
+
+
+class WateringReminderTest(TestCase):
+
+    def setUp(self):
+        RecordingSender.reset()
+        self.care = PlantCare.objects.create(name='Fern', water_frequency=3, light_requirements='Shade')
+        thirsty = timezone.now() - timedelta(days=3)
+        self.due = {
+            'alice': [Plant.objects.create(name=f'Fern {i}', uid='alice', care=self.care, last_watered=thirsty)
+                      for i in range(3)],
+            'bob': [Plant.objects.create(name='Bob fern', uid='bob', care=self.care, last_watered=thirsty)],
+        }
+        Plant.objects.create(name='Just watered', uid='alice', care=self.care, last_watered=timezone.now())
+        Plant.objects.create(name='Nobody', uid=None, care=self.care, last_watered=thirsty)
+
+    def test_one_notification_per_user(self):
+        # One streamed read; the rest are the reminder marks
+        with CaptureQueriesContext(connection) as queries:
+            stats = send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1), chunk_size=2)
+        self.assertEqual(sum(query['sql'].startswith('SELECT') for query in queries), 1)
+
+        self.assertEqual(stats['users'], 2)
+        self.assertEqual(stats['plants'], 4)
+        self.assertEqual(stats['sent'], 2)
+        sent = {notification['uid']: notification for notification in RecordingSender.sent}
+        self.assertEqual(set(sent), {'alice', 'bob'})
+        self.assertEqual(sent['alice']['data']['plantIds'], [plant.id for plant in self.due['alice']])
+        self.assertEqual(sent['alice']['body'], 'The following need water: Fern 0, Fern 1, Fern 2')
+
+    def test_reruns_do_not_remind_again(self):
+        send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual(len(RecordingSender.sent), 2)
+        stats = send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual((stats['users'], stats['plants']), (0, 0))
+
+        # A new due date is reminded again
+        fern = self.due['alice'][0]
+        fern.last_watered = timezone.now() - timedelta(days=4)
+        fern.save()
+        stats = send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual(stats['plants'], 1)
+        self.assertEqual(RecordingSender.sent[-1]['data']['plantIds'], [fern.id])
+
+    def test_failed_sends_are_retried(self):
+        RecordingSender.reset(fail_uids={'bob'})
+        with self.assertLogs('plant_api.reminders', 'ERROR'):
+            send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        RecordingSender.reset()
+        send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual([notification['uid'] for notification in RecordingSender.sent], ['bob'])
+
+    def test_crash_keeps_sent_plants_marked(self):
+        build = reminders.build_notification
+
+        def build_until_bob(uid, plants):
+            if uid == 'bob':
+                raise RuntimeError('worker killed')
+            return build(uid, plants)
+
+        with mock.patch.object(reminders, 'build_notification', side_effect=build_until_bob), \
+                self.assertRaises(RuntimeError):
+            send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual(Plant.objects.filter(water_reminded_for__isnull=False).count(), 3)
+
+        RecordingSender.reset()
+        send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        self.assertEqual([notification['uid'] for notification in RecordingSender.sent], ['bob'])
+
+    def test_marks_are_flushed_in_chunks(self):
+        Plant.objects.bulk_create([
+            Plant(name='Cactus', uid=f'user-{i:02d}', care=self.care, next_water_due=timezone.now())
+            for i in range(20)
+        ])
+        with mock.patch.object(reminders, 'mark_reminded', wraps=reminders.mark_reminded) as mark:
+            send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1), chunk_size=2, workers=1)
+        batches = [call.args[0] for call in mark.call_args_list]
+        self.assertEqual(sum(len(batch) for batch in batches), 24)
+        # Bounded by the chunk plus the sends still in flight, never the whole run
+        self.assertGreater(len(batches), 4)
+        self.assertLessEqual(max(len(batch) for batch in batches), 6)
+        self.assertFalse(Plant.objects.filter(uid__isnull=False, water_reminded_for__isnull=True,
+                                              next_water_due__lte=timezone.now()).exists())
+
+    def test_window_includes_upcoming_plants(self):
+        stats = send_watering_reminders(sender=RecordingSender(), window=timedelta(days=4))
+        self.assertEqual(stats['plants'], 5)
+
+    def test_sender_failures_are_counted(self):
+        RecordingSender.reset(fail_uids={'bob'})
+        with self.assertLogs('plant_api.reminders', 'ERROR'):
+            stats = send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1), workers=2)
+        self.assertEqual((stats['sent'], stats['failed']), (1, 1))
+
+    def test_long_lists_are_summarised(self):
+        Plant.objects.bulk_create([
+            Plant(name=f'Cactus {i}', uid='carol', care=self.care, next_water_due=timezone.now())
+            for i in range(MAX_NAMES_IN_BODY + 5)
+        ])
+        send_watering_reminders(sender=RecordingSender(), window=timedelta(hours=1))
+        carol = next(n for n in RecordingSender.sent if n['uid'] == 'carol')
+        self.assertTrue(carol['body'].endswith('and 5 more'))
+        self.assertEqual(len(carol['data']['plantIds']), MAX_NAMES_IN_BODY + 5)
+
+    def test_management_command(self):
+        out = StringIO()
+        call_command('send_watering_reminders', '--sender', 'plant_api.testing.RecordingSender',
+                     '--window-hours', '1', '--workers', '2', stdout=out)
+        self.assertEqual(len(RecordingSender.sent), 2)
+        self.assertIn('Reminded 2 users about 4 plants: 2 sent, 0 failed', out.getvalue())
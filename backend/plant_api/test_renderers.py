@@ -0,0 +1,61 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from . import renderers
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+
+    payload = {
+        'utc': datetime.datetime(2025, 6, 1, 1, 28, 5, 123456, tzinfo=datetime.timezone.utc),
+        'utc_zoneinfo': datetime.datetime(2025, 6, 1, 1, 28, tzinfo=ZoneInfo('UTC')),
+        'budapest': datetime.datetime(2025, 6, 1, 3, 28, tzinfo=ZoneInfo('Europe/Budapest')),
+        'naive': datetime.datetime(2025, 6, 1, 1, 28, 5),
+        'date': datetime.date(2025, 6, 1),
+        'time': datetime.time(8, 30),
+        'revenue': Decimal('0.005000'),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'text': 'Árvácska ⚠️ \u2028\u2029',
+        'nested': [{'id': 1, 'ratio': 0.25, 'ok': True, 'none': None}],
+        7: 'int key',
+    }
+
+    def test_matches_drf_renderer(self):
+        self.assertEqual(ORJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_indent_uses_stdlib(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            ORJSONRenderer().render({'a': [1]}, media_type),
+            JSONRenderer().render({'a': [1]}, media_type),
+        )
+
+    def test_falls_back_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(ORJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+
+    def test_falls_back_for_unsupported_values(self):
+        data = {'big': 2 ** 70}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+class ORJSONParserTest(SimpleTestCase):
+
+    def test_matches_drf_parser(self):
+        body = '{"name": "Árvácska", "ids": [1, 2], "ratio": 0.5, "ok": null}'.encode()
+        self.assertEqual(ORJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"name": '))
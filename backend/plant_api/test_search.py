@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from .models import Plant, PlantCare
+from .search import SpeciesSearchIndex, normalize, species_index
+from .testing import FirebaseAuthMixin
+
+
+def create_care(name, scientific_name=None):
+    return PlantCare.objects.create(
+        name=name, scientific_name=scientific_name, water_frequency=7, light_requirements='Bright')
+
+
+class NormalizeTest(SimpleTestCase):
+
+    def test_case_diacritics_and_punctuation(self):
+        self.assertEqual(normalize('Árvácska'), 'arvacska')
+        self.assertEqual(normalize('  Viola × wittrockiana '), 'viola wittrockiana')
+        self.assertEqual(normalize("Bird's-nest FERN"), 'bird s nest fern')
+        self.assertEqual(normalize(None), '')
+
+
+class SpeciesSearchIndexTest(TestCase):
+
+    def setUp(self):
+        self.monstera = create_care('Monstera', 'Monstera deliciosa')
+        self.adansonii = create_care('Swiss cheese vine', 'Monstera adansonii')
+        self.pansy = create_care('Árvácska', 'Viola × wittrockiana')
+        self.fern = create_care('Boston fern', 'Nephrolepis exaltata')
+        self.index = SpeciesSearchIndex(max_age=60)
+
+    def ids(self, query, limit=10):
+        return [result[0] for result in self.index.search(query, limit)]
+
+    def test_prefix_ranking(self):
+        self.assertEqual(self.ids('monst'), [self.monstera.id, self.adansonii.id])
+        self.assertEqual(self.ids('monstera'), [self.monstera.id, self.adansonii.id])
+        self.assertEqual(self.ids('fern'), [self.fern.id])
+        self.assertEqual(self.ids('monstera ada')[0], self.adansonii.id)
+        self.assertEqual(self.ids('monst', limit=1), [self.monstera.id])
+
+    def test_normalized_matches(self):
+        self.assertEqual(self.ids('ARVACS'), [self.pansy.id])
+        self.assertEqual(self.ids('viola wittrock'), [self.pansy.id])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.ids('monstrea')[0], self.monstera.id)
+        self.assertEqual(self.ids('nephrolepsis'), [self.fern.id])
+        self.assertEqual(self.ids('xyzzy'), [])
+
+    def test_best_match_requires_exact_name(self):
+        self.assertEqual(self.index.best_match('monstera deliciosa'), self.monstera.id)
+        self.assertEqual(self.index.best_match('boston FERN'), self.fern.id)
+        self.assertIsNone(self.index.best_match('boston'))
+
+    def test_incremental_updates(self):
+        self.index.search('x')
+        self.index.upsert(self.fern.id, 'Sword fern', 'Nephrolepis exaltata')
+        self.assertEqual(self.ids('sword'), [self.fern.id])
+        self.assertEqual(self.ids('boston'), [])
+
+        self.index.remove(self.fern.id)
+        self.assertEqual(self.ids('nephrolepis'), [])
+        self.assertNotIn('nephrolepis', self.index._tokens)
+
+    def test_signals_update_shared_index_after_commit(self):
+        species_index.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            ivy = create_care('English ivy', 'Hedera helix')
+        self.assertEqual([result[0] for result in species_index.search('hedera')], [ivy.id])
+        with self.captureOnCommitCallbacks(execute=True):
+            ivy.delete()
+        self.assertEqual(species_index.search('hedera'), [])
+
+    def test_refresh_catches_writes_from_other_processes(self):
+        self.index.search('x')
+        # Signals' on_commit hooks never run inside TestCase, like writes made elsewhere
+        aloe = create_care('Aloe vera')
+        self.fern.delete()
+        with mock.patch('plant_api.search.time.monotonic', return_value=10 ** 9):
+            self.assertEqual(self.ids('aloe'), [aloe.id])
+            self.assertEqual(self.ids('boston'), [])
+
+
+class PlantCareSearchViewTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.monstera = create_care('Monstera', 'Monstera deliciosa')
+        species_index.build()
+
+    def test_search_endpoint(self):
+        response = self.client.get('/api/plant-care/search/', {'q': 'monstra'}, **self.auth())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['id'], self.monstera.id)
+        self.assertEqual(response.json()[0]['scientific_name'], 'Monstera deliciosa')
+
+        self.assertEqual(self.client.get('/api/plant-care/search/', **self.auth()).json(), [])
+        self.assertEqual(
+            self.client.get('/api/plant-care/search/', {'q': 'm', 'limit': 'all'}, **self.auth()).status_code, 400)
+
+    def test_care_summary_resolves_species_from_index(self):
+        with mock.patch('plant_api.views.PlantInfoAPI') as external, self.assertNumQueries(2):
+            response = self.client.get('/api/care-summary/', {'plant_name': 'MONSTERA'}, **self.auth())
+        # A species the caller doesn't keep comes back in the generated summary shape
+        self.assertEqual(response.json(), {
+            'plant_name': 'Monstera', 'watering_needs': 'Every 7 days', 'light_needs': 'Bright', 'summary': ''})
+        external.gather_plant_info.assert_not_called()
+
+    def test_care_summary_returns_the_callers_plant(self):
+        Plant.objects.create(name='Other monstera', uid='mallory', care=self.monstera)
+        plant = Plant.objects.create(name='Living room monstera', uid=self.uid, care=self.monstera)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/care-summary/', {'plant_name': 'monstera'}, **self.auth())
+        self.assertEqual(response.json()['id'], plant.id)
+        self.assertEqual(response.json()['care']['id'], self.monstera.id)
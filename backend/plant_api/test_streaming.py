@@ -0,0 +1,144 @@
+import json
+import time
+from unittest import mock
+
+from rest_framework.test import APITestCase
+
+from . import views
+from .breakers import breakers
+from .care_cache import care_summary_cache
+from .models import ApiUsage, CareGenerationJob, PlantCare
+from .search import species_index
+from .testing import FirebaseAuthMixin, LocalOpenAIServer
+
+SUMMARY = {
+    'plant_name': 'Peace lily',
+    'plant_type': 'Perennial',
+    'watering_needs': 'Keep soil moist',
+    'light_needs': 'Low to medium',
+    'summary': 'Forgiving and happy in shade.',
+    'tips': ['Wipe the leaves', 'Droops when thirsty'],
+}
+
+
+def parse_events(chunks):
+    """
+    (event, data, arrival time) for each event in an iterable of SSE byte chunks
+    """
+    buffer = b''
+    for chunk in chunks:
+        buffer += chunk
+        while b'\n\n' in buffer:
+            raw, buffer = buffer.split(b'\n\n', 1)
+            fields = dict(line.split(': ', 1) for line in raw.decode('utf-8').splitlines())
+            yield fields['event'], json.loads(fields['data']), time.monotonic()
+
+
+class CareSummaryStreamTest(FirebaseAuthMixin, APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        breakers.reset()
+        care_summary_cache.clear_hot()
+        species_index.build()
+        self.answer = SUMMARY
+        # Per-model answers override self.answer
+        self.answers = {}
+        self.server = LocalOpenAIServer(
+            lambda body: self.answers.get(body['model'], self.answer), chunk_size=16, chunk_delay=0.02).start()
+        self.addCleanup(self.server.stop)
+        for patcher in (
+            mock.patch.object(views, 'client', self.server.client()),
+            mock.patch('plant_api.views.PlantInfoAPI.gather_plant_info', return_value={}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def stream(self, plant_name='Peace lily'):
+        return self.client.get(
+            '/api/care-summary/', {'plant_name': plant_name}, HTTP_ACCEPT='text/event-stream', **self.auth())
+
+    def test_deltas_then_summary(self):
+        start = time.monotonic()
+        response = self.stream()
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        events = list(parse_events(response.streaming_content))
+
+        names = [event for event, _, _ in events]
+        self.assertEqual(names[-1], 'summary')
+        self.assertGreater(len(names), 3)
+        self.assertEqual(set(names[:-1]), {'delta'})
+        self.assertEqual(json.loads(''.join(data['content'] for _, data, _ in events[:-1])), SUMMARY)
+        self.assertEqual(events[-1][1], SUMMARY)
+        # The first tokens reach the client well before the completion ends
+        self.assertLess(events[0][2] - start, (events[-1][2] - start) / 2)
+
+        body = self.server.requests[0]
+        self.assertTrue(body['stream'])
+        self.assertFalse(CareGenerationJob.objects.exists())
+
+    def test_completed_summary_is_stored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            list(self.stream(plant_name='peace lily').streaming_content)
+        plantcare = PlantCare.objects.get(name='Peace lily')
+        self.assertEqual(plantcare.care_summary, SUMMARY['summary'])
+        key = care_summary_cache.make_key('peace lily', views.CARE_SUMMARY_MODEL, views.CARE_SUMMARY_PROMPT_HASH)
+        self.assertEqual(care_summary_cache.get(key)[0], SUMMARY)
+        self.assertTrue(ApiUsage.objects.get(api_name='OpenAI').success)
+
+        # Now a known species: answered as one event without calling OpenAI
+        response = self.client.get(
+            '/api/care-summary/', {'plant_name': 'Peace lily', 'format': 'sse'}, **self.auth())
+        events = list(parse_events([response.content]))
+        self.assertEqual([(event, data['plant_name']) for event, data, _ in events], [('summary', plantcare.name)])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_openai_failure_ends_with_error_event(self):
+        self.answer = 500
+        with self.assertLogs('plant_api.views', 'WARNING'):
+            events = list(parse_events(self.stream().streaming_content))
+        self.assertEqual([event for event, _, _ in events], ['error'])
+        self.assertEqual(events[0][1]['error'], 'Failed to generate care summary')
+        self.assertFalse(PlantCare.objects.exists())
+        # Every model of the ladder was tried before giving up
+        usage = ApiUsage.objects.filter(api_name='OpenAI')
+        self.assertEqual(sorted(usage.values_list('model', flat=True)), sorted(views.care_models.models))
+        self.assertFalse(usage.filter(success=True).exists())
+
+    def cache_key(self, plant_name='Peace lily'):
+        return care_summary_cache.make_key(plant_name, views.CARE_SUMMARY_MODEL, views.CARE_SUMMARY_PROMPT_HASH)
+
+    def test_invalid_summary_is_not_stored(self):
+        self.answer = {'summary': 'No name'}
+        with self.assertLogs('plant_api.views', 'WARNING'):
+            events = list(parse_events(self.stream().streaming_content))
+        self.assertEqual(events[-1][0], 'error')
+        self.assertIn('not a valid care summary', events[-1][1]['message'])
+        self.assertIn('reset', [event for event, _, _ in events])
+        self.assertFalse(PlantCare.objects.exists())
+        self.assertIsNone(care_summary_cache.get(self.cache_key()))
+        self.assertFalse(ApiUsage.objects.filter(api_name='OpenAI', success=True).exists())
+
+    def test_invalid_answer_falls_back_after_reset(self):
+        self.answers[views.care_models.models[0]] = {'summary': 'No name'}
+        with self.assertLogs('plant_api.views', 'WARNING'):
+            events = list(parse_events(self.stream().streaming_content))
+        names = [event for event, _, _ in events]
+        reset = names.index('reset')
+        self.assertEqual(events[reset][1], {'model': views.care_models.models[1]})
+        # Only the deltas after the reset make up the final answer
+        self.assertEqual(json.loads(''.join(data['content'] for _, data, _ in events[reset + 1:-1])), SUMMARY)
+        self.assertEqual(events[-1][:2], ('summary', SUMMARY))
+        self.assertEqual(care_summary_cache.get(self.cache_key())[0], SUMMARY)
+
+    def test_store_failure_still_ends_with_summary(self):
+        with mock.patch.object(views.PlantCareViewSet, 'store_species', side_effect=RuntimeError('too long')), \
+                self.assertLogs('plant_api.views', 'ERROR'):
+            events = list(parse_events(self.stream().streaming_content))
+        self.assertEqual(events[-1][:2], ('summary', SUMMARY))
+
+    def test_missing_name_is_an_error_event(self):
+        response = self.client.get('/api/care-summary/', HTTP_ACCEPT='text/event-stream', **self.auth())
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([event for event, _, _ in parse_events([response.content])], ['error'])
@@ -0,0 +1,90 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+from firebase_admin import auth
+
+from .middleware.token_verifier import HttpCertSource, LocalTokenVerifier
+from .testing import PROJECT_ID, LocalKeyServer, SigningKey
+
+
+class LocalTokenVerifierTest(SimpleTestCase):
+
+    def setUp(self):
+        self.server = LocalKeyServer(max_age=3600).start()
+        self.verifier = LocalTokenVerifier(
+            PROJECT_ID, source=HttpCertSource(self.server.url), min_refresh_interval=0)
+        self.verifier.start()
+
+    def tearDown(self):
+        self.verifier.stop()
+        self.server.stop()
+
+    def test_valid_token(self):
+        claims = self.verifier.verify(self.server.current.mint(uid='abc'))
+        self.assertEqual(claims['uid'], 'abc')
+        self.assertEqual(claims['aud'], PROJECT_ID)
+
+    def test_claim_checks_match_firebase_admin(self):
+        key = self.server.current
+        rejected = [
+            key.mint(aud='other-project'),
+            key.mint(iss='https://securetoken.google.com/other-project'),
+            key.mint(sub=''),
+            key.mint(sub='x' * 129),
+            key.mint(iat=int(time.time()) + 600),
+            SigningKey('key-1').mint(),  # same kid, wrong key
+        ]
+        for token in rejected:
+            with self.assertRaises(auth.InvalidIdTokenError):
+                self.verifier.verify(token)
+
+        with self.assertRaises(auth.ExpiredIdTokenError):
+            self.verifier.verify(key.mint(iat=int(time.time()) - 7200, exp=int(time.time()) - 3600))
+
+    def test_verify_never_fetches(self):
+        fetches = self.server.fetches
+        for _ in range(10):
+            self.verifier.verify(self.server.current.mint())
+        self.assertEqual(self.server.fetches, fetches)
+
+    def wait_for_fetches(self, count, timeout=2):
+        deadline = time.monotonic() + timeout
+        while self.server.fetches < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_unknown_kid_wakes_refresher_and_falls_back(self):
+        fetches = self.server.fetches
+        token = self.server.rotate('key-2').mint()
+        with mock.patch('plant_api.middleware.token_verifier.auth.verify_id_token',
+                        return_value={'uid': 'test-user'}) as verify_id_token:
+            self.assertEqual(self.verifier.verify(token)['uid'], 'test-user')
+            verify_id_token.assert_called_once()
+
+            # The new key arrives in the background; later requests verify locally
+            self.wait_for_fetches(fetches + 1)
+            self.assertEqual(self.verifier.verify(token)['uid'], 'test-user')
+            verify_id_token.assert_called_once()
+
+    def test_unknown_kid_refreshes_are_rate_limited(self):
+        self.verifier.min_refresh_interval = 3600
+        token = self.server.rotate('key-2').mint()
+        fetches = self.server.fetches
+        with mock.patch('plant_api.middleware.token_verifier.auth.verify_id_token',
+                        return_value={'uid': 'test-user'}) as verify_id_token:
+            for _ in range(3):
+                self.assertEqual(self.verifier.verify(token)['uid'], 'test-user')
+        self.assertEqual(verify_id_token.call_count, 3)
+        time.sleep(0.1)
+        self.assertEqual(self.server.fetches, fetches)
+
+    def test_refresh_schedule_follows_cache_headers(self):
+        verifier = LocalTokenVerifier(
+            PROJECT_ID, source=HttpCertSource(self.server.url), refresh_margin=300, min_refresh_interval=60)
+        self.assertEqual(verifier.refresh(), 3300)
+
+    def test_failed_refresh_keeps_previous_keys(self):
+        with mock.patch.object(self.verifier.source, 'fetch', side_effect=ConnectionError):
+            self.assertEqual(self.verifier.refresh(), self.verifier.retry_interval)
+        self.assertTrue(self.verifier.ready)
+        self.assertEqual(self.verifier.refresh_failures, 1)
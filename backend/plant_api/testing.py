@@ -0,0 +1,337 @@
+"""
+Local stand-ins for external services, shared by tests and benchmarks.
+"""
+
+import datetime
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.db import connection
+from google.auth import crypt, jwt
+
+from .middleware.firebase_auth import token_cache
+
+PROJECT_ID = 'plantkeepers-app'
+
+
+class LocalServer:
+    """
+    Runs a ThreadingHTTPServer on an ephemeral localhost port in a daemon thread.
+    Usable as a context manager.
+    """
+    def __init__(self, handler_class):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+        self.httpd.owner = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SigningKey:
+    """
+    Self-signed RSA key pair able to mint Firebase-shaped ID tokens
+    """
+    def __init__(self, kid):
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        certificate = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(self.private_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(self.private_key, hashes.SHA256())
+        )
+        self.certificate_pem = certificate.public_bytes(serialization.Encoding.PEM).decode()
+        private_pem = self.private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        self._signer = crypt.RSASigner.from_string(private_pem, key_id=kid)
+
+    def mint(self, uid='test-user', project_id=PROJECT_ID, lifetime=3600, **overrides):
+        now = int(time.time())
+        claims = {
+            'iss': f'https://securetoken.google.com/{project_id}',
+            'aud': project_id,
+            'sub': uid,
+            'iat': now,
+            'exp': now + lifetime,
+            'auth_time': now,
+        }
+        claims.update(overrides)
+        claims = {key: value for key, value in claims.items() if value is not None}
+        return jwt.encode(self._signer, claims).decode()
+
+
+class LocalKeyServer(LocalServer):
+    """
+    Serves `{kid: certificate}` like Google's securetoken endpoint, with a
+    configurable Cache-Control max-age. Keys can be rotated while running.
+    """
+    def __init__(self, max_age=3600):
+        super().__init__(_KeyHandler)
+        self.max_age = max_age
+        self.keys = [SigningKey('key-1')]
+        self.fetches = 0
+
+    def rotate(self, kid):
+        key = SigningKey(kid)
+        self.keys = [key] + self.keys[:1]
+        return key
+
+    @property
+    def current(self):
+        return self.keys[0]
+
+
+class _KeyHandler(_QuietHandler):
+    def do_GET(self):
+        server = self.server.owner
+        server.fetches += 1
+        self.send_json(
+            {key.kid: key.certificate_pem for key in server.keys},
+            headers={'Cache-Control': f'public, max-age={server.max_age}, must-revalidate, no-transform'},
+        )
+
+
+class LocalPlantAPIServer(LocalServer):
+    """
+    Answers any GET with `{"data": [...]}` like Perenual and Trefle searches.
+    `delays` holds per-request latencies in seconds, consumed in order (the last
+    one repeats); `statuses` works the same way for the response status.
+    Failures carry a `retry_after` Retry-After header.
+    Connections are kept alive, and `connections` records each client port seen.
+    """
+    def __init__(self, data=None, delays=(0,), statuses=(200,), retry_after='0'):
+        super().__init__(_PlantAPIHandler)
+        self.retry_after = retry_after
+        self.data = data if data is not None else [{'common_name': 'Monstera'}]
+        self.delays = list(delays)
+        self.statuses = list(statuses)
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    def next_response(self, path, client_address):
+        with self.lock:
+            index = len(self.requests)
+            self.requests.append(path)
+            self.connections.add(client_address[1])
+        return self.delays[min(index, len(self.delays) - 1)], self.statuses[min(index, len(self.statuses) - 1)]
+
+
+class _PlantAPIHandler(_QuietHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server.owner
+        delay, status = server.next_response(self.path, self.client_address)
+        time.sleep(delay)
+        try:
+            if status == 200:
+                self.send_json({'data': server.data})
+            else:
+                self.send_json({'message': 'unavailable'}, status=status, headers={'Retry-After': server.retry_after})
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a slow answer
+            pass
+
+
+class LocalOpenAIServer(LocalServer):
+    """
+    Minimal stand-in for the OpenAI chat completions API. `respond(body)` gets
+    the decoded request and returns the assistant message as a dict (sent as
+    JSON content) or an int HTTP status to fail with. Requests are recorded.
+    Streaming requests get the content as server-sent chunks of `chunk_size`
+    characters, `chunk_delay` seconds apart.
+    """
+    def __init__(self, respond, delay=0, chunk_size=8, chunk_delay=0):
+        super().__init__(_OpenAIHandler)
+        self.respond = respond
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f'{self.url}/v1'
+
+    def client(self, **kwargs):
+        from openai import OpenAI
+        return OpenAI(api_key='sk-test', base_url=self.base_url, max_retries=0, **kwargs)
+
+    @staticmethod
+    def completion(body, content, prompt_tokens=None, completion_tokens=None):
+        prompt_tokens = prompt_tokens or sum(len(message['content']) for message in body['messages']) // 4
+        completion_tokens = completion_tokens or len(content) // 4
+        return {
+            'id': 'chatcmpl-local',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+
+    @staticmethod
+    def completion_chunk(body, content=None, usage=None):
+        return {
+            'id': 'chatcmpl-local',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body['model'],
+            'choices': [] if usage else [{
+                'index': 0,
+                'delta': {'content': content} if content is not None else {},
+                'finish_reason': None if content is not None else 'stop',
+            }],
+            'usage': usage,
+        }
+
+
+class _OpenAIHandler(_QuietHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server.owner
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with server.lock:
+            server.requests.append(body)
+        time.sleep(server.delay)
+        answer = server.respond(body)
+        if isinstance(answer, int):
+            self.send_json({'error': {'message': 'stand-in failure', 'type': 'server_error'}}, status=answer)
+        elif body.get('stream'):
+            self.send_stream(server, body, json.dumps(answer))
+        else:
+            self.send_json(server.completion(body, json.dumps(answer)))
+
+    def send_stream(self, server, body, content):
+        # Unsized body, so the connection ends the stream
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        chunks = [content[i:i + server.chunk_size] for i in range(0, len(content), server.chunk_size)]
+        events = [server.completion_chunk(body, chunk) for chunk in chunks]
+        events.append(server.completion_chunk(body))
+        if (body.get('stream_options') or {}).get('include_usage'):
+            events.append(server.completion_chunk(body, usage=server.completion(body, content)['usage']))
+        for event in events:
+            self.wfile.write(b'data: %s\n\n' % json.dumps(event).encode('utf-8'))
+            self.wfile.flush()
+            time.sleep(server.chunk_delay)
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+
+class RecordingSender:
+    """
+    Reminder sender that keeps every notification instead of pushing it.
+    Uids listed in `fail_uids` raise, to exercise error handling.
+    """
+    sent = []
+    fail_uids = set()
+    lock = threading.Lock()
+
+    def send(self, notification):
+        if notification['uid'] in self.fail_uids:
+            raise ConnectionError('push service unavailable')
+        with self.lock:
+            self.sent.append(notification)
+
+    @classmethod
+    def reset(cls, fail_uids=()):
+        cls.sent = []
+        cls.fail_uids = set(fail_uids)
+
+
+class FirebaseAuthMixin:
+    """
+    TestCase mixin that accepts any bearer token and treats it as the Firebase uid
+    """
+    uid = 'test-user'
+
+    def setUp(self):
+        super().setUp()
+        token_cache.clear()
+        patcher = mock.patch(
+            'plant_api.middleware.firebase_auth.auth.verify_id_token',
+            side_effect=lambda token: {'uid': token, 'sub': token, 'exp': time.time() + 3600},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def auth(self, uid=None):
+        return {'HTTP_AUTHORIZATION': f'Bearer {uid or self.uid}'}
+
+
+@contextmanager
+def temporary_database():
+    """
+    Create a throwaway test database for a benchmark run, leaving db.sqlite3 untouched
+    """
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -20,6 +20,7 @@ urlpatterns = [
     
     # Custom API endpoints
     path('care-summary/', views.PlantCareView.as_view(), name='plant-care-summary'),
+    path('care-jobs/<uuid:job_id>/', views.CareJobView.as_view(), name='care-job-detail'),
     
     # Ad tracking endpoints
     path('track-impression/', views.track_ad_impression, name='track-ad-impression'),
@@ -0,0 +1,61 @@
+"""
+Cost and latency figures for OpenAI calls recorded in ApiUsage.
+"""
+
+import math
+from decimal import Decimal
+
+from django.conf import settings
+
+COST_PLACES = Decimal('0.00000001')
+
+
+def call_cost(model, prompt_tokens, completion_tokens):
+    """
+    USD cost of one completion from OPENAI_CONFIG['PRICING'], or None if the
+    model's price or the token counts are unknown
+    """
+    pricing = getattr(settings, 'OPENAI_CONFIG', {}).get('PRICING', {}).get(model)
+    if pricing is None or prompt_tokens is None:
+        return None
+    input_price, output_price = (Decimal(str(price)) for price in pricing)
+    cost = (input_price * prompt_tokens + output_price * (completion_tokens or 0)) / 1_000_000
+    return cost.quantize(COST_PLACES)
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an ascending list, or None when it is empty
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def _average(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def generation_stats(queryset):
+    """
+    Latency, token and cost figures for the OpenAI calls in `queryset`.
+    Cache hits are counted but left out of the per-generation figures.
+    """
+    rows = list(queryset.values_list('response_time', 'success', 'cache_hit', 'prompt_tokens',
+                                     'completion_tokens', 'cost'))
+    generations = [row for row in rows if not row[2]]
+    latencies = sorted(row[0] for row in generations if row[1])
+    costs = [row[5] for row in generations if row[5] is not None]
+    return {
+        'calls': len(generations),
+        'errors': sum(1 for row in generations if not row[1]),
+        'cache_hits': len(rows) - len(generations),
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+        'prompt_tokens': _average(row[3] for row in generations),
+        'completion_tokens': _average(row[4] for row in generations),
+        'cost_per_call': sum(costs) / len(costs) if costs else None,
+        'total_cost': sum(costs, Decimal(0)),
+    }
@@ -1,36 +1,89 @@
 import time
 import json
 import os
-from datetime import datetime, timedelta
-import requests
+from datetime import datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
 import uuid
+import hashlib
 import logging
 
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models import Sum, Count, Avg, F, FloatField, ExpressionWrapper
+from django.db.models import Sum, Count, Avg, Max, Q, F, FloatField, ExpressionWrapper
+from django.db.models.functions import TruncDate
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag
 from rest_framework import viewsets, status, views
 from rest_framework.decorators import api_view, action
 from rest_framework.response import Response
-from openai import OpenAI
+from rest_framework.settings import api_settings
+from openai import OpenAI, Timeout
 
 from .models import (
-    ActiveUser, Plant, PlantCare, AdImpression, AdClick, ApiUsage,
-    AdUnit, AdRevenue, AdKpi
+    ActiveUser, CareGenerationJob, Plant, PlantCare, PlantTombstone, AdImpression, AdClick, ApiUsage,
+    AdUnit, AdRevenue, AdKpi, DEFAULT_WATER_FREQUENCY, parse_frequency_days, species_key
 )
+from .care_cache import care_summary_cache
+from . import http_client
+from .breakers import breakers
+from .catalog import catalog
+from .concurrency import FanOut, SingleFlight
+from .jobs import CareGenerationError, care_jobs
+from .model_ladder import care_models
+from .plant_info_cache import plant_info_cache, prompt_data
+from .prompts import build_plant_info_text
+from .renderers import EventStreamRenderer, sse_event
+from .search import species_index
+from .usage_stats import call_cost
 from .serializers import (
     ActiveUserSerializer, PlantSerializer, PlantCareSerializer,
     AdImpressionSerializer, AdClickSerializer, PlantCareSummarySerializer, 
-    AdUnitSerializer, AdRevenueSerializer, AdKpiSerializer
+    AdUnitSerializer, AdRevenueSerializer, AdKpiSerializer, PlantRowSerializer
 )
 
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
-# OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+# OpenAI client; the SDK pools its own connections, so only the connect timeout and retries are shared
+client = OpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    timeout=Timeout(settings.OPENAI_CONFIG.get('TIMEOUT_SECONDS', 60),
+                    connect=settings.HTTP_CLIENT_CONFIG['CONNECT_TIMEOUT']),
+    max_retries=settings.HTTP_CLIENT_CONFIG['RETRIES'],
+)
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an Accept-Encoding header allows gzip: listed, or covered by "*",
+    with a q-value above zero ("gzip;q=0" refuses it)
+    """
+    qualities = {}
+    for part in accept_encoding.split(','):
+        coding, *params = (piece.strip() for piece in part.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return quality > 0
+
+
+# Coalesces concurrent PlantCare generations for the same species key
+species_generation = SingleFlight()
+
+# Shared pool for the concurrent Perenual / Trefle lookups
+plant_info_fan_out = FanOut(workers=settings.PLANT_INFO_CONFIG['WORKERS'])
 
 # API ViewSets
 class PlantViewSet(viewsets.ModelViewSet):
@@ -39,7 +92,43 @@ class PlantViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         uid = getattr(self.request, 'firebase_user', {}).get('uid')
-        return Plant.objects.filter(uid=uid)
+        return Plant.objects.filter(uid=uid).select_related('care')
+
+    def get_list_validators(self, queryset):
+        """
+        Cheap ETag / Last-Modified for the user's plant list, from one aggregate query.
+        Any create, update (auto_now updated_at), delete or change to a nested
+        PlantCare moves the count or one of the max timestamps.
+        """
+        state = queryset.aggregate(
+            count=Count('id'),
+            plants_updated=Max('updated_at'),
+            care_updated=Max('care__last_updated'),
+        )
+        latest = max(filter(None, [state['plants_updated'], state['care_updated']]), default=None)
+        fingerprint = f"{state['count']}:{state['plants_updated']}:{state['care_updated']}"
+        etag = quote_etag(hashlib.md5(fingerprint.encode('utf-8')).hexdigest())
+        last_modified = int(latest.timestamp()) if latest else None
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = self.get_list_validators(queryset)
+
+        # Answer 304 before running the serializer if the client's copy is current.
+        # Only the ETag decides: a delete can move max(updated_at) backwards, so
+        # If-Modified-Since alone could wrongly report an unchanged list.
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = Response(PlantRowSerializer.serialize(queryset))
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Per-user content: clients must revalidate, shared caches must not store it
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
 
     def create(self, request, *args, **kwargs):
         uid = getattr(request, 'firebase_user', {}).get('uid')
@@ -93,20 +182,268 @@ class PlantViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Plants created or updated since `since`, plus ids of deleted plants.
+
+        The cursor is an opaque server timestamp. Each sync re-reads a short overlap
+        window before it, so clients must apply changes idempotently (upsert by id).
+        Without a cursor, or with one older than the tombstone retention, the full
+        collection is returned with `full_sync: true`.
+        """
+        sync_config = getattr(settings, 'PLANT_SYNC_CONFIG', {})
+        overlap = timedelta(seconds=sync_config.get('OVERLAP_SECONDS', 10))
+        retention = timedelta(days=sync_config.get('TOMBSTONE_RETENTION_DAYS', 30))
+
+        # Taken before reading, so nothing written after the reads is skipped next time
+        now = timezone.now()
+        uid = getattr(request, 'firebase_user', {}).get('uid')
+
+        since = None
+        cursor = request.query_params.get('since')
+        if cursor:
+            try:
+                since = datetime.fromtimestamp(int(cursor) / 1_000_000, tz=dt_timezone.utc)
+            except (ValueError, OverflowError, OSError):
+                return Response({'error': 'Invalid since cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        full_sync = since is None or since < now - retention
+        queryset = self.get_queryset()
+        deleted = []
+        if not full_sync:
+            window_start = since - overlap
+            queryset = queryset.filter(updated_at__gt=window_start)
+            deleted = list(
+                PlantTombstone.objects.filter(uid=uid, deleted_at__gt=window_start)
+                .values_list('plant_id', flat=True).distinct()
+            )
+
+        serializer = self.get_serializer(queryset.order_by('updated_at', 'id'), many=True)
+        return Response({
+            'cursor': str(int(now.timestamp() * 1_000_000)),
+            'full_sync': full_sync,
+            'changed': serializer.data,
+            'deleted': deleted,
+        })
+
+    @action(detail=False, methods=['get'])
+    def due(self, request):
+        """
+        Plants needing water or fertilizer by `before` (ISO date or datetime, default now).
+        A bare date includes the whole day. `care=water` or `care=fertilize` limits the
+        check to one kind, making it a single range scan on the (uid, next_*_due) index.
+        """
+        before = timezone.now()
+        value = request.query_params.get('before')
+        if value:
+            try:
+                parsed = parse_datetime(value)
+                if parsed is None:
+                    day = parse_date(value)
+                    if day is None:
+                        raise ValueError
+                    parsed = datetime.combine(day + timedelta(days=1), datetime.min.time())
+            except ValueError:
+                return Response({'error': 'before must be an ISO 8601 date or datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            before = parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+        care = request.query_params.get('care')
+        if care == 'water':
+            condition = Q(next_water_due__lte=before)
+        elif care == 'fertilize':
+            condition = Q(next_fertilize_due__lte=before)
+        elif care is None:
+            condition = Q(next_water_due__lte=before) | Q(next_fertilize_due__lte=before)
+        else:
+            return Response({'error': 'care must be water or fertilize'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset().filter(condition).order_by('next_water_due', 'id')
+        return Response(PlantRowSerializer.serialize(queryset))
+
+    BULK_OPERATIONS = ('create', 'water', 'fertilize', 'delete')
+    BULK_MAX_ITEMS = 500
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Run several plant operations in one transaction with set-based queries.
+
+        Body: {"operations": [{"op": "water" | "fertilize" | "delete", "ids": [...]},
+                              {"op": "create", "items": [{"plantcare_id": ..., "name": ...}]}]}
+        Returns one result per id / item, in request order.
+        """
+        uid = getattr(request, 'firebase_user', {}).get('uid')
+        if not uid:
+            return Response({'error': 'UID not found in Firebase token'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        operations = request.data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return Response({'error': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+
+        item_count = 0
+        for operation in operations:
+            if not isinstance(operation, dict) or operation.get('op') not in self.BULK_OPERATIONS:
+                return Response(
+                    {'error': f'Each operation needs an op in {", ".join(self.BULK_OPERATIONS)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            key = 'items' if operation['op'] == 'create' else 'ids'
+            if not isinstance(operation.get(key), list):
+                return Response({'error': f'{operation["op"]} operation requires a list of {key}'}, status=status.HTTP_400_BAD_REQUEST)
+            item_count += len(operation[key])
+        if item_count > self.BULK_MAX_ITEMS:
+            return Response({'error': f'At most {self.BULK_MAX_ITEMS} items per request'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Ownership is resolved once for every id in the request
+        requested_ids = {
+            plant_id for operation in operations if operation['op'] != 'create'
+            for plant_id in operation['ids'] if self._is_id(plant_id)
+        }
+        # id -> (water days, fertilize days), so due dates can be set without loading plants
+        owned = {
+            plant_id: (
+                water_frequency if care_id else DEFAULT_WATER_FREQUENCY,
+                parse_frequency_days(fertilizer_frequency),
+            )
+            for plant_id, care_id, water_frequency, fertilizer_frequency in
+            Plant.objects.filter(uid=uid, id__in=requested_ids)
+            .values_list('id', 'care_id', 'care__water_frequency', 'care__fertilizer_frequency')
+        }
+
+        results = []
+        now = timezone.now()
+        with transaction.atomic():
+            for operation in operations:
+                op = operation['op']
+                if op == 'create':
+                    results.extend(self._bulk_create(uid, operation['items']))
+                    continue
+
+                # Deduplicated, so a repeated id is acted on once
+                ids = list(dict.fromkeys(
+                    plant_id for plant_id in operation['ids'] if self._is_id(plant_id) and plant_id in owned))
+                if op == 'water':
+                    for days, group in self._group_by_frequency(ids, owned, 0).items():
+                        Plant.objects.filter(id__in=group).update(
+                            last_watered=now, updated_at=now, next_water_due=now + timedelta(days=days)
+                        )
+                elif op == 'fertilize':
+                    for days, group in self._group_by_frequency(ids, owned, 1).items():
+                        Plant.objects.filter(id__in=group).update(
+                            last_fertilized=now, updated_at=now,
+                            next_fertilize_due=now + timedelta(days=days) if days is not None else None
+                        )
+                elif op == 'delete':
+                    # post_delete leaves the tombstones
+                    Plant.objects.filter(id__in=ids).delete()
+                    for plant_id in ids:
+                        del owned[plant_id]
+
+                for plant_id in operation['ids']:
+                    found = self._is_id(plant_id) and plant_id in ids
+                    results.append({
+                        'op': op,
+                        'id': plant_id,
+                        'status': 'ok' if found else 'not_found',
+                    })
+
+        return Response({'results': results})
+
+    @staticmethod
+    def _is_id(value):
+        # bool is an int subclass, and True == 1 would match plant 1
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    @staticmethod
+    def _group_by_frequency(ids, owned, index):
+        """
+        Split ids by care frequency: one UPDATE per distinct interval, not per plant
+        """
+        groups = {}
+        for plant_id in ids:
+            groups.setdefault(owned[plant_id][index], []).append(plant_id)
+        return groups
+
+    def _bulk_create(self, uid, items):
+        care_ids = {item.get('plantcare_id') for item in items if isinstance(item, dict)}
+        cares = PlantCare.objects.in_bulk([care_id for care_id in care_ids if self._is_id(care_id)])
+
+        results = []
+        plants = []
+        for item in items:
+            care_id = item.get('plantcare_id') if isinstance(item, dict) else None
+            plantcare = cares.get(care_id) if self._is_id(care_id) else None
+            if plantcare is None:
+                results.append({'op': 'create', 'status': 'error', 'error': 'Valid plantcare_id is required'})
+                continue
+            # Same field checks as a single create; name falls back to the species name
+            serializer = self.get_serializer(data=item, partial=True)
+            if not serializer.is_valid():
+                results.append({'op': 'create', 'status': 'error', 'error': serializer.errors})
+                continue
+            data = serializer.validated_data
+            plant = Plant(
+                name=data.get('name') or plantcare.name,
+                description=data.get('description', ''),
+                image_url=data.get('image_url', ''),
+                uid=uid,
+                care=plantcare,
+            )
+            # bulk_create skips save(), so due dates are filled in here
+            plant.refresh_due_dates()
+            plants.append(plant)
+            results.append({'op': 'create', 'status': 'ok', 'plant': plant})
+
+        Plant.objects.bulk_create(plants)
+        for result in results:
+            if 'plant' in result:
+                result['id'] = result.pop('plant').id
+        return results
+
 
 class PlantCareViewSet(viewsets.ModelViewSet):
     queryset = PlantCare.objects.all()
     serializer_class = PlantCareSerializer
 
-    def get_queryset(self):
-        if self.action == 'list':
-            return PlantCare.objects.all().only('id', 'name', 'scientific_name')
-        return super().get_queryset()
-
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        data = [{'id': pc.id, 'name': pc.name, 'scientific_name': pc.scientific_name} for pc in queryset]
-        return Response(data)
+        snapshot = catalog.get()
+
+        response = get_conditional_response(request._request, etag=snapshot.etag)
+        if response is None:
+            if request.accepted_renderer.format != 'json':
+                # Browsable API: let DRF render the same rows as HTML
+                return Response(json.loads(snapshot.body))
+            if accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+                response = HttpResponse(snapshot.gzipped_body, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(snapshot.body, content_type='application/json')
+
+        response['ETag'] = snapshot.etag
+        patch_cache_control(response, public=True, no_cache=True)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    SEARCH_DEFAULT_LIMIT = 10
+    SEARCH_MAX_LIMIT = 50
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Typeahead over species names and scientific names, best match first.
+        Case, diacritics and punctuation are ignored, and small typos still match.
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', self.SEARCH_DEFAULT_LIMIT)), self.SEARCH_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = species_index.search(request.query_params.get('q', ''), limit=max(limit, 1))
+        return Response([
+            {'id': plant_care_id, 'name': name, 'scientific_name': scientific_name, 'score': score}
+            for plant_care_id, name, scientific_name, score in results
+        ])
 
     def create(self, request, *args, **kwargs):
         name = request.data.get('name')
@@ -115,23 +452,106 @@ class PlantCareViewSet(viewsets.ModelViewSet):
         if not name and not scientific_name:
             return Response({'error': 'Either name or scientific_name is required'}, status=status.HTTP_400_BAD_REQUEST)
 
+        plantcare = self.find_existing_species(name, scientific_name)
+        if plantcare:
+            return Response(self.get_serializer(plantcare).data)
+
+        # Generation takes seconds of third-party calls, so it runs in the background
+        job, _ = care_jobs.enqueue(
+            'plant_care',
+            species_key(scientific_name or name) or '',
+            {'name': name, 'scientific_name': scientific_name},
+            uid=getattr(request, 'firebase_user', {}).get('uid'),
+        )
+        return job_accepted_response(request, job)
+
+    @staticmethod
+    def find_existing_species(name, scientific_name):
+        """
+        Existing species by normalized key, then by exact normalized name or scientific name
+        """
+        keys = {key for key in (species_key(scientific_name), species_key(name)) if key}
+        plantcare = PlantCare.objects.filter(species_key__in=keys).first() if keys else None
+        if plantcare is None:
+            for candidate in (scientific_name, name):
+                plant_care_id = species_index.best_match(candidate) if candidate else None
+                if plant_care_id:
+                    plantcare = PlantCare.objects.filter(id=plant_care_id).first()
+                    if plantcare:
+                        break
+        return plantcare
+
+    @classmethod
+    def generate_species(cls, name, scientific_name):
+        """
+        Returns (plantcare, created)
+        """
+        # Another job or process may have finished the same species in the meantime
+        plantcare = cls.find_existing_species(name, scientific_name)
+        if plantcare:
+            return plantcare, False
+
         search_name = scientific_name or name
         care_summary = PlantCareAI.generate_plant_care_summary(search_name)
+        if 'error' in care_summary:
+            raise CareGenerationError(care_summary.get('message') or care_summary['error'])
+        return cls.store_species(name or search_name, scientific_name, care_summary)
 
-        plantcare = PlantCare.objects.create(
-            name=name or search_name,
+    @staticmethod
+    def store_species(name, scientific_name, care_summary):
+        """
+        Save a generated species, or return the existing row if its key is taken.
+        Returns (plantcare, created).
+        """
+        fields = dict(
+            name=name,
             scientific_name=care_summary.get('scientific_name', scientific_name),
-            water_frequency=int(care_summary.get('water_frequency', 7)),
             light_requirements=care_summary.get('light_needs', ''),
             humidity_level=care_summary.get('humidity_needs', ''),
             temperature_range=care_summary.get('temperature_range', ''),
             soil_type=care_summary.get('soil_needs', ''),
             fertilizer_frequency=care_summary.get('fertilizer_needs', ''),
-            care_summary=care_summary.get('summary', '')
         )
+        # Generated text is free-form: clip it to the columns
+        for field, value in fields.items():
+            model_field = PlantCare._meta.get_field(field)
+            if value is not None:
+                fields[field] = str(value)[:model_field.max_length]
+            elif not model_field.null:
+                fields[field] = ''
+        fields['water_frequency'] = (
+            parse_frequency_days(str(care_summary.get('water_frequency') or '')) or DEFAULT_WATER_FREQUENCY)
+        fields['care_summary'] = care_summary.get('summary', '')
+        try:
+            with transaction.atomic():
+                return PlantCare.objects.create(**fields), True
+        except IntegrityError:
+            # The generated scientific name belongs to a species stored under another spelling
+            key = species_key(fields['scientific_name'] or fields['name'])
+            existing = PlantCare.objects.filter(species_key=key).first() if key else None
+            if existing is None:
+                raise
+            return existing, False
+
+
+@care_jobs.register('plant_care')
+def run_plant_care_job(name=None, scientific_name=None):
+    # Jobs for the same species running at once share one generation
+    (plantcare, created), shared = species_generation.do(
+        species_key(scientific_name or name),
+        lambda: PlantCareViewSet.generate_species(name, scientific_name),
+    )
+    return None, plantcare
+
+
+def job_accepted_response(request, job):
+    status_url = request.build_absolute_uri(reverse('care-job-detail', args=[job.pk]))
+    return Response(
+        {'job_id': str(job.pk), 'status': job.status, 'status_url': status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': status_url},
+    )
 
-        serializer = self.get_serializer(plantcare)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 class AdUnitViewSet(viewsets.ModelViewSet):
     """
@@ -233,7 +653,7 @@ class AdImpressionViewSet(viewsets.ModelViewSet):
     """
     API endpoint for tracking ad impressions
     """
-    queryset = AdImpression.objects.all()
+    queryset = AdImpression.objects.select_related('ad_unit').prefetch_related('clicks')
     serializer_class = AdImpressionSerializer
 
     @action(detail=False, methods=['get'])
@@ -246,26 +666,30 @@ class AdImpressionViewSet(viewsets.ModelViewSet):
         # Get start date (30 days ago by default)
         start_date = timezone.now() - timedelta(days=days)
         
-        # Get aggregated statistics
-        stats = self.get_queryset().filter(impression_time__gte=start_date).aggregate(
+        # Get aggregated statistics. Clicks are counted separately: joining them
+        # into the impression aggregate would repeat impressions and their revenue
+        stats = AdImpression.objects.filter(impression_time__gte=start_date).aggregate(
             total_impressions=Count('id'),
-            total_clicks=Count('clicks'),
             total_revenue=Sum('estimated_revenue'),
         )
+        stats['total_clicks'] = AdClick.objects.filter(impression__impression_time__gte=start_date).count()
         
-        # Get daily impressions
-        daily_impressions = []
+        # Get daily impressions in one grouped query
         current_date = start_date.date()
         today = timezone.now().date()
+        impressions_by_day = dict(
+            AdImpression.objects.filter(impression_time__date__gte=current_date)
+            .annotate(day=TruncDate('impression_time'))
+            .values('day')
+            .annotate(impressions=Count('id'))
+            .values_list('day', 'impressions')
+        )
         
+        daily_impressions = []
         while current_date <= today:
-            day_impressions = self.get_queryset().filter(
-                impression_time__date=current_date
-            ).count()
-            
             daily_impressions.append({
                 'date': current_date.strftime('%Y-%m-%d'),
-                'impressions': day_impressions
+                'impressions': impressions_by_day.get(current_date, 0)
             })
             
             current_date += timedelta(days=1)
@@ -294,7 +718,7 @@ class AdRevenueViewSet(viewsets.ModelViewSet):
     """
     API endpoint for tracking ad revenue
     """
-    queryset = AdRevenue.objects.all()
+    queryset = AdRevenue.objects.select_related('ad_unit')
     serializer_class = AdRevenueSerializer
     
     @action(detail=False, methods=['get'])
@@ -314,25 +738,22 @@ class AdRevenueViewSet(viewsets.ModelViewSet):
             clicks=Sum('clicks'),
         )
         
-        # Get revenue by ad unit
+        # Get revenue by ad unit in one grouped query
         revenue_by_unit = []
-        ad_units = AdUnit.objects.filter(revenue__date__gte=start_date).distinct()
+        unit_rows = AdRevenue.objects.filter(date__gte=start_date).values(
+            'ad_unit_id', 'ad_unit__name', 'ad_unit__format', 'ad_unit__placement'
+        ).annotate(
+            revenue=Sum('revenue'),
+            impressions=Sum('impressions'),
+            clicks=Sum('clicks'),
+        ).order_by('ad_unit_id')
         
-        for ad_unit in ad_units:
-            unit_data = AdRevenue.objects.filter(
-                ad_unit=ad_unit,
-                date__gte=start_date
-            ).aggregate(
-                revenue=Sum('revenue'),
-                impressions=Sum('impressions'),
-                clicks=Sum('clicks'),
-            )
-            
+        for unit_data in unit_rows:
             revenue_by_unit.append({
-                'ad_unit_id': ad_unit.id,
-                'ad_unit_name': ad_unit.name,
-                'format': ad_unit.format,
-                'placement': ad_unit.placement,
+                'ad_unit_id': unit_data['ad_unit_id'],
+                'ad_unit_name': unit_data['ad_unit__name'],
+                'format': unit_data['ad_unit__format'],
+                'placement': unit_data['ad_unit__placement'],
                 'revenue': float(unit_data['revenue'] or 0),
                 'impressions': unit_data['impressions'] or 0,
                 'clicks': unit_data['clicks'] or 0,
@@ -406,82 +827,81 @@ class PlantInfoAPI:
     Integration with external plant APIs (Perenual and Trefle)
     """
     @staticmethod
-    def get_plant_info_from_perenual(plant_name):
-        """
-        Get plant information from Perenual API
-        """
-        start_time = time.time()
-        success = True
-        error_message = None
-        
-        try:
-            url = f"https://perenual.com/api/species-list?key={PERENUAL_API_KEY}&q={plant_name}"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Log API usage
-            ApiUsage.objects.create(
-                api_name="Perenual",
-                endpoint=f"species-list?q={plant_name}",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            
-            return data.get('data', [])
-        except Exception as e:
-            success = False
-            error_message = str(e)
-            
-            # Log failed API usage
-            ApiUsage.objects.create(
-                api_name="Perenual",
-                endpoint=f"species-list?q={plant_name}",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            return []
+    def fetch_perenual(plant_name, timeout=None):
+        config = settings.PLANT_INFO_CONFIG
+        response = http_client.get(
+            config['PERENUAL_URL'],
+            params={'key': config['PERENUAL_API_KEY'], 'q': plant_name},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json().get('data', [])
+
+    @staticmethod
+    def fetch_trefle(plant_name, timeout=None):
+        config = settings.PLANT_INFO_CONFIG
+        response = http_client.get(
+            config['TREFLE_URL'],
+            params={'token': config['TREFLE_API_KEY'], 'q': plant_name},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json().get('data', [])
+
+    @staticmethod
+    def log_usage(api_name, endpoint, response_time, error=None):
+        ApiUsage.objects.create(
+            api_name=api_name,
+            endpoint=endpoint,
+            response_time=int(response_time * 1000),
+            success=error is None,
+            error_message=str(error) if error is not None else None
+        )
 
     @staticmethod
-    def get_plant_info_from_trefle(plant_name):
+    def gather_plant_info(plant_name):
         """
-        Get plant information from Trefle API
+        Query Perenual and Trefle concurrently and return the combined info used in
+        care summary prompts. A source that fails or misses the deadline contributes
+        an empty list instead of holding up the other. Answers, including empty ones
+        and failures, are cached per normalized name.
         """
-        start_time = time.time()
-        success = True
-        error_message = None
-        
-        try:
-            url = f"https://trefle.io/api/v1/plants/search?token={TREFLE_API_KEY}&q={plant_name}"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Log API usage
-            ApiUsage.objects.create(
-                api_name="Trefle",
-                endpoint=f"plants/search?q={plant_name}",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            
-            return data.get('data', [])
-        except Exception as e:
-            success = False
-            error_message = str(e)
-            
-            # Log failed API usage
-            ApiUsage.objects.create(
-                api_name="Trefle",
-                endpoint=f"plants/search?q={plant_name}",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            return []
+        config = settings.PLANT_INFO_CONFIG
+        deadline = config['DEADLINE_SECONDS']
+        sources = {
+            'perenual_data': ('perenual', "Perenual", f"species-list?q={plant_name}", PlantInfoAPI.fetch_perenual),
+            'trefle_data': ('trefle', "Trefle", f"plants/search?q={plant_name}", PlantInfoAPI.fetch_trefle),
+        }
+        cached = plant_info_cache.get_many([source for source, *_ in sources.values()], plant_name)
+        combined_info = {key: cached[source] for key, (source, *_) in sources.items() if source in cached}
+        calls = {}
+        for key, (source, api_name, _, fetch) in sources.items():
+            if source in cached:
+                continue
+            if not breakers.allow(api_name):
+                # The provider is down; go on without it rather than wait for another failure
+                combined_info[key] = []
+                continue
+            calls[key] = lambda fetch=fetch: fetch(plant_name, timeout=deadline)
+        if not calls:
+            return {key: combined_info[key] for key in sources}
+
+        results = plant_info_fan_out.run(calls, deadline=deadline, hedge_after=config['HEDGE_AFTER_SECONDS'])
+
+        # Usage rows are written here rather than in the pool threads
+        for key, result in results.items():
+            source, api_name, endpoint, _ = sources[key]
+            PlantInfoAPI.log_usage(api_name, endpoint, result.elapsed, result.error)
+            combined_info[key] = prompt_data(source, result.value)
+            plant_info_cache.set(source, plant_name, combined_info[key], failed=result.error is not None)
+
+        stage_time = max(result.elapsed for result in results.values())
+        failed = [key for key, result in results.items() if result.error is not None]
+        PlantInfoAPI.log_usage(
+            "PlantInfo", f"enrichment?q={plant_name}", stage_time,
+            f"No data from {', '.join(failed)}" if failed else None)
+        logger.info("Plant info for %s gathered in %.0f ms (failed: %s)", plant_name, stage_time * 1000, failed or 'none')
+        return {key: combined_info[key] for key in sources}
 
 class AdMobAPI:
     """
@@ -601,36 +1021,12 @@ class AdMobAPI:
             logger.error(f"Error recording ad impression: {str(e)}")
             return None
 
-class PlantCareAI:
-    """
-    Integration with OpenAI for plant care summaries and tips
-    """
-    @staticmethod
-    def generate_plant_care_summary(plant_name, plant_info=None):
-        """
-        Generate plant care summary using OpenAI GPT model
-        """
-        start_time = time.time()
-        success = True
-        error_message = None
-        
-        # Force fetch from external APIs if no plant info is provided
-        if not plant_info or (not plant_info.get('perenual_data') and not plant_info.get('trefle_data')):
-            print(f"No plant info provided for {plant_name}, fetching from APIs...")
-            perenual_data = PlantInfoAPI.get_plant_info_from_perenual(plant_name)
-            trefle_data = PlantInfoAPI.get_plant_info_from_trefle(plant_name)
-            
-            plant_info = {
-                "perenual_data": perenual_data[:1] if perenual_data else [],
-                "trefle_data": trefle_data[:1] if trefle_data else []
-            }
-        
-        # Prepare information to include in the prompt
-        info_text = "No specific plant information available."
-        if plant_info:
-            info_text = json.dumps(plant_info, indent=2)
-            
-        prompt = f"""
+# Summaries are cached under the primary model, whichever model of the ladder answered
+CARE_SUMMARY_MODEL = care_models.primary
+
+CARE_SUMMARY_SYSTEM_PROMPT = "You're a plant care expert assistant."
+
+CARE_SUMMARY_PROMPT = """
         You are a plant care expert assistant. Create a care summary for a {plant_name} plant.
         If available, use this information: {info_text}
         
@@ -642,56 +1038,142 @@ class PlantCareAI:
             "water_frequency": return only an integer representing the watering frequency in days",
             "light_needs": "Brief description of light requirements",
             "humidity_needs": "Brief description of humidity requirements",
+            "soil_needs": "Brief description of suitable soil",
+            "fertilizer_needs": "How often to fertilize, e.g. every 4 weeks in spring and summer",
             "temperature_range": "Ideal temperature range for the plant in Celsius / same range in Fahrenheit",
             "summary": "Start with ⚠️ Toxic to [...] if the plant is toxic to pets or humans. Follow by a brief 2-3 sentence overview of general care",
             "tips": ["Tip 1", "Tip 2", "Tip 3"] (List of 3-5 important care tips)
         }}
         
         Keep the response concise and practical for casual plant owners.
+"""
+
+# Part of the care summary cache key, so editing the prompt retires old entries
+CARE_SUMMARY_PROMPT_HASH = hashlib.sha256(
+    (CARE_SUMMARY_SYSTEM_PROMPT + CARE_SUMMARY_PROMPT).encode()).hexdigest()[:16]
+
+
+class InvalidCareSummary(ValueError):
+    """
+    A completion that isn't a usable care summary, with the call's token usage
+    """
+    def __init__(self, message, usage=None):
+        super().__init__(message)
+        self.usage = usage
+
+
+class PlantCareAI:
+    """
+    Integration with OpenAI for plant care summaries and tips
+    """
+    @staticmethod
+    def log_usage(start_time, model=CARE_SUMMARY_MODEL, usage=None, error=None, cache_hit=False, saved_time=None):
+        """
+        Record one chat completion, with its token counts and cost when OpenAI reported usage
+        """
+        prompt_tokens = usage.prompt_tokens if usage is not None else None
+        completion_tokens = usage.completion_tokens if usage is not None else None
+        ApiUsage.objects.create(
+            api_name="OpenAI",
+            endpoint="chat/completions",
+            model=model,
+            response_time=int((time.time() - start_time) * 1000),
+            success=error is None,
+            error_message=str(error) if error is not None else None,
+            cache_hit=cache_hit,
+            saved_time=saved_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=call_cost(model, prompt_tokens, completion_tokens)
+        )
+
+    @staticmethod
+    def parse_summary(content, usage=None):
+        """
+        The care summary in a completion, or InvalidCareSummary if it is not valid JSON
+        matching PlantCareSummarySerializer
         """
-        
         try:
-            # If OpenAI API key isn't set, print a warning but still attempt call
-            if not settings.OPENAI_API_KEY:
-                print("WARNING: No OpenAI API key provided. API call will likely fail.")
-            
-            # Make the actual API call to OpenAI
+            summary = json.loads(content)
+        except (TypeError, ValueError) as e:
+            raise InvalidCareSummary(f"Completion is not JSON: {e}", usage)
+        if not isinstance(summary, dict) or not PlantCareSummarySerializer(data=summary).is_valid():
+            raise InvalidCareSummary("Completion is not a valid care summary", usage)
+        return summary
+
+    @staticmethod
+    def care_summary_messages(plant_name, plant_info):
+        # Only the care-relevant facts go into the prompt, within a token budget
+        info_text = build_plant_info_text(plant_info)
+        prompt = CARE_SUMMARY_PROMPT.format(plant_name=plant_name, info_text=info_text)
+        return [
+            {"role": "system", "content": CARE_SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def generate_plant_care_summary(plant_name, plant_info=None, before_attempt=None, after_attempt=None):
+        """
+        Generate plant care summary using OpenAI GPT model. `before_attempt` is
+        called before each model the ladder tries (see ModelLadder.run), and
+        `after_attempt(usage)` with the token usage of each finished attempt
+        (None when unknown).
+        """
+        start_time = time.time()
+
+        # Popular species are answered from the cache without calling OpenAI again
+        cache_key = care_summary_cache.make_key(plant_name, CARE_SUMMARY_MODEL, CARE_SUMMARY_PROMPT_HASH)
+        cached = care_summary_cache.get(cache_key)
+        if cached is not None:
+            summary, generation_time = cached
+            PlantCareAI.log_usage(start_time, cache_hit=True, saved_time=generation_time)
+            return summary
+        
+        # Fail fast while OpenAI is known to be failing
+        if not breakers.allow("OpenAI"):
+            return {
+                "plant_name": plant_name,
+                "error": "Failed to generate care summary",
+                "message": "OpenAI is temporarily unavailable, try again later"
+            }
+
+        # Fetch from external APIs if the caller hasn't already
+        if plant_info is None:
+            print(f"No plant info provided for {plant_name}, fetching from APIs...")
+            plant_info = PlantInfoAPI.gather_plant_info(plant_name)
+        
+        # If OpenAI API key isn't set, print a warning but still attempt call
+        if not settings.OPENAI_API_KEY:
+            print("WARNING: No OpenAI API key provided. API call will likely fail.")
+
+        messages = PlantCareAI.care_summary_messages(plant_name, plant_info)
+
+        def complete(model):
+            # Runs on the ladder's pool, so it mustn't touch the database
             response = client.chat.completions.create(
-                model="gpt-4.1-nano-2025-04-14",
-                messages=[
-                    {"role": "system", "content": "You're a plant care expert assistant."},
-                    {"role": "user", "content": prompt}
-                ],
+                model=model,
+                messages=messages,
                 temperature=0.7,
                 response_format={"type": "json_object"}
             )
-            
-            # Log API usage
-            ApiUsage.objects.create(
-                api_name="OpenAI",
-                endpoint="chat/completions",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            
-            content = response.choices[0].message.content
-            print(f"OpenAI API response received for {plant_name}")
-            return json.loads(content)
+            return PlantCareAI.parse_summary(response.choices[0].message.content, response.usage), response.usage
+
+        def log(model, result, error, elapsed):
+            # Usage rows time the OpenAI call alone, without the plant info lookups
+            usage = result[1] if result is not None else getattr(error, 'usage', None)
+            PlantCareAI.log_usage(time.time() - elapsed, model=model, usage=usage, error=error)
+            if after_attempt is not None:
+                after_attempt(usage)
+
+        try:
+            # Cheapest model first, falling back on errors and slow answers
+            (summary, _), model = care_models.run(complete, log, before_attempt)
+            print(f"OpenAI API response received for {plant_name} from {model}")
+            care_summary_cache.set(cache_key, plant_name, model, summary, int((time.time() - start_time) * 1000))
+            return summary
         except Exception as e:
-            success = False
-            error_message = str(e)
             print(f"OpenAI API Error: {str(e)}")
             
-            # Log failed API usage
-            ApiUsage.objects.create(
-                api_name="OpenAI",
-                endpoint="chat/completions",
-                response_time=int((time.time() - start_time) * 1000),
-                success=success,
-                error_message=error_message
-            )
-            
             # Return error information
             return {
                 "plant_name": plant_name,
@@ -699,10 +1181,93 @@ class PlantCareAI:
                 "message": str(e)
             }
 
+    @staticmethod
+    def stream_plant_care_summary(plant_name, plant_info=None):
+        """
+        Streaming variant of generate_plant_care_summary. Yields ('delta', {'content': ...})
+        for each chunk of the completion as OpenAI produces it, then one
+        ('summary', summary) or ('error', error) pair. Only valid summaries are cached.
+        Models are taken in ladder order, without racing or a latency budget. When
+        a model fails after streaming part of its answer, ('reset', {'model': ...})
+        tells the client to drop the deltas so far before the next model starts.
+        """
+        start_time = time.time()
+
+        cache_key = care_summary_cache.make_key(plant_name, CARE_SUMMARY_MODEL, CARE_SUMMARY_PROMPT_HASH)
+        cached = care_summary_cache.get(cache_key)
+        if cached is not None:
+            summary, generation_time = cached
+            PlantCareAI.log_usage(start_time, cache_hit=True, saved_time=generation_time)
+            yield 'summary', summary
+            return
+
+        if not breakers.allow("OpenAI"):
+            yield 'error', {
+                "plant_name": plant_name,
+                "error": "Failed to generate care summary",
+                "message": "OpenAI is temporarily unavailable, try again later"
+            }
+            return
+
+        if plant_info is None:
+            plant_info = PlantInfoAPI.gather_plant_info(plant_name)
+
+        messages = PlantCareAI.care_summary_messages(plant_name, plant_info)
+        error = None
+        streamed = False
+        for model in care_models.order():
+            if streamed:
+                yield 'reset', {"model": model}
+            parts = []
+            usage = None
+            call_start = time.time()
+            try:
+                with client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.7,
+                    response_format={"type": "json_object"},
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ) as stream:
+                    for chunk in stream:
+                        # The last chunk carries the token usage and no choices
+                        usage = chunk.usage or usage
+                        content = chunk.choices[0].delta.content if chunk.choices else None
+                        if content:
+                            parts.append(content)
+                            yield 'delta', {"content": content}
+                summary = PlantCareAI.parse_summary(''.join(parts), usage)
+            except Exception as e:
+                logger.warning("OpenAI streaming with %s failed for %s: %s", model, plant_name, e)
+                PlantCareAI.log_usage(call_start, model=model, usage=usage, error=e)
+                error = e
+                streamed = streamed or bool(parts)
+                continue
+
+            PlantCareAI.log_usage(call_start, model=model, usage=usage)
+            generation_time = int((time.time() - start_time) * 1000)
+            care_summary_cache.set(cache_key, plant_name, model, summary, generation_time)
+            yield 'summary', summary
+            return
+
+        yield 'error', {
+            "plant_name": plant_name,
+            "error": "Failed to generate care summary",
+            "message": str(error)
+        }
+
 class PlantCareView(views.APIView):
     """
-    API view for getting plant care information
+    API view for getting plant care information.
+
+    Clients accepting text/event-stream (or passing ?format=sse) get an unknown
+    species generated inline as Server-Sent Events: 'delta' events carrying the
+    completion as it arrives, then a final 'summary' or 'error' event. A 'reset'
+    event means the deltas so far are void and another model is answering.
     """
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
     def get(self, request):
         plant_name = request.query_params.get('plant_name', '')
         
@@ -712,53 +1277,119 @@ class PlantCareView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Try to get plant from database first
-        plant = Plant.objects.filter(name__icontains=plant_name).first()
-        
-        if plant and hasattr(plant, 'care'):
-            # Return existing plant info
-            serializer = PlantSerializer(plant)
-            return Response(serializer.data)
-        
-        # If not in database, try to get info from external APIs
-        perenual_data = PlantInfoAPI.get_plant_info_from_perenual(plant_name)
-        trefle_data = PlantInfoAPI.get_plant_info_from_trefle(plant_name)
-        
-        # Combine data and generate care summary using OpenAI
-        combined_info = {
-            "perenual_data": perenual_data[:1] if perenual_data else [],
-            "trefle_data": trefle_data[:1] if trefle_data else []
+        # Try the species catalog first
+        plant_care_id = species_index.best_match(plant_name)
+        if plant_care_id:
+            # Same shapes as before the index: the caller's plant of that species, else its summary
+            uid = getattr(request, 'firebase_user', {}).get('uid')
+            plant = Plant.objects.select_related('care').filter(care_id=plant_care_id, uid=uid).first()
+            if plant:
+                return Response(PlantSerializer(plant).data)
+            plantcare = PlantCare.objects.filter(id=plant_care_id).first()
+            if plantcare:
+                return Response(self.stored_summary(plantcare))
+
+        if request.accepted_renderer.format == EventStreamRenderer.format:
+            response = StreamingHttpResponse(
+                self.stream_summary_events(plant_name), content_type=EventStreamRenderer.media_type)
+            # Keep proxies from buffering or caching the stream
+            response['Cache-Control'] = 'no-cache'
+            response['X-Accel-Buffering'] = 'no'
+            return response
+        
+        # Otherwise generate it in the background
+        job, _ = care_jobs.enqueue(
+            'care_summary',
+            species_key(plant_name) or '',
+            {'plant_name': plant_name},
+            uid=getattr(request, 'firebase_user', {}).get('uid'),
+        )
+        return job_accepted_response(request, job)
+
+    @staticmethod
+    def stored_summary(plantcare):
+        """
+        A catalog species in the shape of a generated care summary
+        """
+        return PlantCareSummarySerializer({
+            'plant_name': plantcare.name,
+            'watering_needs': f'Every {plantcare.water_frequency} days',
+            'light_needs': plantcare.light_requirements,
+            'summary': plantcare.care_summary or '',
+        }).data
+
+    @staticmethod
+    def stream_summary_events(plant_name):
+        for event, data in PlantCareAI.stream_plant_care_summary(plant_name):
+            if event == 'summary':
+                serializer = PlantCareSummarySerializer(data=data)
+                if not serializer.is_valid():
+                    yield sse_event('error', {
+                        "plant_name": plant_name,
+                        "error": "Failed to generate care summary",
+                        "message": serializer.errors
+                    })
+                    return
+                # Keep the species, as the background job does; the client gets its summary regardless
+                try:
+                    PlantCareViewSet.store_species(data.get('plant_name') or plant_name, None, data)
+                except Exception:
+                    logger.exception("Storing streamed care summary for %s failed", plant_name)
+                data = serializer.data
+            yield sse_event(event, data)
+
+
+@care_jobs.register('care_summary')
+def run_care_summary_job(plant_name):
+    # Jobs are per user; those for the same plant running at once share one generation
+    return species_generation.do(
+        f'care_summary:{species_key(plant_name) or plant_name}', lambda: generate_care_summary_job(plant_name))[0]
+
+
+def generate_care_summary_job(plant_name):
+    # Combine data and generate care summary using OpenAI
+    combined_info = PlantInfoAPI.gather_plant_info(plant_name)
+
+    care_summary = PlantCareAI.generate_plant_care_summary(plant_name, combined_info)
+    if 'error' in care_summary:
+        raise CareGenerationError(care_summary.get('message') or care_summary['error'])
+
+    # Keep the species, so the next lookup is answered from the catalog
+    plantcare, _ = PlantCareViewSet.store_species(
+        care_summary.get('plant_name') or plant_name, None, care_summary)
+
+    serializer = PlantCareSummarySerializer(data=care_summary)
+    return (serializer.data if serializer.is_valid() else care_summary), plantcare
+
+
+class CareJobView(views.APIView):
+    """
+    Status of a background care-generation job, with its result once finished.
+    Only the user who requested a job can see it.
+    """
+    def get(self, request, job_id):
+        uid = getattr(request, 'firebase_user', {}).get('uid')
+        try:
+            job = CareGenerationJob.objects.select_related('plant_care').get(pk=job_id, uid=uid)
+        except CareGenerationJob.DoesNotExist:
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if care_jobs.resume_if_stale(job):
+            job.refresh_from_db()
+        data = {
+            'job_id': str(job.pk),
+            'kind': job.kind,
+            'status': job.status,
+            'created_at': job.created_at,
+            'finished_at': job.finished_at,
         }
-        
-        care_summary = PlantCareAI.generate_plant_care_summary(plant_name, combined_info)
-        
-        # If we got good data, save it to our database
-        if care_summary and 'error' not in care_summary:
-            # Create or update plant
-            plant, created = Plant.objects.update_or_create(
-                name=care_summary.get('plant_name', plant_name),
-                defaults={
-                    'description': care_summary.get('summary', '')
-                }
-            )
-            
-            # Create or update plant care info
-            PlantCare.objects.update_or_create(
-                plant=plant,
-                defaults={
-                    'scientific_name': care_summary.get('scientific_name', ''),
-                    'water_frequency': 7,  # Default to weekly unless specified
-                    'light_requirements': care_summary.get('light_needs', 'Medium light'),
-                    'care_summary': care_summary.get('summary', '')
-                }
-            )
-        
-        # Return the care summary
-        serializer = PlantCareSummarySerializer(data=care_summary)
-        if serializer.is_valid():
-            return Response(serializer.data)
-        else:
-            return Response(care_summary)  # Return raw data if serializer validation fails
+        if job.status == 'succeeded':
+            data['result'] = job.result if job.kind == 'care_summary' else PlantCareSerializer(job.plant_care).data
+            if job.plant_care_id:
+                data['plant_care_id'] = job.plant_care_id
+        elif job.status == 'failed':
+            data['error'] = job.error_message
+        return Response(data)
 
 class AdMobConfigView(views.APIView):
     """
@@ -882,12 +1513,11 @@ class UserPlantViewSet(viewsets.ModelViewSet):
         print(f"User ID from request: {uid}")
         if uid is not None:
         #     # Filter the queryset by user_id if provided
-            queryset = Plant.objects.filter(uid=uid)
+            queryset = Plant.objects.filter(uid=uid).select_related('care')
         else:
             # If no user_id is provided, return all records
-            queryset = Plant.objects.all()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+            queryset = Plant.objects.select_related('care')
+        return Response(PlantRowSerializer.serialize(queryset))
 
 class ActiveUserViewSet(viewsets.ModelViewSet):
     """
@@ -928,22 +1558,26 @@ class ActiveUserViewSet(viewsets.ModelViewSet):
         
         # Aggregate data
         stats = self.get_queryset().filter(date__gte=start_date).aggregate(
-            total_active_users=Count('user', distinct=True),
+            total_active_users=Count('uid', distinct=True),
             total_sessions=Sum('session_count'),
             avg_daily_active_users=Count('id') / days,
         )
         
-        # Get daily active users
+        # Get daily active users in one grouped query
         daily_users = []
         current_date = start_date
         today = timezone.now().date()
+        users_by_day = dict(
+            self.get_queryset().filter(date__gte=start_date)
+            .values('date')
+            .annotate(active_users=Count('id'))
+            .values_list('date', 'active_users')
+        )
         
         while current_date <= today:
-            day_users = self.get_queryset().filter(date=current_date).count()
-            
             daily_users.append({
                 'date': current_date.strftime('%Y-%m-%d'),
-                'active_users': day_users
+                'active_users': users_by_day.get(current_date, 0)
             })
             
             current_date += timedelta(days=1)
@@ -982,11 +1616,13 @@ class AdKpiViewSet(viewsets.ModelViewSet):
             avg_total_impressions=Avg('total_impressions'),
             total_estimated_revenue=Sum('estimated_revenue'),
             avg_arpu=Avg('estimated_arpu'),
-            target_achieved_days=Count('id', filter=models.Q(target_achieved=True)),
+            target_achieved_days=Count('id', filter=Q(target_achieved=True)),
+            total_days=Count('id'),
         )
         
         # Calculate target achievement percentage
-        target_achievement_percentage = (kpi_summary['target_achieved_days'] / queryset.count()) * 100 if queryset.count() > 0 else 0
+        total_days = kpi_summary['total_days']
+        target_achievement_percentage = (kpi_summary['target_achieved_days'] / total_days) * 100 if total_days > 0 else 0
         
         # Get daily KPI data
         daily_kpi = []
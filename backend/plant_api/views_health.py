@@ -32,13 +32,33 @@ def health_check(request):
         "cors_origins": getattr(settings, 'CORS_ALLOWED_ORIGINS', []),
     }
     
+    # Auth token cache counters
+    from .middleware.firebase_auth import token_cache
+    from .catalog import catalog
+    from .search import species_index
+    from .jobs import care_jobs
+    from .care_cache import care_summary_cache
+    from .views import plant_info_fan_out
+    from .plant_info_cache import plant_info_cache
+    from .breakers import breakers
+    from .model_ladder import care_models
+
     # Response time
     response_time = time.time() - start_time
-    
+
     return Response({
         "status": "healthy" if db_ok else "unhealthy",
         "database": db_status,
         "environment": env_status,
+        "auth_token_cache": token_cache.stats(),
+        "plant_care_catalog": catalog.stats(),
+        "plant_care_search": species_index.stats(),
+        "care_jobs": care_jobs.stats(),
+        "care_summary_cache": care_summary_cache.stats(),
+        "plant_info_fan_out": plant_info_fan_out.stats(),
+        "plant_info_cache": plant_info_cache.stats(),
+        "circuit_breakers": breakers.stats(),
+        "care_models": care_models.stats(),
         "response_time_seconds": response_time,
         "timestamp": time.time(),
         "version": "1.0.0"
@@ -70,6 +70,17 @@ MIDDLEWARE = [
 
 #FireBase settings
 FIREBASE_CREDENTIALS = os.getenv('FIREBASE_CREDENTIALS', 'plantkeepers-app-firebase-adminsdk-fbsvc-ec5713b057.json')
+FIREBASE_AUTH_CONFIG = {
+    # Verified ID tokens are cached (by hash) until their own expiry
+    'TOKEN_CACHE_SIZE': int(os.getenv('FIREBASE_TOKEN_CACHE_SIZE', '1024')),
+    # Seconds a rejected token is remembered before being re-verified
+    'NEGATIVE_CACHE_TTL': int(os.getenv('FIREBASE_NEGATIVE_CACHE_TTL', '30')),
+    # Verify tokens against locally held Google certificates refreshed in the background
+    'LOCAL_VERIFIER': os.getenv('FIREBASE_LOCAL_VERIFIER', 'False').lower() == 'true',
+    'PROJECT_ID': os.getenv('FIREBASE_PROJECT_ID', ''),  # Defaults to the credentials' project
+    'CERT_URL': os.getenv('FIREBASE_CERT_URL', ''),  # Defaults to Google's securetoken certificates
+    'CLOCK_SKEW_SECONDS': int(os.getenv('FIREBASE_CLOCK_SKEW_SECONDS', '0')),
+}
 # CORS settings for frontend access
 # For production, only allow specific origins
 CORS_ALLOWED_ORIGINS = [
@@ -96,9 +107,137 @@ CORS_ALLOW_METHODS = [
     'PUT',
 ]
 
+# Delta sync for /api/plants/changes/
+PLANT_SYNC_CONFIG = {
+    # Each sync re-reads this many seconds before the cursor, covering clock skew
+    # between app servers and writes that commit after a concurrent read
+    'OVERLAP_SECONDS': int(os.getenv('PLANT_SYNC_OVERLAP_SECONDS', '10')),
+    # Cursors older than this get a full resync instead of tombstones
+    'TOMBSTONE_RETENTION_DAYS': int(os.getenv('PLANT_SYNC_TOMBSTONE_RETENTION_DAYS', '30')),
+}
+
+# Pre-serialized GET /api/plant-care/ snapshot and the /api/plant-care/search/ index,
+# both updated after PlantCare writes
+PLANT_CARE_CATALOG_CONFIG = {
+    # Upper bound on staleness for writes made by other processes or instances
+    'MAX_STALENESS_SECONDS': int(os.getenv('PLANT_CARE_CATALOG_MAX_STALENESS_SECONDS', '60')),
+}
+
+# Server-side watering reminders (manage.py send_watering_reminders)
+REMINDER_CONFIG = {
+    'SENDER': os.getenv('REMINDER_SENDER', 'plant_api.reminders.LogSender'),
+    'WINDOW_HOURS': int(os.getenv('REMINDER_WINDOW_HOURS', '24')),
+    # Rows per database round trip; plants are streamed, never loaded all at once
+    'CHUNK_SIZE': int(os.getenv('REMINDER_CHUNK_SIZE', '2000')),
+    'WORKERS': int(os.getenv('REMINDER_WORKERS', '8')),
+}
+
+CARE_JOBS_CONFIG = {
+    # Background threads running PlantCareAI generation; 0 runs jobs inline on commit
+    'WORKERS': int(os.getenv('CARE_JOB_WORKERS', '4')),
+    # Active jobs idle this long are assumed orphaned and restarted when polled
+    'STALE_SECONDS': int(os.getenv('CARE_JOB_STALE_SECONDS', '300')),
+}
+
+HTTP_CLIENT_CONFIG = {
+    # Shared by every outbound integration; see plant_api/http_client.py
+    'CONNECT_TIMEOUT': float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05')),
+    'READ_TIMEOUT': float(os.getenv('HTTP_READ_TIMEOUT', '10')),
+    # Retries for failed connects and 429/5xx answers; read timeouts are not retried
+    'RETRIES': int(os.getenv('HTTP_RETRIES', '2')),
+    'BACKOFF_FACTOR': float(os.getenv('HTTP_BACKOFF_FACTOR', '0.3')),
+    'BACKOFF_JITTER': float(os.getenv('HTTP_BACKOFF_JITTER', '0.3')),
+    # Longest wait between retries, also capping a server's Retry-After
+    'BACKOFF_MAX': float(os.getenv('HTTP_BACKOFF_MAX', '5')),
+    # Hosts with a kept-alive pool, and connections kept per host
+    'POOL_CONNECTIONS': int(os.getenv('HTTP_POOL_CONNECTIONS', '10')),
+    'POOL_MAXSIZE': int(os.getenv('HTTP_POOL_MAXSIZE', '16')),
+    # Wait for a free connection instead of opening extra, unpooled ones
+    'POOL_BLOCK': os.getenv('HTTP_POOL_BLOCK', 'False').lower() == 'true',
+}
+
+PLANT_INFO_CONFIG = {
+    'PERENUAL_URL': os.getenv('PERENUAL_URL', 'https://perenual.com/api/species-list'),
+    'PERENUAL_API_KEY': os.getenv('PERENUAL_API_KEY', ''),
+    'TREFLE_URL': os.getenv('TREFLE_URL', 'https://trefle.io/api/v1/plants/search'),
+    'TREFLE_API_KEY': os.getenv('TREFLE_API_KEY', ''),
+    # Perenual and Trefle are queried concurrently; whatever is back by the deadline is used
+    'DEADLINE_SECONDS': float(os.getenv('PLANT_INFO_DEADLINE_SECONDS', '4')),
+    # A source slower than this gets a second, hedged request
+    'HEDGE_AFTER_SECONDS': float(os.getenv('PLANT_INFO_HEDGE_AFTER_SECONDS', '1.5')),
+    'WORKERS': int(os.getenv('PLANT_INFO_WORKERS', '16')),
+    # Lookup results are cached per normalized name; empty results and errors for less time
+    'CACHE_TTL_SECONDS': int(os.getenv('PLANT_INFO_CACHE_TTL', str(7 * 24 * 3600))),
+    'NEGATIVE_CACHE_TTL_SECONDS': int(os.getenv('PLANT_INFO_NEGATIVE_CACHE_TTL', '900')),
+    'CACHE_HOT_ENTRIES': int(os.getenv('PLANT_INFO_CACHE_HOT_ENTRIES', '512')),
+    # Expired rows are purged on a write at most this often
+    'CACHE_EVICT_INTERVAL_SECONDS': int(os.getenv('PLANT_INFO_CACHE_EVICT_INTERVAL', '300')),
+}
+
+CARE_ENRICHMENT_CONFIG = {
+    # Defaults for the enrich_plant_care command
+    'WORKERS': int(os.getenv('CARE_ENRICHMENT_WORKERS', '4')),
+    # Shared limits across all workers, matching the OpenAI account's tier
+    'REQUESTS_PER_MINUTE': int(os.getenv('CARE_ENRICHMENT_RPM', '60')),
+    'TOKENS_PER_MINUTE': int(os.getenv('CARE_ENRICHMENT_TPM', '60000')),
+    # Tokens reserved per request before it starts, settled with its real usage after
+    'TOKENS_PER_REQUEST': int(os.getenv('CARE_ENRICHMENT_TOKENS_PER_REQUEST', '1200')),
+    'CHUNK_SIZE': int(os.getenv('CARE_ENRICHMENT_CHUNK_SIZE', '50')),
+}
+
+CIRCUIT_BREAKER_CONFIG = {
+    'PROVIDERS': ('Perenual', 'Trefle', 'OpenAI'),
+    # Calls from ApiUsage considered when deciding to trip
+    'WINDOW_SECONDS': int(os.getenv('BREAKER_WINDOW_SECONDS', '60')),
+    'MIN_CALLS': int(os.getenv('BREAKER_MIN_CALLS', '5')),
+    # Trip when this share of recent calls failed, or this share was slower than SLOW_CALL_MS
+    'ERROR_RATE': float(os.getenv('BREAKER_ERROR_RATE', '0.5')),
+    'SLOW_RATE': float(os.getenv('BREAKER_SLOW_RATE', '0.8')),
+    'SLOW_CALL_MS': {'Perenual': 3000, 'Trefle': 3000, 'OpenAI': 20000},
+    # How long a tripped breaker rejects calls before letting a probe through
+    'OPEN_SECONDS': int(os.getenv('BREAKER_OPEN_SECONDS', '30')),
+}
+
+CARE_SUMMARY_CACHE_CONFIG = {
+    # Generated summaries are reused for this long before OpenAI is asked again
+    'TTL_SECONDS': int(os.getenv('CARE_SUMMARY_CACHE_TTL', str(30 * 24 * 3600))),
+    # Rows kept in the database; least recently used entries beyond this are evicted
+    'MAX_ENTRIES': int(os.getenv('CARE_SUMMARY_CACHE_MAX_ENTRIES', '10000')),
+    # Entries kept in memory per process
+    'HOT_ENTRIES': int(os.getenv('CARE_SUMMARY_CACHE_HOT_ENTRIES', '256')),
+    # Expiry and the row limit are enforced on a write at most this often
+    'EVICT_INTERVAL_SECONDS': int(os.getenv('CARE_SUMMARY_CACHE_EVICT_INTERVAL', '300')),
+}
+
 # OpenAI API settings
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+OPENAI_CONFIG = {
+    # Care summary model ladder, cheapest first. The next model is started when one
+    # fails, returns invalid JSON or takes longer than LATENCY_BUDGET_SECONDS.
+    'MODELS': [model.strip() for model in os.getenv(
+        'OPENAI_CARE_MODELS', 'gpt-4.1-nano-2025-04-14,gpt-4.1-mini-2025-04-14').split(',') if model.strip()],
+    'LATENCY_BUDGET_SECONDS': float(os.getenv('OPENAI_LATENCY_BUDGET_SECONDS', '8')),
+    # Start the first two models together and keep the first valid answer
+    'RACE': os.getenv('OPENAI_RACE_MODELS', 'False').lower() == 'true',
+    # Models whose recent latency percentile exceeds the budget are tried last
+    'ROUTING_PERCENTILE': float(os.getenv('OPENAI_ROUTING_PERCENTILE', '0.95')),
+    'ROUTING_WINDOW_SECONDS': int(os.getenv('OPENAI_ROUTING_WINDOW_SECONDS', '3600')),
+    'ROUTING_MIN_CALLS': int(os.getenv('OPENAI_ROUTING_MIN_CALLS', '20')),
+    # Read timeout for one completion. Kept apart from HTTP_CLIENT_CONFIG['READ_TIMEOUT']:
+    # generations take much longer than the plant info lookups, and slow models are
+    # already hedged by the ladder's latency budget
+    'TIMEOUT_SECONDS': float(os.getenv('OPENAI_TIMEOUT_SECONDS', '60')),
+    # Rough token budget for the Perenual / Trefle facts in a care summary prompt
+    'PROMPT_INFO_TOKENS': int(os.getenv('OPENAI_PROMPT_INFO_TOKENS', '150')),
+    # USD per million (prompt, completion) tokens, for ApiUsage.cost
+    'PRICING': {
+        'gpt-4.1-nano-2025-04-14': (0.10, 0.40),
+        'gpt-4.1-mini-2025-04-14': (0.40, 1.60),
+        'gpt-4o-mini': (0.15, 0.60),
+    },
+}
+
 # AdMob Integration Settings
 ADMOB_CONFIG = {
     'APP_ID_ANDROID': os.getenv('ADMOB_APP_ID_ANDROID', 'ca-app-pub-3940256099942544~3347511713'),  # Test App ID
@@ -203,4 +342,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 #         'rest_framework.permissions.IsAuthenticated',      # Require authentication by default
 #     ],
 # }
+REST_FRAMEWORK = {
+    # orjson-backed JSON, falling back to the stdlib encoder when orjson is unavailable
+    'DEFAULT_RENDERER_CLASSES': [
+        'plant_api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'plant_api.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
 import plant_api.verify_firebase